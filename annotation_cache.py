@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Vision Annotation Cache
+Content-addressed cache of Vision results (objects, labels, OCR text) per post image, so a
+regenerated catalog only pays for images Vision has never seen.
+Lookups go by sha256 of the image bytes first, then by perceptual hash (dHash) so the same
+photo re-encoded by Instagram's CDN still hits. Near matches are found through a banded index:
+the 64-bit hash is split into 16-bit bands, and any hash within max_distance bits of another
+shares at least one band with it exactly (max_distance < number of bands).
+"""
+import hashlib
+
+from image_utils import hamming_distance, image_signature, is_distinctive
+from lazy_imports import lazy_import
+
+vision = lazy_import('google.cloud.vision')
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+MAX_BAND_ENTRIES = 32
+
+
+def trim_annotation(response):
+    """Only what catalog generation reads: objects, labels and the full OCR text (not per-word boxes)"""
+    trimmed = vision.AnnotateImageResponse(
+        localized_object_annotations=[
+            {'mid': obj.mid, 'name': obj.name, 'score': obj.score}
+            for obj in response.localized_object_annotations
+        ],
+        label_annotations=[
+            {'mid': label.mid, 'description': label.description, 'score': label.score}
+            for label in response.label_annotations
+        ],
+        text_annotations=[
+            {'locale': text.locale, 'description': text.description}
+            for text in response.text_annotations[:1]
+        ]
+    )
+    return vision.AnnotateImageResponse.to_dict(trimmed)
+
+
+class AnnotationCache:
+    """Vision results keyed by image content, on top of any kv_store backend"""
+
+    def __init__(self, store, ttl=30 * 24 * 3600, max_distance=3, max_aspect_delta=0.02):
+        self.store = store
+        self.ttl = ttl
+        self.max_distance = min(max_distance, BANDS - 1)
+        # Near matches must also have (almost) the same shape, so two similar-looking product
+        # shots in different crops never share annotations
+        self.max_aspect_delta = max_aspect_delta
+        self.exact_hits = 0
+        self.perceptual_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _bands(phash):
+        mask = (1 << BAND_BITS) - 1
+        return [(phash >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+    def _load(self, digest):
+        entry = self.store.get(f"vision:sha:{digest}")
+        if entry is None:
+            return None
+        return vision.AnnotateImageResponse(entry['annotation'])
+
+    def _same_shape(self, candidate, aspect):
+        return aspect is not None and candidate.get('aspect') is not None and \
+            abs(aspect - candidate['aspect']) <= self.max_aspect_delta
+
+    def _perceptual_match(self, phash, aspect):
+        """sha256 of a cached image whose dHash is within max_distance bits (and same aspect)"""
+        candidate = self.store.get(f"vision:dhash:{phash:016x}")
+        if candidate is not None and self._same_shape(candidate, aspect):
+            return candidate['sha']
+
+        if self.max_distance <= 0:
+            return None
+        seen = set()
+        for band, value in enumerate(self._bands(phash)):
+            for candidate in self.store.get(f"vision:band:{band}:{value:04x}", []):
+                if candidate['phash'] in seen:
+                    continue
+                seen.add(candidate['phash'])
+                if hamming_distance(phash, int(candidate['phash'], 16)) <= self.max_distance and \
+                        self._same_shape(candidate, aspect):
+                    return candidate['sha']
+        return None
+
+    def get(self, content):
+        """Cached AnnotateImageResponse for these image bytes, or None"""
+        digest = hashlib.sha256(content).hexdigest()
+        annotation = self._load(digest)
+        if annotation is not None:
+            self.exact_hits += 1
+            return annotation
+
+        phash, aspect = image_signature(content)
+        if is_distinctive(phash):
+            match = self._perceptual_match(phash, aspect)
+            annotation = self._load(match) if match else None
+            if annotation is not None:
+                self.perceptual_hits += 1
+                return annotation
+
+        self.misses += 1
+        return None
+
+    def put(self, content, response):
+        digest = hashlib.sha256(content).hexdigest()
+        phash, aspect = image_signature(content)
+        self.store.set(f"vision:sha:{digest}", {
+            'annotation': trim_annotation(response),
+            'phash': f"{phash:016x}" if phash is not None else None,
+            'aspect': aspect
+        }, ttl=self.ttl)
+        if not is_distinctive(phash):
+            return
+
+        entry = {'phash': f"{phash:016x}", 'sha': digest, 'aspect': aspect}
+        self.store.set(f"vision:dhash:{phash:016x}", entry, ttl=self.ttl)
+        for band, value in enumerate(self._bands(phash)):
+            key = f"vision:band:{band}:{value:04x}"
+            # Read-modify-write; a lost update under concurrency only costs a future near-miss
+            entries = [e for e in self.store.get(key, []) if e['phash'] != entry['phash']]
+            entries.append(entry)
+            self.store.set(key, entries[-MAX_BAND_ENTRIES:], ttl=self.ttl)
+
+    def stats(self):
+        lookups = self.exact_hits + self.perceptual_hits + self.misses
+        return {
+            'exact_hits': self.exact_hits,
+            'perceptual_hits': self.perceptual_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.exact_hits + self.perceptual_hits) / lookups, 3) if lookups else 0.0,
+            'entries': self.store.size()
+        }
@@ -1,35 +1,48 @@
 #!/usr/bin/env python3
-from flask import Flask, request, jsonify, render_template_string, redirect, session, url_for
+from flask import Flask, Response, request, jsonify, render_template_string, redirect, session, url_for
 import json
 import os
 import requests
 import re
 import hashlib
-import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from bs4 import BeautifulSoup
-from PIL import Image
-import io
+from urllib.parse import urlsplit
 import base64
-from colorthief import ColorThief
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-from google.cloud import aiplatform
-from google.cloud import vision
-import vertexai
-from vertexai.preview.generative_models import GenerativeModel
-import selenium
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import subprocess
 import tempfile
 import shutil
+from job_queue import JobQueue
+from kv_store import create_store
+from http_client import PooledHTTPClient
+from profile_cache import ProfileCache
+from hedged_extraction import HedgedExtractor, extraction_cancelled
+from browser_pool import get_shared_pool
+from catalog_store import CatalogStore, catalog_response
+from job_status import JobStatusStore
+from vision_batch import VisionBatchAnnotator, create_vision_client
+from annotation_cache import AnnotationCache
+from client_registry import ClientRegistry, load_google_credentials
+from template_engine import load_template
+from static_assets import StaticBundle
+from comment_fetcher import CommentFetcher
+from media_sync import MediaSync
+from image_pipeline import ImagePipeline
+from image_utils import downscale_jpeg, image_signature, near_duplicates
+from palette import brand_colors
+from business_taxonomy import category_label, category_style, classify
+from gemini_products import GeminiProductSuggester
+from profile_parser import fetch_meta, parse_meta, parse_profile_page, post_images, profile_from_json, profile_from_meta
+from lazy_imports import BackgroundCheck, import_stats, lazy_from, lazy_import
+
+# Heavy SDKs load on first use, not at import (Vertex AI alone takes ~2s), so a cold-started
+# worker can answer webhooks right away
+vertexai = lazy_import('vertexai')
+GenerativeModel = lazy_from('vertexai.preview.generative_models', 'GenerativeModel')
+By = lazy_from('selenium.webdriver.common.by', 'By')
+WebDriverWait = lazy_from('selenium.webdriver.support.ui', 'WebDriverWait')
+EC = lazy_import('selenium.webdriver.support.expected_conditions')
 
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -40,14 +53,98 @@ PHONE_NUMBER_ID = os.getenv('PHONE_NUMBER_ID', '').strip()
 VERIFY_TOKEN = os.getenv('VERIFY_TOKEN', 'myverifytoken123').strip()
 GOOGLE_PROJECT_ID = os.getenv('GOOGLE_PROJECT_ID', 'inhouse-vertex-final').strip()
 GOOGLE_LOCATION = os.getenv('GOOGLE_LOCATION', 'us-central1').strip()
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash').strip()
 CLOUDINARY_CLOUD_NAME = os.getenv('CLOUDINARY_CLOUD_NAME', '').strip()
 CLOUDINARY_API_KEY = os.getenv('CLOUDINARY_API_KEY', '').strip()
 CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET', '').strip()
+CLOUDINARY_UPLOAD_PREFIX = os.getenv('CLOUDINARY_UPLOAD_PREFIX', '').strip()
 
 # Instagram Graph API Configuration
 INSTAGRAM_APP_ID = os.getenv('INSTAGRAM_APP_ID', '').strip()
 INSTAGRAM_APP_SECRET = os.getenv('INSTAGRAM_APP_SECRET', '').strip()
 INSTAGRAM_REDIRECT_URI = os.getenv('INSTAGRAM_REDIRECT_URI', 'https://whatsapp-instagram-bot.onrender.com/instagram/callback').strip()
+INSTAGRAM_GRAPH_URL = os.getenv('INSTAGRAM_GRAPH_URL', 'https://graph.instagram.com').strip().rstrip('/')
+# Comment enrichment: concurrent lookups per catalog, rate-limited per access token
+COMMENT_FETCH_WORKERS = int(os.getenv('COMMENT_FETCH_WORKERS', '5'))
+COMMENT_FETCH_RATE = float(os.getenv('COMMENT_FETCH_RATE', '5'))
+COMMENT_FETCH_BURST = int(os.getenv('COMMENT_FETCH_BURST', '10'))
+COMMENT_FETCH_BATCH_SIZE = int(os.getenv('COMMENT_FETCH_BATCH_SIZE', '50'))
+# Media sync: all of /me/media on the first run, then only what's newer than the last run
+MEDIA_SYNC_BACKEND = os.getenv('MEDIA_SYNC_BACKEND', 'sqlite').strip()
+MEDIA_SYNC_PAGE_SIZE = int(os.getenv('MEDIA_SYNC_PAGE_SIZE', '50'))
+MEDIA_SYNC_MAX_PAGES = int(os.getenv('MEDIA_SYNC_MAX_PAGES', '20'))
+MEDIA_SYNC_FULL_INTERVAL = int(os.getenv('MEDIA_SYNC_FULL_INTERVAL', str(7 * 24 * 3600)))
+
+# Background job pool (bounds concurrent scrapes / Chrome instances per worker)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv('JOB_QUEUE_MAX_DEPTH', '20'))
+JOB_DRAIN_TIMEOUT = int(os.getenv('JOB_DRAIN_TIMEOUT', '60'))
+
+# Webhook ingest: acknowledge Meta immediately and parse/reply on dispatcher threads
+WEBHOOK_ASYNC_DISPATCH = os.getenv('WEBHOOK_ASYNC_DISPATCH', 'true').strip().lower() != 'false'
+WEBHOOK_DISPATCH_WORKERS = int(os.getenv('WEBHOOK_DISPATCH_WORKERS', '4'))
+WEBHOOK_DISPATCH_MAX_DEPTH = int(os.getenv('WEBHOOK_DISPATCH_MAX_DEPTH', '500'))
+WHATSAPP_API_URL = os.getenv('WHATSAPP_API_URL', 'https://graph.facebook.com/v22.0').strip().rstrip('/')
+
+# Outbound HTTP (shared keep-alive pools)
+HTTP_DEFAULT_TIMEOUT = int(os.getenv('HTTP_DEFAULT_TIMEOUT', '15'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))
+# Meta-only profile fetches stop reading at </head>; give up on pages without one after this many bytes
+META_STREAM_MAX_BYTES = int(os.getenv('META_STREAM_MAX_BYTES', '1048576'))
+
+# Local state (SQLite files for stores shared between gunicorn workers)
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(tempfile.gettempdir(), 'whatsapp-instagram-bot')).strip()
+
+# Seen-message index: drops Meta redeliveries of the same WhatsApp message id
+MESSAGE_DEDUP_BACKEND = os.getenv('MESSAGE_DEDUP_BACKEND', 'memory').strip()
+MESSAGE_DEDUP_TTL = int(os.getenv('MESSAGE_DEDUP_TTL', str(24 * 3600)))
+MESSAGE_DEDUP_MAX_ENTRIES = int(os.getenv('MESSAGE_DEDUP_MAX_ENTRIES', '50000'))
+
+# Catalog job status, shared by every worker so /status and the "already working" guard agree
+JOB_STATUS_BACKEND = os.getenv('JOB_STATUS_BACKEND', 'sqlite').strip()
+JOB_STATUS_STALE_TTL = int(os.getenv('JOB_STATUS_STALE_TTL', str(15 * 60)))
+
+# Extracted Instagram profiles: fresh for PROFILE_CACHE_TTL, then served stale while refreshing
+PROFILE_CACHE_BACKEND = os.getenv('PROFILE_CACHE_BACKEND', 'memory').strip()
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', str(6 * 3600)))
+PROFILE_CACHE_STALE_TTL = int(os.getenv('PROFILE_CACHE_STALE_TTL', str(7 * 24 * 3600)))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '2000'))
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0').strip()
+
+# Instagram extraction methods run concurrently; the first good result wins
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '12'))
+EXTRACTION_DEADLINE = int(os.getenv('EXTRACTION_DEADLINE', '45'))
+
+# Warm headless Chrome pool shared by every Selenium extraction in this process
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', '50'))
+BROWSER_MAX_RSS_MB = int(os.getenv('BROWSER_MAX_RSS_MB', '1024'))
+BROWSER_IDLE_TIMEOUT = int(os.getenv('BROWSER_IDLE_TIMEOUT', '300'))
+
+# Generated catalogs: gzip'd HTML in SQLite (shared by all workers), hot pages cached in memory
+CATALOG_DB_PATH = os.getenv('CATALOG_DB_PATH', os.path.join(DATA_DIR, 'catalogs.db')).strip()
+CATALOG_HOT_CACHE_SIZE = int(os.getenv('CATALOG_HOT_CACHE_SIZE', '64'))
+CATALOG_CACHE_MAX_AGE = int(os.getenv('CATALOG_CACHE_MAX_AGE', '60'))
+VISION_API_ENDPOINT = os.getenv('VISION_API_ENDPOINT', '').strip()
+VISION_BATCH_SIZE = int(os.getenv('VISION_BATCH_SIZE', '16'))
+IMAGE_DOWNLOAD_WORKERS = int(os.getenv('IMAGE_DOWNLOAD_WORKERS', '6'))
+IMAGE_UPLOAD_WORKERS = int(os.getenv('IMAGE_UPLOAD_WORKERS', '4'))
+THUMBNAIL_SIZE = int(os.getenv('THUMBNAIL_SIZE', '320'))
+# Largest image each consumer gets: Vision's OCR gains nothing past ~1024px, Cloudinary re-encodes anyway
+VISION_IMAGE_MAX_SIDE = int(os.getenv('VISION_IMAGE_MAX_SIDE', '1024'))
+UPLOAD_IMAGE_MAX_SIDE = int(os.getenv('UPLOAD_IMAGE_MAX_SIDE', '1600'))
+IMAGE_DEDUPE_DISTANCE = int(os.getenv('IMAGE_DEDUPE_DISTANCE', '4'))
+VISION_CACHE_BACKEND = os.getenv('VISION_CACHE_BACKEND', 'sqlite').strip()
+VISION_CACHE_TTL = int(os.getenv('VISION_CACHE_TTL', str(30 * 24 * 3600)))
+VISION_CACHE_MAX_ENTRIES = int(os.getenv('VISION_CACHE_MAX_ENTRIES', '50000'))
+VISION_CACHE_MAX_DISTANCE = int(os.getenv('VISION_CACHE_MAX_DISTANCE', '3'))
+# Gemini product suggestions: cached per (normalized) prompt; suggest_many asks about many businesses per call
+GEMINI_CACHE_BACKEND = os.getenv('GEMINI_CACHE_BACKEND', 'sqlite').strip()
+GEMINI_CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', str(7 * 24 * 3600)))
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv('GEMINI_CACHE_MAX_ENTRIES', '20000'))
+GEMINI_BATCH_SIZE = int(os.getenv('GEMINI_BATCH_SIZE', '10'))
+GEMINI_JSON_MODE = os.getenv('GEMINI_JSON_MODE', 'true').strip().lower() != 'false'
 
 # Google Cloud Authentication Setup
 def setup_google_cloud_auth():
@@ -84,40 +181,197 @@ def setup_google_cloud_auth():
     print("❌ No Google Cloud authentication method found")
     return False
 
-# Setup authentication
-GOOGLE_AUTH_AVAILABLE = setup_google_cloud_auth()
+def report_google_cloud_setup():
+    """Auth probe plus the Vertex AI readiness messages; runs in the background at startup"""
+    available = setup_google_cloud_auth()
+    if GOOGLE_PROJECT_ID and available:
+        print(f"✅ Vertex AI will use project: {GOOGLE_PROJECT_ID}")
+    else:
+        if not GOOGLE_PROJECT_ID:
+            print("⚠️  Warning: GOOGLE_PROJECT_ID not configured")
+        if not available:
+            print("⚠️  Warning: Google Cloud authentication not available")
+        print("⚠️  Vertex AI will use fallback mode")
+    return available
+
+# Probing for credentials can take seconds (metadata server timeouts, gcloud), so it runs off
+# the import path; code that needs the answer waits for it
+google_auth_check = BackgroundCheck(report_google_cloud_setup, name='google-auth-probe')
+
+def google_auth_available(timeout=None):
+    return bool(google_auth_check.result(timeout))
+
+# Configure Cloudinary the first time it is used
+def configure_cloudinary(module):
+    if CLOUDINARY_CLOUD_NAME:
+        module.config(
+            cloud_name=CLOUDINARY_CLOUD_NAME,
+            api_key=CLOUDINARY_API_KEY,
+            api_secret=CLOUDINARY_API_SECRET,
+            # Points the SDK at a proxy or local stub instead of api.cloudinary.com
+            upload_prefix=CLOUDINARY_UPLOAD_PREFIX or None
+        )
 
-# Configure Cloudinary
-if CLOUDINARY_CLOUD_NAME:
-    cloudinary.config(
-        cloud_name=CLOUDINARY_CLOUD_NAME,
-        api_key=CLOUDINARY_API_KEY,
-        api_secret=CLOUDINARY_API_SECRET
-    )
+cloudinary = lazy_import('cloudinary', on_load=configure_cloudinary)
 
-# Configure Google Cloud Vertex AI
-if GOOGLE_PROJECT_ID and GOOGLE_AUTH_AVAILABLE:
-    try:
-        vertexai.init(project=GOOGLE_PROJECT_ID, location=GOOGLE_LOCATION)
-        print(f"✅ Initialized Vertex AI with project: {GOOGLE_PROJECT_ID}")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not initialize Vertex AI: {e}")
-else:
-    if not GOOGLE_PROJECT_ID:
-        print("⚠️  Warning: GOOGLE_PROJECT_ID not configured")
-    if not GOOGLE_AUTH_AVAILABLE:
-        print("⚠️  Warning: Google Cloud authentication not available")
-    print("⚠️  Vertex AI will use fallback mode")
+# Vision and Gemini clients are built on first use in each worker process and then shared by
+# every request; one set of Google credentials is kept fresh by a background thread
+def load_shared_google_credentials():
+    return load_google_credentials() if google_auth_available() else None
 
-# Global vision client will be initialized per request to avoid auth issues
+clients = ClientRegistry(credentials_loader=load_shared_google_credentials)
+
+def create_gemini_model():
+    vertexai.init(project=GOOGLE_PROJECT_ID, location=GOOGLE_LOCATION, credentials=clients.credentials)
+    return GenerativeModel(GEMINI_MODEL)
+
+clients.register('vision', lambda: create_vision_client(
+    VISION_API_ENDPOINT, credentials=None if VISION_API_ENDPOINT else clients.credentials
+))
+clients.register('gemini', create_gemini_model)
 
 # Store generated websites and processing status
-generated_websites = {}
-processing_status = {}
+catalog_store = CatalogStore(CATALOG_DB_PATH, hot_cache_size=CATALOG_HOT_CACHE_SIZE)
+
+# Shared catalog CSS/JS, content-hashed so every catalog page references one cacheable copy
+static_assets = StaticBundle()
+
+def asset_url(filename):
+    return static_assets.url(filename)
 
 # Store Instagram access tokens (in production, use a proper database)
 instagram_tokens = {}
 
+# Every outbound call goes through one pooled client so TCP/TLS connections are reused
+http_client = PooledHTTPClient(
+    default_timeout=HTTP_DEFAULT_TIMEOUT,
+    pool_size=HTTP_POOL_SIZE,
+    retries=HTTP_RETRIES,
+    host_policies={
+        urlsplit(WHATSAPP_API_URL).hostname: {'pool_size': 20, 'timeout': 10},
+        urlsplit(INSTAGRAM_GRAPH_URL).hostname: {'pool_size': 10},
+        'api.instagram.com': {'retries': 0},  # OAuth codes are single-use
+        'www.instagram.com': {'pool_size': 4, 'retries': 0},  # Retrying a block just gets us blocked harder
+        'i.instagram.com': {'pool_size': 4, 'retries': 0},
+        'm.instagram.com': {'pool_size': 4, 'retries': 0},
+        'app.scrapingbee.com': {'pool_size': 4, 'retries': 1, 'timeout': 30}
+    }
+)
+
+# Post comments for the API flow: one multi-ID Graph request, or a bounded concurrent fan-out
+comment_fetcher = CommentFetcher(
+    http_client,
+    base_url=INSTAGRAM_GRAPH_URL,
+    max_workers=COMMENT_FETCH_WORKERS,
+    rate=COMMENT_FETCH_RATE,
+    burst=COMMENT_FETCH_BURST,
+    batch_size=COMMENT_FETCH_BATCH_SIZE
+)
+
+# Catalog jobs run on a fixed worker pool; bursts wait in line instead of spawning threads
+job_queue = JobQueue('catalog-jobs', num_workers=JOB_WORKERS, max_depth=JOB_QUEUE_MAX_DEPTH)
+
+# Incoming webhook payloads are parsed and answered here, outside the Meta callback
+webhook_dispatcher = JobQueue('webhook-dispatch', num_workers=WEBHOOK_DISPATCH_WORKERS, max_depth=WEBHOOK_DISPATCH_MAX_DEPTH)
+
+# Job state per username; in-flight states expire after JOB_STATUS_STALE_TTL if a worker dies mid-job
+job_status = JobStatusStore(
+    create_store(JOB_STATUS_BACKEND, 'job_status', data_dir=DATA_DIR, redis_url=REDIS_URL),
+    stale_ttl=JOB_STATUS_STALE_TTL
+)
+
+# Message ids we've already handled (bounded, expires after MESSAGE_DEDUP_TTL)
+seen_messages = create_store(MESSAGE_DEDUP_BACKEND, 'seen_messages', max_entries=MESSAGE_DEDUP_MAX_ENTRIES, data_dir=DATA_DIR, redis_url=REDIS_URL)
+
+# Only profiles that came from Instagram are worth caching; generated ones should be retried
+GENERATED_PROFILE_SOURCES = ('intelligent_generation', 'basic_fallback')
+
+profile_cache = ProfileCache(
+    create_store(PROFILE_CACHE_BACKEND, 'profiles', max_entries=PROFILE_CACHE_MAX_ENTRIES, data_dir=DATA_DIR, redis_url=REDIS_URL),
+    ttl=PROFILE_CACHE_TTL,
+    stale_ttl=PROFILE_CACHE_STALE_TTL,
+    should_cache=lambda profile: bool(profile and profile.get('success') and profile.get('source') not in GENERATED_PROFILE_SOURCES)
+)
+
+# Media already seen per Instagram account, so API-flow refreshes only fetch and analyze new posts
+media_sync = MediaSync(
+    http_client,
+    create_store(MEDIA_SYNC_BACKEND, 'media_sync', max_entries=5000, data_dir=DATA_DIR, redis_url=REDIS_URL),
+    base_url=INSTAGRAM_GRAPH_URL,
+    page_size=MEDIA_SYNC_PAGE_SIZE,
+    max_pages=MEDIA_SYNC_MAX_PAGES,
+    full_sync_interval=MEDIA_SYNC_FULL_INTERVAL
+)
+
+# Product and profile images: each downloaded once, then colour extraction, thumbnailing,
+# Cloudinary upload and perceptual hashing run on it in parallel (stage functions are defined
+# further down)
+image_pipeline = ImagePipeline(http_client, download_workers=IMAGE_DOWNLOAD_WORKERS)
+image_pipeline.stage('colors', lambda url, content, **options: brand_colors_from_bytes(content), workers=1)
+image_pipeline.stage('upload', lambda url, content, folder='instagram_products', **options:
+                     upload_image_to_cloudinary(url, folder, content=downscale_jpeg(content, UPLOAD_IMAGE_MAX_SIDE)),
+                     workers=IMAGE_UPLOAD_WORKERS)
+image_pipeline.stage('thumbnail', lambda url, content, folder='instagram_products', **options:
+                     upload_thumbnail(content, f"{folder}/thumbnails"), workers=IMAGE_UPLOAD_WORKERS)
+image_pipeline.stage('signature', lambda url, content, **options: (image_signature(content), content),
+                     workers=IMAGE_DOWNLOAD_WORKERS)
+
+# Vision results per post image (by content hash, then perceptual hash) so regenerating a
+# catalog only annotates images Vision has not seen
+vision_cache = AnnotationCache(
+    create_store(VISION_CACHE_BACKEND, 'vision_annotations', max_entries=VISION_CACHE_MAX_ENTRIES, data_dir=DATA_DIR, redis_url=REDIS_URL),
+    ttl=VISION_CACHE_TTL,
+    max_distance=VISION_CACHE_MAX_DISTANCE
+)
+
+# Gemini product ideas per business, shared by every worker; JSON replies, batched by suggest_many
+gemini_products = GeminiProductSuggester(
+    lambda: clients.get('gemini'),
+    create_store(GEMINI_CACHE_BACKEND, 'gemini_products', max_entries=GEMINI_CACHE_MAX_ENTRIES, data_dir=DATA_DIR, redis_url=REDIS_URL),
+    model_name=GEMINI_MODEL,
+    ttl=GEMINI_CACHE_TTL,
+    batch_size=GEMINI_BATCH_SIZE,
+    json_mode=GEMINI_JSON_MODE
+)
+
+# Background refreshes of stale cached profiles (one at a time, never blocks a user)
+profile_refresh_queue = JobQueue('profile-refresh', num_workers=1, max_depth=50)
+
+# Shared pool the extraction methods race on, with per-method win rates and latencies
+profile_extractor = HedgedExtractor('extraction', max_workers=EXTRACTION_WORKERS, deadline=EXTRACTION_DEADLINE)
+
+# Selenium extractions lease browsers from here; Chrome is started at most BROWSER_POOL_SIZE times
+browser_pool = get_shared_pool(
+    max_size=BROWSER_POOL_SIZE,
+    max_pages=BROWSER_MAX_PAGES,
+    max_rss_mb=BROWSER_MAX_RSS_MB,
+    idle_timeout=BROWSER_IDLE_TIMEOUT
+)
+
+def is_duplicate_message(message_id):
+    """Record a WhatsApp message id; True if it was already seen (a Meta redelivery)"""
+    if not message_id:
+        return False
+    try:
+        return not seen_messages.add(message_id, 1, ttl=MESSAGE_DEDUP_TTL)
+    except Exception as e:
+        # Never drop real messages because the index is unavailable
+        print(f"⚠️ Dedup index error: {e}")
+        return False
+
+def drain_background_jobs(timeout=None):
+    """Let queued webhooks and catalog jobs finish before the process exits (called from gunicorn worker_exit)"""
+    timeout = JOB_DRAIN_TIMEOUT if timeout is None else timeout
+    deadline = time.time() + timeout
+    print(f"🛑 Draining background jobs: dispatch={webhook_dispatcher.stats()} catalog={job_queue.stats()}")
+    # Dispatcher first: pending webhooks may still queue catalog jobs
+    dispatched = webhook_dispatcher.shutdown(drain=True, timeout=timeout)
+    profile_refresh_queue.shutdown(drain=False, timeout=5)
+    drained = job_queue.shutdown(drain=True, timeout=max(0, deadline - time.time()))
+    # Catalog jobs may still be holding browsers, so the pool closes last
+    browser_pool.close()
+    return drained and dispatched
+
 def get_instagram_auth_url(username):
     """Generate Instagram OAuth authorization URL for Instagram Business Login"""
     if not INSTAGRAM_APP_ID:
@@ -142,7 +396,7 @@ def exchange_code_for_token(code):
     }
     
     try:
-        response = requests.post(token_url, data=data)
+        response = http_client.post(token_url, data=data)
         if response.status_code == 200:
             return response.json()
         else:
@@ -157,10 +411,10 @@ def get_long_lived_token(short_token):
     if not INSTAGRAM_APP_SECRET:
         return short_token
     
-    exchange_url = f"https://graph.instagram.com/access_token?grant_type=ig_exchange_token&client_secret={INSTAGRAM_APP_SECRET}&access_token={short_token}"
+    exchange_url = f"{INSTAGRAM_GRAPH_URL}/access_token?grant_type=ig_exchange_token&client_secret={INSTAGRAM_APP_SECRET}&access_token={short_token}"
     
     try:
-        response = requests.get(exchange_url)
+        response = http_client.get(exchange_url)
         if response.status_code == 200:
             data = response.json()
             return data.get('access_token', short_token)
@@ -175,8 +429,8 @@ def fetch_instagram_profile_api(access_token):
     """Fetch Instagram profile data using Basic Display API (Instagram Business Login)"""
     try:
         # Get user profile using Instagram Basic Display API
-        profile_url = f"https://graph.instagram.com/me?fields=id,username,media_count&access_token={access_token}"
-        profile_response = requests.get(profile_url)
+        profile_url = f"{INSTAGRAM_GRAPH_URL}/me?fields=id,username,media_count&access_token={access_token}"
+        profile_response = http_client.get(profile_url)
         
         if profile_response.status_code != 200:
             print(f"Profile fetch failed: {profile_response.text}")
@@ -184,28 +438,18 @@ def fetch_instagram_profile_api(access_token):
         
         profile_data = profile_response.json()
         
-        # Get user media using Instagram Basic Display API
-        media_url = f"https://graph.instagram.com/me/media?fields=id,caption,media_type,media_url,thumbnail_url,timestamp&access_token={access_token}"
-        media_response = requests.get(media_url)
-        
-        if media_response.status_code != 200:
-            print(f"Media fetch failed: {media_response.text}")
+        # All media, following paging cursors; after the first run only what's new since the last one
+        try:
+            sync = media_sync.sync(profile_data['id'], access_token)
+        except Exception as sync_error:
+            print(f"Media fetch failed: {sync_error}")
             return profile_data
         
-        media_data = media_response.json()
-        posts = []
-        
-        for item in media_data.get('data', []):
-            post = {
-                'id': item.get('id'),
-                'image': item.get('media_url') or item.get('thumbnail_url'),
-                'caption': item.get('caption', ''),
-                'timestamp': item.get('timestamp'),
-                'likes': 0,  # Not available in Basic Display API
-                'comments': 0,  # Not available in Basic Display API
-                'media_type': item.get('media_type', 'IMAGE')
-            }
-            posts.append(post)
+        posts = [post_from_media(item) for item in sync['media']]
+        updated_ids = {item['id'] for item in sync['new'] + sync['changed']}
+        profile_data['updated_posts'] = [post for post in posts if post['id'] in updated_ids]
+        profile_data['removed_post_ids'] = sync['removed']
+        profile_data['full_sync'] = sync['full']
         
         profile_data['posts'] = posts
         profile_data['post_count'] = len(posts)
@@ -218,20 +462,21 @@ def fetch_instagram_profile_api(access_token):
         print(f"Error fetching Instagram data via Basic Display API: {e}")
         return None
 
+def post_from_media(item):
+    """Graph API media item -> the post dict the catalog pipeline uses"""
+    return {
+        'id': item.get('id'),
+        'image': item.get('media_url') or item.get('thumbnail_url'),
+        'caption': item.get('caption', ''),
+        'timestamp': item.get('timestamp'),
+        'likes': 0,  # Not available in Basic Display API
+        'comments': 0,  # Not available in Basic Display API
+        'media_type': item.get('media_type', 'IMAGE')
+    }
+
 def fetch_instagram_comments(media_id, access_token, limit=10):
-    """Fetch comments for a specific Instagram post"""
-    try:
-        comments_url = f"https://graph.instagram.com/{media_id}/comments?fields=id,text,timestamp,username&limit={limit}&access_token={access_token}"
-        response = requests.get(comments_url)
-        
-        if response.status_code == 200:
-            return response.json().get('data', [])
-        else:
-            print(f"Comments fetch failed: {response.text}")
-            return []
-    except Exception as e:
-        print(f"Error fetching comments: {e}")
-        return []
+    """Fetch comments for a specific Instagram post (shares the per-token rate limit)"""
+    return comment_fetcher.fetch([media_id], access_token, limit=limit).get(media_id, [])
 
 def extract_instagram_username(url):
     """Extract Instagram username from URL"""
@@ -255,132 +500,124 @@ def scrape_instagram_profile_advanced(username):
     try:
         print(f"🔄 Starting Instagram scraping for {username}")
         
-        # Method 1: Try instagram-scraper library first
-        print("📚 Trying instagram-scraper library...")
-        profile_data = scrape_instagram_with_library(username)
-        if profile_data and len(profile_data.get('posts', [])) > 0:
-            print(f"✅ Instagram-scraper successful: {len(profile_data['posts'])} posts")
+        # instagram-scraper library and simple HTML scraping race each other;
+        # Selenium only starts if neither of them found any posts
+        profile_data, method, completed = profile_extractor.run(
+            username,
+            [
+                ('instagram_scraper', scrape_instagram_with_library),
+                ('simple_html', scrape_instagram_simple)
+            ],
+            is_acceptable=lambda data: bool(data and len(data.get('posts', [])) > 0),
+            escalation=[('selenium_posts', scrape_instagram_with_selenium)]
+        )
+        if profile_data:
+            print(f"✅ {method} successful: {len(profile_data['posts'])} posts")
             return profile_data
         
-        print("⚠️ Instagram-scraper failed, trying Selenium...")
+        # No posts anywhere - fall back to the simple scrape's profile info
+        return completed.get('simple_html')
         
-        # Method 2: Fallback to Selenium scraping
-        # Setup Chrome driver for Instagram scraping
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+    except Exception as e:
+        print(f"Error in advanced scraping: {e}")
+        # Fallback to simple scraping
+        return scrape_instagram_simple(username)
+
+def scrape_instagram_with_selenium(username):
+    """Selenium scraping of the profile page and its first 9 posts"""
+    try:
+        # Warm browser from the shared pool instead of starting Chrome per username
+        with browser_pool.lease() as driver:
+            url = f"https://www.instagram.com/{username}/"
+            driver.get(url)
         
-        try:
-            # Install and setup ChromeDriver with fix for ARM64 Mac
-            driver_path = ChromeDriverManager().install()
-            # Fix for ARM64 Mac - webdriver manager sometimes points to wrong file
-            if 'THIRD_PARTY_NOTICES' in driver_path:
-                import os
-                driver_dir = os.path.dirname(driver_path)
-                actual_driver = os.path.join(driver_dir, 'chromedriver')
-                if os.path.exists(actual_driver):
-                    driver_path = actual_driver
-            
-            service = webdriver.chrome.service.Service(driver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        except Exception as driver_error:
-            print(f"WebDriver setup error: {driver_error}")
-            # Fallback to simple scraping if Chrome not available
-            return scrape_instagram_simple(username)
+            # Wait for page to load
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "article"))
+            )
         
-        url = f"https://www.instagram.com/{username}/"
-        driver.get(url)
+            # Extract profile information
+            profile_data = {}
         
-        # Wait for page to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "article"))
-        )
+            try:
+                # Get display name
+                profile_name = driver.find_element(By.XPATH, "//h2[contains(@class, '_aa_a')]").text
+                profile_data['display_name'] = profile_name
+            except:
+                profile_data['display_name'] = username.title()
         
-        # Extract profile information
-        profile_data = {}
+            try:
+                # Get bio
+                bio_element = driver.find_element(By.XPATH, "//div[contains(@class, '_aa_c')]//span")
+                profile_data['bio'] = bio_element.text
+            except:
+                profile_data['bio'] = ''
         
-        try:
-            # Get display name
-            profile_name = driver.find_element(By.XPATH, "//h2[contains(@class, '_aa_a')]").text
-            profile_data['display_name'] = profile_name
-        except:
-            profile_data['display_name'] = username.title()
+            try:
+                # Get profile picture
+                profile_pic = driver.find_element(By.XPATH, "//img[contains(@alt, 'profile picture')]").get_attribute('src')
+                profile_data['profile_pic'] = profile_pic
+            except:
+                profile_data['profile_pic'] = None
         
-        try:
-            # Get bio
-            bio_element = driver.find_element(By.XPATH, "//div[contains(@class, '_aa_c')]//span")
-            profile_data['bio'] = bio_element.text
-        except:
-            profile_data['bio'] = ''
+            # Extract post images and captions
+            posts = []
+            try:
+                # Scroll to load more posts
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                time.sleep(2)
         
-        try:
-            # Get profile picture
-            profile_pic = driver.find_element(By.XPATH, "//img[contains(@alt, 'profile picture')]").get_attribute('src')
-            profile_data['profile_pic'] = profile_pic
-        except:
-            profile_data['profile_pic'] = None
-        
-        # Extract post images and captions
-        posts = []
-        try:
-            # Scroll to load more posts
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            # Get post links
-            post_links = driver.find_elements(By.XPATH, "//article//a[contains(@href, '/p/')]")[:9]  # Get first 9 posts
-            
-            for link in post_links:
-                post_url = link.get_attribute('href')
-                try:
-                    # Get post image
-                    img_element = link.find_element(By.TAG_NAME, "img")
-                    img_src = img_element.get_attribute('src')
-                    
-                    # Navigate to post to get caption
-                    driver.execute_script("window.open('');")
-                    driver.switch_to.window(driver.window_handles[1])
-                    driver.get(post_url)
-                    
-                    time.sleep(2)
-                    
-                    # Extract caption
-                    caption = ""
+                # Get post links
+                post_links = driver.find_elements(By.XPATH, "//article//a[contains(@href, '/p/')]")[:9]  # Get first 9 posts
+        
+                for link in post_links:
+                    post_url = link.get_attribute('href')
                     try:
-                        caption_element = driver.find_element(By.XPATH, "//article//span[contains(@class, '_aacl')]")
-                        caption = caption_element.text
-                    except:
+                        # Get post image
+                        img_element = link.find_element(By.TAG_NAME, "img")
+                        img_src = img_element.get_attribute('src')
+        
+                        # Navigate to post to get caption
+                        driver.execute_script("window.open('');")
+                        driver.switch_to.window(driver.window_handles[1])
+                        driver.get(post_url)
+        
+                        time.sleep(2)
+        
+                        # Extract caption
+                        caption = ""
                         try:
-                            caption_element = driver.find_element(By.XPATH, "//meta[@property='og:description']")
-                            caption = caption_element.get_attribute('content')
+                            caption_element = driver.find_element(By.XPATH, "//article//span[contains(@class, '_aacl')]")
+                            caption = caption_element.text
                         except:
-                            caption = ""
-                    
-                    posts.append({
-                        'url': post_url,
-                        'image': img_src,
-                        'caption': caption,
-                        'alt_text': img_element.get_attribute('alt') or ''
-                    })
-                    
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-                    
-                except Exception as e:
-                    print(f"Error extracting post: {e}")
-                    if len(driver.window_handles) > 1:
+                            try:
+                                caption_element = driver.find_element(By.XPATH, "//meta[@property='og:description']")
+                                caption = caption_element.get_attribute('content')
+                            except:
+                                caption = ""
+        
+                        posts.append({
+                            'url': post_url,
+                            'image': img_src,
+                            'caption': caption,
+                            'alt_text': img_element.get_attribute('alt') or ''
+                        })
+        
                         driver.close()
                         driver.switch_to.window(driver.window_handles[0])
-                    continue
+        
+                    except Exception as e:
+                        print(f"Error extracting post: {e}")
+                        if len(driver.window_handles) > 1:
+                            driver.close()
+                            driver.switch_to.window(driver.window_handles[0])
+                        continue
                 
-        except Exception as e:
-            print(f"Error extracting posts: {e}")
+                # Each post opened in its own tab counts towards the browser's recycle limit
+                browser_pool.record_pages(driver, len(post_links))
         
-        driver.quit()
+            except Exception as e:
+                print(f"Error extracting posts: {e}")
         
         profile_data.update({
             'username': username,
@@ -391,9 +628,8 @@ def scrape_instagram_profile_advanced(username):
         return profile_data
         
     except Exception as e:
-        print(f"Error in advanced scraping: {e}")
-        # Fallback to simple scraping
-        return scrape_instagram_simple(username)
+        print(f"Error in Selenium scraping: {e}")
+        return None
 
 def scrape_instagram_simple(username):
     """Fallback simple Instagram scraping"""
@@ -403,36 +639,25 @@ def scrape_instagram_simple(username):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_client.get(url, headers=headers, timeout=15)
         if response.status_code != 200:
             return None
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract basic profile data
-        profile_pic = None
-        og_image = soup.find('meta', property='og:image')
-        if og_image:
-            profile_pic = og_image.get('content')
-        
-        description = soup.find('meta', property='og:description')
-        bio = description.get('content', '') if description else ''
-        
-        title = soup.find('meta', property='og:title')
-        display_name = title.get('content', username).replace(' • Instagram', '') if title else username
+        meta = parse_meta(response.text)
+        profile_pic = meta.get('og:image')
+        bio = meta.get('og:description', '')
+        display_name = meta.get('og:title', username).replace(' • Instagram', '')
         
         # Extract images from page
-        images = []
-        img_tags = soup.find_all('img', src=True)
-        for img in img_tags:
-            src = img.get('src')
-            if src and 'instagram' in src and 'avatar' not in src and 'scontent' in src:
-                images.append({
-                    'image': src,
-                    'caption': img.get('alt', ''),
-                    'url': f"https://instagram.com/{username}/",
-                    'alt_text': img.get('alt', '')
-                })
+        images = [
+            {
+                'image': src,
+                'caption': alt,
+                'url': f"https://instagram.com/{username}/",
+                'alt_text': alt
+            }
+            for src, alt in post_images(response.text, limit=6)
+        ]
         
         return {
             'username': username,
@@ -447,638 +672,402 @@ def scrape_instagram_simple(username):
         print(f"Error in simple scraping: {e}")
         return None
 
-def extract_from_api_response(api_data, username):
-    """Extract Instagram data from API response"""
+def get_real_instagram_data(username):
+    """Instagram data for a username, served from the profile cache when we have it"""
     try:
-        # Handle different API response formats
-        user_data = api_data.get('data', {}) or api_data.get('user', {}) or api_data
-        
-        # Extract basic info
-        full_name = user_data.get('full_name', '') or user_data.get('name', '')
-        bio = user_data.get('biography', '') or user_data.get('bio', '')
-        followers = user_data.get('follower_count', 0) or user_data.get('followers', 0)
-        post_count = user_data.get('media_count', 0) or user_data.get('posts', 0)
-        profile_pic = user_data.get('profile_pic_url', '') or user_data.get('profile_picture', '')
+        return profile_cache.get_or_fetch(username, fetch_real_instagram_data, schedule_refresh=profile_refresh_queue.submit)
+    except Exception as cache_error:
+        print(f"⚠️ Profile cache unavailable: {cache_error}")
+        return fetch_real_instagram_data(username)
+
+def has_real_profile_data(data):
+    """Data-quality bar for an extracted profile: a name, a bio or a follower count"""
+    if not data or not data.get('success'):
+        return False
+    full_name = data.get('full_name') or ''
+    bio = data.get('bio') or ''
+    return bool(full_name.strip() or bio.strip() or (data.get('followers') or 0) > 0)
+
+def normalize_extraction_result(result, method):
+    """Map the older display_name/follower_count keys onto full_name/followers and tag the source"""
+    if not result:
+        return {'success': False}
+    if 'full_name' not in result and 'display_name' in result:
+        result['full_name'] = result['display_name']
+    if 'followers' not in result and 'follower_count' in result:
+        result['followers'] = result['follower_count']
+    result.setdefault('source', method)
+    return result
+
+def fetch_real_instagram_data(username):
+    """Extract REAL Instagram data: race the cheap methods, escalate to Selenium, then generate"""
+    try:
+        print(f"🔍 EXTRACTING REAL DATA for @{username}")
         
-        if full_name or bio:
-            result = {
-                'bio': bio,
-                'full_name': full_name or username.replace('.', ' ').replace('_', ' ').title(),
-                'followers': followers,
-                'post_count': post_count,
-                'profile_pic_url': profile_pic,
-                'posts': [],
-                'username': username,
-                'success': True
-            }
-            
-            print(f"🎉 API EXTRACTION SUCCESS:")
-            print(f"   Name: {full_name}")
-            print(f"   Bio: {bio[:100]}...")
-            print(f"   Followers: {followers:,}")
-            print(f"   Posts: {post_count}")
-            
+        result, method, _ = profile_extractor.run(
+            username,
+            [
+                ('scrapingbee', try_scrapingbee_extraction),
+                ('cloudscraper', try_cloudscraper_extraction),
+                ('graph_endpoints', try_graph_endpoints_extraction),
+                ('api_endpoints', try_api_endpoints),
+                ('mobile_html', try_mobile_html_extraction),
+                ('direct_html', try_direct_extraction)
+            ],
+            is_acceptable=has_real_profile_data,
+            escalation=[('selenium', try_selenium_extraction)],
+            normalize=normalize_extraction_result
+        )
+        if result:
+            print(f"✅ REAL DATA for @{username} from {method}")
             return result
         
-        return {'success': False}
+        print(f"❌ ALL REAL DATA EXTRACTION METHODS FAILED for @{username}")
+        print(f"❌ Instagram has blocked access from this server")
+        print(f"🔄 Using intelligent generation as final fallback...")
+        return generate_profile_from_username(username)
         
     except Exception as e:
-        print(f"❌ API response extraction error: {e}")
-        return {'success': False}
+        print(f"❌ Critical error in Instagram extraction: {e}")
+        return {
+            'bio': '',
+            'full_name': username.replace('.', ' ').replace('_', ' ').title(),
+            'followers': 0,
+            'post_count': 0,
+            'profile_pic_url': '',
+            'posts': [],
+            'username': username,
+            'success': False
+        }
 
-def extract_from_html(html_or_soup, username):
-    """Extract Instagram data from HTML content"""
+def try_scrapingbee_extraction(username):
+    """ScrapingBee API (production-ready Instagram scraping, handles JS and anti-bot)"""
+    print(f"🔄 ScrapingBee API...")
     try:
-        # Handle both HTML string and BeautifulSoup object
-        if isinstance(html_or_soup, str):
-            soup = BeautifulSoup(html_or_soup, 'html.parser')
-        else:
-            soup = html_or_soup
-        
-        # Get meta tags (same method that works locally)
-        og_title = soup.find('meta', property='og:title')
-        og_description = soup.find('meta', property='og:description') 
-        og_image = soup.find('meta', property='og:image')
-        
-        title = og_title.get('content') if og_title else ''
-        description = og_description.get('content') if og_description else ''
-        image = og_image.get('content') if og_image else ''
-        
-        print(f"📊 HTML Title: '{title}'")
-        print(f"📊 HTML Description: '{description}'")
-        
-        if title and description:
-            # Extract real data from meta tags (same logic as local test)
-            display_name = title.replace(' • Instagram photos and videos', '').replace(' • Instagram', '').replace(' (@', ' (')
-            if '(' in display_name:
-                display_name = display_name.split(' (')[0].strip()
-            
-            # Extract follower count from title or description  
-            follower_match = re.search(r'(\d+(?:,\d+)*)\s+Followers', title + ' ' + description)
-            followers = int(follower_match.group(1).replace(',', '')) if follower_match else 0
+        # ScrapingBee API - handles JavaScript and anti-bot detection
+        scrapingbee_api_key = os.getenv('SCRAPINGBEE_API_KEY', '').strip()
+        
+        if scrapingbee_api_key:
+            print("🐝 Using ScrapingBee API for Instagram extraction...")
+            
+            api_url = "https://app.scrapingbee.com/api/v1/"
+            params = {
+                'api_key': scrapingbee_api_key,
+                'url': f"https://www.instagram.com/{username}/",
+                'render_js': 'false',  # Instagram meta tags don't need JS
+                'premium_proxy': 'true',  # Use residential proxy
+                'country_code': 'us'
+            }
             
-            # Extract posts count from description
-            posts_match = re.search(r'(\d+(?:,\d+)*)\s+Posts', description)
-            post_count = int(posts_match.group(1).replace(',', '')) if posts_match else 0
+            # Only <head> is needed; hang up on ScrapingBee once the og: tags are in
+            status, meta, bytes_read = fetch_meta(
+                http_client.get, api_url, params=params, timeout=30, max_bytes=META_STREAM_MAX_BYTES
+            )
+            print(f"📡 ScrapingBee Status: {status}, Read: {bytes_read // 1024} KB")
             
-            # Try to extract bio from description
-            bio = description
-            bio = re.sub(r'\d+(?:,\d+)* Followers,?\s*', '', bio)
-            bio = re.sub(r'\d+(?:,\d+)* Following,?\s*', '', bio)
-            bio = re.sub(r'\d+(?:,\d+)* Posts?\s*-?\s*', '', bio)
-            bio = bio.replace('See Instagram photos and videos from ', '').strip()
-            if bio.startswith('- '):
-                bio = bio[2:].strip()
+            if meta:
+                title = meta.get('og:title', '')
+                description = meta.get('og:description', '')
+                
+                print(f"📊 ScrapingBee Title: '{title}'")
+                print(f"📊 ScrapingBee Description: '{description[:100]}...'")
+                
+                record = profile_from_meta(meta, username)
+                if record and ('Instagram' in title or 'photos and videos' in description):
+                    record.source = 'scrapingbee_api'
+                    print(f"✅ SUCCESS with ScrapingBee!")
+                    print(f"   Real Name: {record.full_name}")
+                    print(f"   Real Bio: {record.bio[:50]}...")
+                    print(f"   Real Followers: {record.followers:,}")
+                    print(f"   Real Posts: {record.post_count}")
+                    
+                    return record.to_dict(success=True)
+            else:
+                print(f"⚠️ ScrapingBee failed - Status: {status}")
+        else:
+            print("⚠️ No ScrapingBee API key found")
             
-            result = {
-                'bio': bio,
-                'full_name': display_name,
-                'followers': followers,
-                'post_count': post_count,
-                'profile_pic_url': image,
-                'posts': [],
-                'username': username,
-                'success': True
+    except Exception as scrapingbee_error:
+        print(f"⚠️ ScrapingBee failed: {scrapingbee_error}")
+    
+    return {'success': False}
+
+def try_cloudscraper_extraction(username):
+    """CloudScraper with anti-bot detection"""
+    print(f"🔄 CloudScraper...")
+    try:
+        import cloudscraper
+        
+        scraper = cloudscraper.create_scraper(
+            browser={
+                'browser': 'chrome',
+                'platform': 'windows',
+                'mobile': False
             }
-            
-            print(f"🎉 HTML EXTRACTION SUCCESS:")
-            print(f"   Name: {display_name}")
-            print(f"   Bio: {bio[:100]}...")
-            print(f"   Followers: {followers:,}")
-            print(f"   Posts: {post_count}")
-            
-            return result
+        )
         
-        return {'success': False}
+        # Add realistic headers
+        scraper.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        })
         
-    except Exception as e:
-        print(f"❌ HTML extraction error: {e}")
-        return {'success': False}
-
-
-
-def get_real_instagram_data(username):
-    """Extract REAL Instagram data using proven working HTML scraping method"""
-    import requests
-    import re
-    import json
-    from bs4 import BeautifulSoup
+        print(f"🔄 CloudScraper attempt...")
+        status, meta, bytes_read = fetch_meta(
+            scraper.get, f"https://www.instagram.com/{username}/", timeout=30, max_bytes=META_STREAM_MAX_BYTES
+        )
+        print(f"📡 CloudScraper Status: {status}, Read: {bytes_read // 1024} KB")
+        
+        if meta:
+            title = meta.get('og:title', '')
+            description = meta.get('og:description', '')
+            
+            print(f"📊 CloudScraper Title: '{title[:50]}...'")
+            print(f"📊 CloudScraper Description: '{description[:100]}...'")
+            
+            record = profile_from_meta(meta, username)
+            if record and ('Instagram' in title or 'photos and videos' in description):
+                record.source = 'cloudscraper'
+                print(f"✅ SUCCESS with CloudScraper!")
+                print(f"   Real Name: {record.full_name}")
+                print(f"   Real Bio: {record.bio[:50]}...")
+                print(f"   Real Followers: {record.followers:,}")
+                
+                return record.to_dict(success=True)
+            else:
+                print(f"⚠️ CloudScraper got empty Instagram data")
+                
+    except ImportError:
+        print(f"⚠️ CloudScraper not available (install with: pip install cloudscraper)")
+    except Exception as cloudscraper_error:
+        print(f"⚠️ CloudScraper failed: {cloudscraper_error}")
     
+    return {'success': False}
+
+def try_graph_endpoints_extraction(username):
+    """Instagram's public web_profile_info / __a=1 JSON endpoints"""
+    print(f"🔄 Instagram Graph API approaches...")
     try:
-        print(f"🔍 EXTRACTING REAL DATA for @{username}")
+        # Try Instagram's user info endpoint (sometimes accessible)
+        graph_endpoints = [
+            f"https://www.instagram.com/api/v1/users/web_profile_info/?username={username}",
+            f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}",
+            f"https://www.instagram.com/{username}/?__a=1&__d=dis"
+        ]
         
-        # Method 1: ScrapingBee API (Production-Ready Instagram Scraping)
-        print(f"🔄 Method 1: ScrapingBee API...")
-        try:
-            # ScrapingBee API - handles JavaScript and anti-bot detection
-            scrapingbee_api_key = os.getenv('SCRAPINGBEE_API_KEY', '').strip()
-            
-            if scrapingbee_api_key:
-                print("🐝 Using ScrapingBee API for Instagram extraction...")
+        for endpoint in graph_endpoints:
+            if extraction_cancelled():
+                break
+            try:
+                print(f"🔄 Trying Graph endpoint: {endpoint.split('/')[2]}")
                 
-                api_url = "https://app.scrapingbee.com/api/v1/"
-                params = {
-                    'api_key': scrapingbee_api_key,
-                    'url': f"https://www.instagram.com/{username}/",
-                    'render_js': 'false',  # Instagram meta tags don't need JS
-                    'premium_proxy': 'true',  # Use residential proxy
-                    'country_code': 'us'
+                headers = {
+                    'User-Agent': 'Mozilla/5.0 (compatible; Instagram-Graph/1.0)',
+                    'Accept': 'application/json',
+                    'X-Requested-With': 'XMLHttpRequest'
                 }
                 
-                response = requests.get(api_url, params=params, timeout=30)
-                print(f"📡 ScrapingBee Status: {response.status_code}, Length: {len(response.text)}")
+                response = http_client.get(endpoint, headers=headers, timeout=15)
+                print(f"📡 Graph Response: {response.status_code}")
                 
-                if response.status_code == 200 and len(response.text) > 1000:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Check meta tags
-                    og_title = soup.find('meta', property='og:title')
-                    og_description = soup.find('meta', property='og:description')
-                    og_image = soup.find('meta', property='og:image')
-                    
-                    title = og_title.get('content') if og_title else ''
-                    description = og_description.get('content') if og_description else ''
-                    profile_pic = og_image.get('content') if og_image else ''
-                    
-                    print(f"📊 ScrapingBee Title: '{title}'")
-                    print(f"📊 ScrapingBee Description: '{description[:100]}...'")
-                    
-                    if title and description and ('Instagram' in title or 'photos and videos' in description):
-                        print(f"✅ Got real Instagram data via ScrapingBee!")
-                        
-                        # Extract data
-                        display_name = title.replace(' • Instagram photos and videos', '').replace(' (@', ' (')
-                        if '(' in display_name:
-                            display_name = display_name.split(' (')[0].strip()
-                        
-                        # Extract followers from description
-                        follower_match = re.search(r'(\d+(?:,\d+)*)\s+Followers', description)
-                        followers = int(follower_match.group(1).replace(',', '')) if follower_match else 0
-                        
-                        # Extract posts count
-                        posts_match = re.search(r'(\d+(?:,\d+)*)\s+Posts', description)
-                        post_count = int(posts_match.group(1).replace(',', '')) if posts_match else 0
-                        
-                        # Extract following count
-                        following_match = re.search(r'(\d+(?:,\d+)*)\s+Following', description)
-                        following = int(following_match.group(1).replace(',', '')) if following_match else 0
-                        
-                        # Extract bio from description
-                        bio = description
-                        stats_pattern = r'\d+(?:,\d+)*\s+(?:Followers|Following|Posts)[^-]*-\s*'
-                        bio = re.sub(stats_pattern, '', bio, flags=re.IGNORECASE)
-                        bio = bio.replace('See Instagram photos and videos from', '').strip()
-                        
-                        result = {
-                            'bio': bio,
-                            'full_name': display_name,
-                            'followers': followers,
-                            'following': following,
-                            'post_count': post_count,
-                            'profile_pic_url': profile_pic,
-                            'posts': [],
-                            'username': username,
-                            'success': True,
-                            'source': 'scrapingbee_api'
-                        }
+                if response.status_code == 200:
+                    try:
+                        graph_data = response.json()
                         
-                        print(f"✅ SUCCESS with ScrapingBee!")
-                        print(f"   Real Name: {display_name}")
-                        print(f"   Real Bio: {bio[:50]}...")
-                        print(f"   Real Followers: {followers:,}")
-                        print(f"   Real Posts: {post_count}")
+                        # Navigate to user data
+                        user_data = None
+                        if 'data' in graph_data and 'user' in graph_data['data']:
+                            user_data = graph_data['data']['user']
+                        elif 'graphql' in graph_data and 'user' in graph_data['graphql']:
+                            user_data = graph_data['graphql']['user']
+                        elif 'user' in graph_data:
+                            user_data = graph_data['user']
                         
-                        return result
-                else:
-                    print(f"⚠️ ScrapingBee failed - Status: {response.status_code}")
-            else:
-                print("⚠️ No ScrapingBee API key found")
-                
-        except Exception as scrapingbee_error:
-            print(f"⚠️ ScrapingBee failed: {scrapingbee_error}")
-            
-        # Method 2: CloudScraper with Anti-Bot Detection
-        print(f"🔄 Method 2: CloudScraper...")
-        try:
-            import cloudscraper
-            
-            scraper = cloudscraper.create_scraper(
-                browser={
-                    'browser': 'chrome',
-                    'platform': 'windows',
-                    'mobile': False
-                }
-            )
-            
-            # Add realistic headers
-            scraper.headers.update({
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            })
-            
-            print(f"🔄 CloudScraper attempt...")
-            response = scraper.get(f"https://www.instagram.com/{username}/", timeout=30)
-            print(f"📡 CloudScraper Status: {response.status_code}, Length: {len(response.text)}")
-            
-            if response.status_code == 200 and len(response.text) > 1000:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                og_title = soup.find('meta', property='og:title')
-                og_description = soup.find('meta', property='og:description')
-                og_image = soup.find('meta', property='og:image')
-                
-                title = og_title.get('content') if og_title else ''
-                description = og_description.get('content') if og_description else ''
-                profile_pic = og_image.get('content') if og_image else ''
-                
-                print(f"📊 CloudScraper Title: '{title[:50]}...'")
-                print(f"📊 CloudScraper Description: '{description[:100]}...'")
-                
-                if title and description and ('Instagram' in title or 'photos and videos' in description):
-                    print(f"✅ CloudScraper SUCCESS!")
-                    
-                    # Extract data
-                    display_name = title.replace(' • Instagram photos and videos', '').replace(' (@', ' (')
-                    if '(' in display_name:
-                        display_name = display_name.split(' (')[0].strip()
-                    
-                    # Extract metrics
-                    follower_match = re.search(r'(\d+(?:,\d+)*)\s+Followers', description)
-                    followers = int(follower_match.group(1).replace(',', '')) if follower_match else 0
-                    
-                    posts_match = re.search(r'(\d+(?:,\d+)*)\s+Posts', description)
-                    post_count = int(posts_match.group(1).replace(',', '')) if posts_match else 0
-                    
-                    # Extract bio
-                    bio = description
-                    stats_pattern = r'\d+(?:,\d+)*\s+(?:Followers|Following|Posts)[^-]*-\s*'
-                    bio = re.sub(stats_pattern, '', bio, flags=re.IGNORECASE)
-                    bio = bio.replace('See Instagram photos and videos from', '').strip()
-                    
-                    result = {
-                        'bio': bio,
-                        'full_name': display_name,
-                        'followers': followers,
-                        'post_count': post_count,
-                        'profile_pic_url': profile_pic,
-                        'posts': [],
-                        'username': username,
-                        'success': True,
-                        'source': 'cloudscraper'
-                    }
-                    
-                    print(f"✅ SUCCESS with CloudScraper!")
-                    print(f"   Real Name: {display_name}")
-                    print(f"   Real Bio: {bio[:50]}...")
-                    print(f"   Real Followers: {followers:,}")
-                    
-                    return result
-                else:
-                    print(f"⚠️ CloudScraper got empty Instagram data")
-                    
-        except ImportError:
-            print(f"⚠️ CloudScraper not available (install with: pip install cloudscraper)")
-        except Exception as cloudscraper_error:
-            print(f"⚠️ CloudScraper failed: {cloudscraper_error}")
-            
-        # Method 3: Production-Ready Intelligent Data Generation
-        print(f"🔄 Method 3: Intelligent data generation...")
-        try:
-            print(f"🧠 Generating realistic business data for @{username}")
-            
-            # Analyze username for business insights
-            username_lower = username.lower()
-            
-            # Business type detection based on username patterns
-            business_types = {
-                'craft': ['peace', 'lily', 'handmade', 'craft', 'art', 'creative', 'design', 'studio', 'pottery', 'jewelry', 'creations', 'artisan'],
-                'plant': ['plant', 'garden', 'flower', 'botanical', 'green', 'nursery', 'leaf', 'bloom', 'flora'],
-                'food': ['cafe', 'restaurant', 'kitchen', 'food', 'pizza', 'burger', 'coffee', 'bakery', 'tea', 'spice'],
-                'fashion': ['fashion', 'clothing', 'style', 'boutique', 'dress', 'wear', 'apparel', 'threads'],
-                'beauty': ['beauty', 'salon', 'makeup', 'cosmetic', 'spa', 'hair', 'nails', 'skin'],
-                'fitness': ['gym', 'fitness', 'yoga', 'sport', 'health', 'training', 'workout'],
-                'tech': ['tech', 'digital', 'app', 'software', 'web', 'code', 'development'],
-                'lifestyle': ['lifestyle', 'home', 'decor', 'living', 'interior', 'design']
-            }
-            
-            detected_type = 'lifestyle'  # default
-            for biz_type, keywords in business_types.items():
-                if any(keyword in username_lower for keyword in keywords):
-                    detected_type = biz_type
-                    break
-            
-            # Special case detection for known patterns
-            if 'peace' in username_lower and 'lily' in username_lower:
-                detected_type = 'craft'
-            
-            # Generate realistic business name
-            name_parts = username.replace('.', ' ').replace('_', ' ').replace('-', ' ').split()
-            business_name = ' '.join([part.capitalize() for part in name_parts if len(part) > 2])
-            
-            # Special case for thepeacelily.in  
-            if 'thepeacelily' in username_lower or 'peace' in username_lower:
-                business_name = 'Peace Lily Creations'
-            
-            # If no meaningful name, create one based on type
-            if not business_name or len(business_name) < 5:
-                type_names = {
-                    'food': ['Delicious Delights', 'Tasty Treats', 'Gourmet Kitchen'],
-                    'fashion': ['Style Studio', 'Fashion Forward', 'Trendy Threads'],
-                    'beauty': ['Beauty Bliss', 'Glamour Studio', 'Radiant Beauty'],
-                    'craft': ['Creative Creations', 'Artisan Studio', 'Handmade Haven'],
-                    'plant': ['Green Oasis', 'Plant Paradise', 'Botanical Beauty'],
-                    'lifestyle': ['Life & Style', 'Modern Living', 'Daily Essentials']
-                }
-                business_name = type_names.get(detected_type, ['Creative Studio'])[0]
-            
-            # Generate realistic metrics
-            import random
-            base_followers = random.randint(150, 2500)  # Realistic small business range
-            followers = base_followers
-            
-            # Post count based on business age estimate
-            post_count = random.randint(45, 350)
-            
-            # Generate business-appropriate bio
-            bio_templates = {
-                'food': f"Delicious homemade dishes & fresh ingredients 🍽️ Order online for pickup/delivery 📍 Local favorite since [year]",
-                'fashion': f"Trendy styles for every occasion ✨ New arrivals weekly 👗 DM for custom orders & styling",
-                'beauty': f"Professional beauty services & premium products 💄 Book appointments online ✨ Transform your look",
-                'craft': f"Handcrafted with love & attention to detail 🎨 Custom orders welcome 💎 Unique pieces for special moments",
-                'plant': f"Beautiful plants for your home & garden 🌱 Expert care tips & delivery available 🌿 Growing happiness",
-                'lifestyle': f"Curated products for modern living ✨ Quality & style in every item 🏠 Elevate your everyday"
-            }
-            
-            bio = bio_templates.get(detected_type, f"Quality products & exceptional service ✨ Follow for updates 📱 Local business with passion")
-            
-            result = {
-                'bio': bio,
-                'full_name': business_name,
-                'followers': followers,
-                'post_count': post_count,
-                'profile_pic_url': '',  # No profile pic in generated data
-                'posts': [],
-                'username': username,
-                'success': True,
-                'source': 'intelligent_generation',
-                'detected_business_type': detected_type
-            }
-            
-            print(f"✅ Generated intelligent business data!")
-            print(f"   Generated Name: {business_name}")
-            print(f"   Business Type: {detected_type}")
-            print(f"   Generated Followers: {followers:,}")
-            print(f"   Generated Posts: {post_count}")
-            print(f"   Generated Bio: {bio[:50]}...")
-            print(f"   Username analyzed: {username}")
-            
-            return result
-            
-        except Exception as generation_error:
-            print(f"⚠️ Intelligent generation failed: {generation_error}")
-        
-        # Method 2: Instagram Graph API (Basic Display)
-        print(f"🔄 Method 2: Instagram Graph API approaches...")
-        try:
-            # Try Instagram's user info endpoint (sometimes accessible)
-            graph_endpoints = [
-                f"https://www.instagram.com/api/v1/users/web_profile_info/?username={username}",
-                f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}",
-                f"https://www.instagram.com/{username}/?__a=1&__d=dis"
-            ]
-            
-            for endpoint in graph_endpoints:
-                try:
-                    print(f"🔄 Trying Graph endpoint: {endpoint.split('/')[2]}")
-                    
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (compatible; Instagram-Graph/1.0)',
-                        'Accept': 'application/json',
-                        'X-Requested-With': 'XMLHttpRequest'
-                    }
-                    
-                    response = requests.get(endpoint, headers=headers, timeout=15)
-                    print(f"📡 Graph Response: {response.status_code}")
-                    
-                    if response.status_code == 200:
-                        try:
-                            graph_data = response.json()
+                        if user_data and user_data.get('username'):
+                            print(f"📊 Found user data in Graph API!")
                             
-                            # Navigate to user data
-                            user_data = None
-                            if 'data' in graph_data and 'user' in graph_data['data']:
-                                user_data = graph_data['data']['user']
-                            elif 'graphql' in graph_data and 'user' in graph_data['graphql']:
-                                user_data = graph_data['graphql']['user']
-                            elif 'user' in graph_data:
-                                user_data = graph_data['user']
+                            bio = user_data.get('biography', '')
+                            full_name = user_data.get('full_name', username)
+                            followers = user_data.get('edge_followed_by', {}).get('count', 0)
+                            following = user_data.get('edge_follow', {}).get('count', 0)
+                            post_count = user_data.get('edge_owner_to_timeline_media', {}).get('count', 0)
+                            profile_pic = user_data.get('profile_pic_url_hd') or user_data.get('profile_pic_url', '')
                             
-                            if user_data and user_data.get('username'):
-                                print(f"📊 Found user data in Graph API!")
-                                
-                                bio = user_data.get('biography', '')
-                                full_name = user_data.get('full_name', username)
-                                followers = user_data.get('edge_followed_by', {}).get('count', 0)
-                                following = user_data.get('edge_follow', {}).get('count', 0)
-                                post_count = user_data.get('edge_owner_to_timeline_media', {}).get('count', 0)
-                                profile_pic = user_data.get('profile_pic_url_hd') or user_data.get('profile_pic_url', '')
-                                
-                                result = {
-                                    'bio': bio,
-                                    'full_name': full_name,
-                                    'followers': followers,
-                                    'post_count': post_count,
-                                    'profile_pic_url': profile_pic,
-                                    'posts': [],
-                                    'username': username,
-                                    'success': True,
-                                    'source': 'instagram_graph_api'
-                                }
-                                
-                                print(f"✅ SUCCESS with Instagram Graph API!")
-                                print(f"   Real Name: {full_name}")
-                                print(f"   Real Bio: {bio[:50]}...")
-                                print(f"   Real Followers: {followers:,}")
-                                print(f"   Real Posts: {post_count}")
-                                
-                                return result
-                                
-                        except json.JSONDecodeError:
-                            print(f"⚠️ Graph endpoint returned non-JSON")
-                            continue
+                            result = {
+                                'bio': bio,
+                                'full_name': full_name,
+                                'followers': followers,
+                                'post_count': post_count,
+                                'profile_pic_url': profile_pic,
+                                'posts': [],
+                                'username': username,
+                                'success': True,
+                                'source': 'instagram_graph_api'
+                            }
                             
-                except Exception as endpoint_error:
-                    print(f"⚠️ Graph endpoint failed: {endpoint_error}")
-                    continue
-                    
-        except Exception as graph_error:
-            print(f"⚠️ Instagram Graph API failed: {graph_error}")
-        
-        # Method 3: Enhanced HTML scraping with mobile user agent
-        print(f"🔄 Method 3: Enhanced mobile HTML scraping...")
-        try:
-            # Use mobile Instagram with very specific headers
-            mobile_headers = {
-                'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none'
-            }
-            
-            # Try mobile domain
-            mobile_url = f"https://m.instagram.com/{username}/"
-            print(f"🔄 Trying mobile Instagram: {mobile_url}")
-            
-            response = requests.get(mobile_url, headers=mobile_headers, timeout=20)
-            print(f"📡 Mobile Response: {response.status_code}, Length: {len(response.text)}")
-            
-            if response.status_code == 200 and len(response.text) > 1000:
-                result = extract_from_html(response.text, username)
-                if result.get('success'):
-                    print(f"✅ SUCCESS with mobile HTML scraping!")
-                    result['source'] = 'mobile_html_scraping'
-                    return result
-                    
-        except Exception as mobile_error:
-            print(f"⚠️ Mobile HTML scraping failed: {mobile_error}")
+                            print(f"✅ SUCCESS with Instagram Graph API!")
+                            print(f"   Real Name: {full_name}")
+                            print(f"   Real Bio: {bio[:50]}...")
+                            print(f"   Real Followers: {followers:,}")
+                            print(f"   Real Posts: {post_count}")
+                            
+                            return result
+                            
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Graph endpoint returned non-JSON")
+                        continue
+                        
+            except Exception as endpoint_error:
+                print(f"⚠️ Graph endpoint failed: {endpoint_error}")
+                continue
+                
+    except Exception as graph_error:
+        print(f"⚠️ Instagram Graph API failed: {graph_error}")
+    
+    return {'success': False}
+
+def try_mobile_html_extraction(username):
+    """Enhanced HTML scraping with mobile user agent"""
+    print(f"🔄 Enhanced mobile HTML scraping...")
+    try:
+        # Use mobile Instagram with very specific headers
+        mobile_headers = {
+            'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none'
+        }
         
-        # If all methods fail, return failure (no fake data generation)
-        print(f"❌ ALL REAL DATA EXTRACTION METHODS FAILED for @{username}")
-        print(f"❌ Instagram has blocked access from this server")
-        print(f"🔄 Using intelligent generation as final fallback...")
+        # Try mobile domain
+        mobile_url = f"https://m.instagram.com/{username}/"
+        print(f"🔄 Trying mobile Instagram: {mobile_url}")
         
-        # FINAL FALLBACK: Intelligent Business Data Generation
-        try:
-            print(f"🧠 Generating realistic business data for @{username}")
-            
-            # Analyze username for business insights
-            username_lower = username.lower()
-            
-            # Business type detection based on username patterns
-            business_types = {
-                'craft': ['peace', 'lily', 'handmade', 'craft', 'art', 'creative', 'design', 'studio', 'pottery', 'jewelry', 'creations', 'artisan'],
-                'plant': ['plant', 'garden', 'flower', 'botanical', 'green', 'nursery', 'leaf', 'bloom', 'flora'],
-                'food': ['cafe', 'restaurant', 'kitchen', 'food', 'pizza', 'burger', 'coffee', 'bakery', 'tea', 'spice'],
-                'fashion': ['fashion', 'clothing', 'style', 'boutique', 'dress', 'wear', 'apparel', 'threads'],
-                'beauty': ['beauty', 'salon', 'makeup', 'cosmetic', 'spa', 'hair', 'nails', 'skin'],
-                'fitness': ['gym', 'fitness', 'yoga', 'sport', 'health', 'training', 'workout'],
-                'tech': ['tech', 'digital', 'app', 'software', 'web', 'code', 'development'],
-                'lifestyle': ['lifestyle', 'home', 'decor', 'living', 'interior', 'design']
-            }
-            
-            detected_type = 'lifestyle'  # default
-            for biz_type, keywords in business_types.items():
-                if any(keyword in username_lower for keyword in keywords):
-                    detected_type = biz_type
-                    break
-            
-            # Special case detection for known patterns
-            if 'peace' in username_lower and 'lily' in username_lower:
-                detected_type = 'craft'
-            
-            # Generate realistic business name
-            name_parts = username.replace('.', ' ').replace('_', ' ').replace('-', ' ').split()
-            business_name = ' '.join([part.capitalize() for part in name_parts if len(part) > 2])
-            
-            # Special case for thepeacelily.in  
-            if 'thepeacelily' in username_lower or 'peace' in username_lower:
-                business_name = 'Peace Lily Creations'
-            
-            # If no meaningful name, create one based on type
-            if not business_name or len(business_name) < 5:
-                type_names = {
-                    'food': ['Delicious Delights', 'Tasty Treats', 'Gourmet Kitchen'],
-                    'fashion': ['Style Studio', 'Fashion Forward', 'Trendy Threads'],
-                    'beauty': ['Beauty Bliss', 'Glamour Studio', 'Radiant Beauty'],
-                    'craft': ['Creative Creations', 'Artisan Studio', 'Handmade Haven'],
-                    'plant': ['Green Oasis', 'Plant Paradise', 'Botanical Beauty'],
-                    'lifestyle': ['Life & Style', 'Modern Living', 'Daily Essentials']
-                }
-                business_name = type_names.get(detected_type, ['Creative Studio'])[0]
-            
-            # Generate realistic metrics
-            import random
-            random.seed(hash(username))  # Consistent results for same username
-            
-            # Special case for thepeacelily.in to match real numbers
-            if 'thepeacelily' in username_lower or 'peace' in username_lower:
-                followers = 1390  # Real follower count
-                post_count = 315  # Real post count
-            else:
-                base_followers = random.randint(150, 2500)  # Realistic small business range
-                followers = base_followers
-                post_count = random.randint(45, 350)
-            
-            # Generate business-appropriate bio
-            bio_templates = {
-                'food': f"Delicious homemade dishes & fresh ingredients 🍽️ Order online for pickup/delivery 📍 Local favorite",
-                'fashion': f"Trendy styles for every occasion ✨ New arrivals weekly 👗 DM for custom orders & styling",
-                'beauty': f"Professional beauty services & premium products 💄 Book appointments online ✨ Transform your look",
-                'craft': f"Handcrafted with love & attention to detail 🎨 Custom orders welcome 💎 Unique pieces for special moments",
-                'plant': f"Beautiful plants for your home & garden 🌱 Expert care tips & delivery available 🌿 Growing happiness",
-                'lifestyle': f"Curated products for modern living ✨ Quality & style in every item 🏠 Elevate your everyday"
-            }
-            
-            bio = bio_templates.get(detected_type, f"Quality products & exceptional service ✨ Follow for updates 📱 Local business with passion")
-            
-            print(f"✅ Generated intelligent business data!")
-            print(f"   Generated Name: {business_name}")
-            print(f"   Business Type: {detected_type}")
-            print(f"   Generated Followers: {followers:,}")
-            print(f"   Generated Posts: {post_count}")
-            print(f"   Generated Bio: {bio[:50]}...")
-            print(f"   Username analyzed: {username}")
-            
-            return {
-                'bio': bio,
-                'full_name': business_name,
-                'followers': followers,
-                'post_count': post_count,
-                'profile_pic_url': '',  # No profile pic in generated data
-                'posts': [],
-                'username': username,
-                'success': True,
-                'source': 'intelligent_generation',
-                'detected_business_type': detected_type
-            }
-            
-        except Exception as generation_error:
-            print(f"⚠️ Intelligent generation also failed: {generation_error}")
-            
-            # Absolute final fallback
-            return {
-                'bio': 'Quality products and services',
-                'full_name': username.replace('.', ' ').replace('_', ' ').title(),
-                'followers': 500,
-                'post_count': 50,
-                'profile_pic_url': '',
-                'posts': [],
-                'username': username,
-                'success': True,
-                'source': 'basic_fallback'
+        status, meta, bytes_read = fetch_meta(
+            http_client.get, mobile_url, headers=mobile_headers, timeout=20, max_bytes=META_STREAM_MAX_BYTES
+        )
+        print(f"📡 Mobile Response: {status}, Read: {bytes_read // 1024} KB")
+        
+        if meta:
+            result = extract_from_meta(meta, username)
+            if result.get('success'):
+                print(f"✅ SUCCESS with mobile HTML scraping!")
+                result['source'] = 'mobile_html_scraping'
+                return result
+                
+    except Exception as mobile_error:
+        print(f"⚠️ Mobile HTML scraping failed: {mobile_error}")
+    
+    return {'success': False}
+
+def generate_profile_from_username(username):
+    """Intelligent business data generation from the username alone (final fallback when extraction fails)"""
+    try:
+        print(f"🧠 Generating realistic business data for @{username}")
+        
+        # Analyze username for business insights
+        username_lower = username.lower()
+        
+        # Business type detection based on username patterns (usernames run words together,
+        # so keywords count anywhere in them)
+        detected_type = classify(username_lower, anywhere=True)
+        
+        # Special case detection for known patterns
+        if 'peace' in username_lower and 'lily' in username_lower:
+            detected_type = 'crafts'
+        style = category_style(detected_type)
+        
+        # Generate realistic business name
+        name_parts = username.replace('.', ' ').replace('_', ' ').replace('-', ' ').split()
+        business_name = ' '.join([part.capitalize() for part in name_parts if len(part) > 2])
+        
+        # Special case for thepeacelily.in  
+        if 'thepeacelily' in username_lower or 'peace' in username_lower:
+            business_name = 'Peace Lily Creations'
+        
+        # If no meaningful name, create one based on type
+        if not business_name or len(business_name) < 5:
+            type_names = {
+                'food': ['Delicious Delights', 'Tasty Treats', 'Gourmet Kitchen'],
+                'fashion': ['Style Studio', 'Fashion Forward', 'Trendy Threads'],
+                'beauty': ['Beauty Bliss', 'Glamour Studio', 'Radiant Beauty'],
+                'crafts': ['Creative Creations', 'Artisan Studio', 'Handmade Haven'],
+                'plants': ['Green Oasis', 'Plant Paradise', 'Botanical Beauty'],
+                'general': ['Life & Style', 'Modern Living', 'Daily Essentials']
             }
+            business_name = type_names.get(style, ['Creative Studio'])[0]
+        
+        # Generate realistic metrics
+        import random
+        # Consistent results for same username, without reseeding the shared RNG other threads use
+        rng = random.Random(username)
+        
+        # Special case for thepeacelily.in to match real numbers
+        if 'thepeacelily' in username_lower or 'peace' in username_lower:
+            followers = 1390  # Real follower count
+            post_count = 315  # Real post count
+        else:
+            base_followers = rng.randint(150, 2500)  # Realistic small business range
+            followers = base_followers
+            post_count = rng.randint(45, 350)
+        
+        # Generate business-appropriate bio
+        bio_templates = {
+            'food': f"Delicious homemade dishes & fresh ingredients 🍽️ Order online for pickup/delivery 📍 Local favorite",
+            'fashion': f"Trendy styles for every occasion ✨ New arrivals weekly 👗 DM for custom orders & styling",
+            'beauty': f"Professional beauty services & premium products 💄 Book appointments online ✨ Transform your look",
+            'crafts': f"Handcrafted with love & attention to detail 🎨 Custom orders welcome 💎 Unique pieces for special moments",
+            'plants': f"Beautiful plants for your home & garden 🌱 Expert care tips & delivery available 🌿 Growing happiness",
+            'general': f"Curated products for modern living ✨ Quality & style in every item 🏠 Elevate your everyday"
+        }
+        
+        bio = bio_templates.get(style, f"Quality products & exceptional service ✨ Follow for updates 📱 Local business with passion")
+        
+        print(f"✅ Generated intelligent business data!")
+        print(f"   Generated Name: {business_name}")
+        print(f"   Business Type: {detected_type}")
+        print(f"   Generated Followers: {followers:,}")
+        print(f"   Generated Posts: {post_count}")
+        print(f"   Generated Bio: {bio[:50]}...")
+        print(f"   Username analyzed: {username}")
         
-    except Exception as e:
-        print(f"❌ Critical error in Instagram extraction: {e}")
         return {
-            'bio': '',
+            'bio': bio,
+            'full_name': business_name,
+            'followers': followers,
+            'post_count': post_count,
+            'profile_pic_url': '',  # No profile pic in generated data
+            'posts': [],
+            'username': username,
+            'success': True,
+            'source': 'intelligent_generation',
+            'detected_business_type': detected_type
+        }
+        
+    except Exception as generation_error:
+        print(f"⚠️ Intelligent generation also failed: {generation_error}")
+        
+        # Absolute final fallback
+        return {
+            'bio': 'Quality products and services',
             'full_name': username.replace('.', ' ').replace('_', ' ').title(),
-            'followers': 0,
-            'post_count': 0,
+            'followers': 500,
+            'post_count': 50,
             'profile_pic_url': '',
             'posts': [],
             'username': username,
-            'success': False
+            'success': True,
+            'source': 'basic_fallback'
         }
 
+
 def extract_from_api_response(api_data, username):
     """Extract Instagram data from API response"""
     try:
@@ -1118,71 +1107,25 @@ def extract_from_api_response(api_data, username):
         print(f"❌ API response extraction error: {e}")
         return {'success': False}
 
-def extract_from_html(html_or_soup, username):
-    """Extract Instagram data from HTML content"""
-    import re
-    from bs4 import BeautifulSoup
-    
+def extract_from_html(page, username):
+    """Extract Instagram data from a profile page's og: meta tags"""
+    return extract_from_meta(parse_meta(page), username)
+
+def extract_from_meta(meta, username):
+    """Extract Instagram data from og: meta tags (parsed from a page or read by a streamed fetch)"""
     try:
-        # Handle both HTML string and BeautifulSoup object
-        if isinstance(html_or_soup, str):
-            soup = BeautifulSoup(html_or_soup, 'html.parser')
-        else:
-            soup = html_or_soup
-        
-        # Get meta tags (same method that works locally)
-        og_title = soup.find('meta', property='og:title')
-        og_description = soup.find('meta', property='og:description') 
-        og_image = soup.find('meta', property='og:image')
-        
-        title = og_title.get('content') if og_title else ''
-        description = og_description.get('content') if og_description else ''
-        image = og_image.get('content') if og_image else ''
+        print(f"📊 HTML Title: '{meta.get('og:title', '')}'")
+        print(f"📊 HTML Description: '{meta.get('og:description', '')}'")
         
-        print(f"📊 HTML Title: '{title}'")
-        print(f"📊 HTML Description: '{description}'")
-        
-        if title and description:
-            # Extract real data from meta tags (same logic as local test)
-            display_name = title.replace(' • Instagram photos and videos', '').replace(' • Instagram', '').replace(' (@', ' (')
-            if '(' in display_name:
-                display_name = display_name.split(' (')[0].strip()
-            
-            # Extract follower count from title or description  
-            follower_match = re.search(r'(\d+(?:,\d+)*)\s+Followers', title + ' ' + description)
-            followers = int(follower_match.group(1).replace(',', '')) if follower_match else 0
-            
-            # Extract posts count from description
-            posts_match = re.search(r'(\d+(?:,\d+)*)\s+Posts', description)
-            post_count = int(posts_match.group(1).replace(',', '')) if posts_match else 0
-            
-            # Try to extract bio from description
-            bio = description
-            bio = re.sub(r'\d+(?:,\d+)* Followers,?\s*', '', bio)
-            bio = re.sub(r'\d+(?:,\d+)* Following,?\s*', '', bio)
-            bio = re.sub(r'\d+(?:,\d+)* Posts?\s*-?\s*', '', bio)
-            bio = bio.replace('See Instagram photos and videos from ', '').strip()
-            if bio.startswith('- '):
-                bio = bio[2:].strip()
-            
-            result = {
-                'bio': bio,
-                'full_name': display_name,
-                'followers': followers,
-                'post_count': post_count,
-                'profile_pic_url': image,
-                'posts': [],
-                'username': username,
-                'success': True
-            }
-            
+        record = profile_from_meta(meta, username)
+        if record:
             print(f"🎉 HTML EXTRACTION SUCCESS:")
-            print(f"   Name: {display_name}")
-            print(f"   Bio: {bio[:100]}...")
-            print(f"   Followers: {followers:,}")
-            print(f"   Posts: {post_count}")
+            print(f"   Name: {record.full_name}")
+            print(f"   Bio: {record.bio[:100]}...")
+            print(f"   Followers: {record.followers:,}")
+            print(f"   Posts: {record.post_count}")
             
-            return result
+            return record.to_dict(success=True)
         
         return {'success': False}
         
@@ -1192,8 +1135,6 @@ def extract_from_html(html_or_soup, username):
 
 def try_direct_extraction(username):
     """Simple direct extraction as fallback"""
-    import requests
-    
     try:
         print(f"🔄 Direct extraction fallback for @{username}")
         
@@ -1203,6 +1144,8 @@ def try_direct_extraction(username):
         ]
         
         for user_agent in user_agents:
+            if extraction_cancelled():
+                break
             try:
                 headers = {
                     'User-Agent': user_agent,
@@ -1212,9 +1155,12 @@ def try_direct_extraction(username):
                     'Connection': 'keep-alive'
                 }
                 
-                response = requests.get(f"https://www.instagram.com/{username}/", headers=headers, timeout=20)
-                if response.status_code == 200 and len(response.text) > 1000:
-                    result = extract_from_html(response.text, username)
+                _, meta, _ = fetch_meta(
+                    http_client.get, f"https://www.instagram.com/{username}/",
+                    headers=headers, timeout=20, max_bytes=META_STREAM_MAX_BYTES
+                )
+                if meta:
+                    result = extract_from_meta(meta, username)
                     if result.get('success'):
                         return result
                         
@@ -1278,12 +1224,9 @@ def try_advanced_scraping(username):
                 'Sec-Fetch-Site': 'none'
             }
             
-            session = requests.Session()
-            session.headers.update(headers)
-            
             for url in urls:
                 try:
-                    response = session.get(url, timeout=15)
+                    response = http_client.get(url, headers=headers, timeout=15)
                     if response.status_code == 200:
                         # Try parsing as JSON first
                         try:
@@ -1311,120 +1254,12 @@ def try_advanced_scraping(username):
     return {'success': False}
 
 def extract_from_instagram_html(html_content, username):
-    """Extract data from Instagram HTML with multiple methods"""
+    """Extract data from Instagram HTML: embedded JSON, meta tags, loose fields and post images"""
     try:
-        profile_data = {
-            'username': username,
-            'display_name': '',
-            'bio': '',
-            'follower_count': 0,
-            'post_count': 0,
-            'posts': [],
-            'success': False
-        }
-        
-        # Method 1: Extract from script tags with JSON data
-        json_patterns = [
-            r'window\._sharedData\s*=\s*({.*?});',
-            r'window\.__additionalDataLoaded\([^,]+,\s*({.*?})\)',
-            r'"ProfilePage":\[({.*?})\]',
-            r'"user":\s*({.*?"edge_owner_to_timeline_media".*?})',
-            r'"graphql":\s*{"user":\s*({.*?})\s*}',
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.finditer(pattern, html_content, re.DOTALL)
-            for match in matches:
-                try:
-                    json_str = match.group(1)
-                    data = json.loads(json_str)
-                    result = extract_from_instagram_json(data, username)
-                    if result['success']:
-                        return result
-                except:
-                    continue
-        
-        # Method 2: Direct pattern matching
-        patterns = {
-            'bio': [
-                r'"biography":"([^"]*?)"',
-                r'"biography":\s*"([^"]*?)"',
-                r'<meta\s+property="og:description"\s+content="([^"]*?)"'
-            ],
-            'full_name': [
-                r'"full_name":"([^"]*?)"',
-                r'"full_name":\s*"([^"]*?)"',
-                r'<meta\s+property="og:title"\s+content="([^"]*?)"'
-            ],
-            'followers': [
-                r'"edge_followed_by":\s*{\s*"count":\s*(\d+)',
-                r'edge_followed_by.*?"count":\s*(\d+)',
-                r'(\d+(?:,\d+)*)\s+[Ff]ollowers'
-            ]
-        }
-        
-        # Extract using patterns
-        for field, field_patterns in patterns.items():
-            for pattern in field_patterns:
-                match = re.search(pattern, html_content, re.IGNORECASE)
-                if match:
-                    value = match.group(1)
-                    if field == 'followers':
-                        try:
-                            profile_data['follower_count'] = int(value.replace(',', ''))
-                        except:
-                            pass
-                    elif field == 'bio':
-                        try:
-                            # Decode Unicode
-                            bio = value.encode('latin1').decode('unicode_escape')
-                            profile_data['bio'] = bio.replace('\\n', ' ').strip()
-                        except:
-                            profile_data['bio'] = value.strip()
-                    elif field == 'full_name':
-                        try:
-                            name = value.encode('latin1').decode('unicode_escape')
-                            profile_data['display_name'] = name.replace(' • Instagram', '').strip()
-                        except:
-                            profile_data['display_name'] = value.replace(' • Instagram', '').strip()
-                    break
-        
-        # Method 3: Extract posts from HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Find post images
-        images = soup.find_all('img')
-        posts = []
-        
-        for img in images:
-            src = img.get('src', '')
-            alt = img.get('alt', '')
-            
-            # Filter for actual Instagram post images
-            if (src and 'scontent' in src and 
-                any(indicator in src for indicator in ['cdninstagram', 'fbcdn']) and
-                not any(exclude in src.lower() for exclude in ['profile', 'avatar', 'story', 'highlight'])):
-                
-                posts.append({
-                    'image': src,
-                    'caption': alt,
-                    'timestamp': '',
-                    'likes': 0,
-                    'comments': 0
-                })
-        
-        if posts:
-            profile_data['posts'] = posts[:12]  # Limit to 12 posts
-            profile_data['post_count'] = len(posts)
-        
-        # Check if we extracted meaningful data
-        if (profile_data['bio'] or 
-            profile_data['display_name'] or 
-            profile_data['follower_count'] > 0 or
-            len(profile_data['posts']) > 0):
-            profile_data['success'] = True
-            print(f"📊 Extracted: name='{profile_data['display_name']}', bio='{profile_data['bio'][:50]}...', posts={len(profile_data['posts'])}")
-            return profile_data
+        record = parse_profile_page(html_content, username)
+        if record.found:
+            print(f"📊 Extracted: name='{record.full_name}', bio='{record.bio[:50]}...', posts={len(record.posts)}")
+            return record.to_dict()
             
     except Exception as e:
         print(f"HTML extraction failed: {e}")
@@ -1434,73 +1269,10 @@ def extract_from_instagram_html(html_content, username):
 def extract_from_instagram_json(json_data, username):
     """Extract profile data from Instagram JSON response"""
     try:
-        profile_data = {
-            'username': username,
-            'display_name': '',
-            'bio': '',
-            'follower_count': 0,
-            'post_count': 0,
-            'posts': [],
-            'success': False
-        }
-        
-        # Navigate different JSON structures
-        user_data = None
-        possible_paths = [
-            ['entry_data', 'ProfilePage', 0, 'graphql', 'user'],
-            ['data', 'user'],
-            ['user'],
-            ['graphql', 'user'],
-            ['data', 'data', 'user']
-        ]
-        
-        for path in possible_paths:
-            try:
-                current = json_data
-                for key in path:
-                    if isinstance(key, int):
-                        current = current[key]
-                    else:
-                        current = current[key]
-                user_data = current
-                break
-            except:
-                continue
-        
-        if user_data:
-            # Extract basic profile info
-            profile_data.update({
-                'display_name': user_data.get('full_name', ''),
-                'bio': user_data.get('biography', ''),
-                'follower_count': user_data.get('edge_followed_by', {}).get('count', 0),
-                'post_count': user_data.get('edge_owner_to_timeline_media', {}).get('count', 0)
-            })
-            
-            # Extract posts
-            posts_edges = user_data.get('edge_owner_to_timeline_media', {}).get('edges', [])
-            posts = []
-            
-            for edge in posts_edges[:12]:  # Limit to 12 posts
-                node = edge.get('node', {})
-                
-                # Get caption
-                caption_edges = node.get('edge_media_to_caption', {}).get('edges', [])
-                caption = ''
-                if caption_edges:
-                    caption = caption_edges[0].get('node', {}).get('text', '')
-                
-                posts.append({
-                    'image': node.get('display_url', ''),
-                    'caption': caption,
-                    'timestamp': node.get('taken_at_timestamp', ''),
-                    'likes': node.get('edge_liked_by', {}).get('count', 0),
-                    'comments': node.get('edge_media_to_comment', {}).get('count', 0)
-                })
-            
-            profile_data['posts'] = posts
-            profile_data['success'] = True
-            print(f"📊 JSON extracted: name='{profile_data['display_name']}', bio='{profile_data['bio'][:50]}...', posts={len(posts)}")
-            return profile_data
+        record = profile_from_json(json_data, username)
+        if record:
+            print(f"📊 JSON extracted: name='{record.full_name}', bio='{record.bio[:50]}...', posts={len(record.posts)}")
+            return record.to_dict(success=True)
             
     except Exception as e:
         print(f"JSON extraction failed: {e}")
@@ -1510,132 +1282,119 @@ def extract_from_instagram_json(json_data, username):
 def try_selenium_extraction(username):
     """Selenium-based extraction with wait for dynamic content"""
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
         
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-web-security')
-        chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36')
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.get(f"https://www.instagram.com/{username}/")
-        
-        # Wait for page to load
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.TAG_NAME, "main"))
-        )
+        # Warm browser from the shared pool instead of starting Chrome per username
+        with browser_pool.lease() as driver:
+            driver.get(f"https://www.instagram.com/{username}/")
         
-        profile_data = {
-            'username': username,
-            'display_name': '',
-            'bio': '',
-            'follower_count': 0,
-            'posts': [],
-            'success': False
-        }
+            # Wait for page to load
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.TAG_NAME, "main"))
+            )
         
-        # Extract profile name
-        try:
-            name_selectors = [
-                "h2",
-                "[data-testid='user-detail-username']",
-                "header h1",
-                "header h2"
-            ]
-            for selector in name_selectors:
-                try:
-                    element = driver.find_element(By.CSS_SELECTOR, selector)
-                    profile_data['display_name'] = element.text.strip()
-                    break
-                except:
-                    continue
-        except:
-            pass
+            profile_data = {
+                'username': username,
+                'display_name': '',
+                'bio': '',
+                'follower_count': 0,
+                'posts': [],
+                'success': False
+            }
         
-        # Extract bio
-        try:
-            bio_selectors = [
-                "div[data-testid='user-bio']",
-                "div.-vDIg span",
-                "header div span",
-                "div[style*='word-wrap'] span"
-            ]
-            for selector in bio_selectors:
-                try:
-                    element = driver.find_element(By.CSS_SELECTOR, selector)
-                    profile_data['bio'] = element.text.strip()
-                    break
-                except:
-                    continue
-        except:
-            pass
+            # Extract profile name
+            try:
+                name_selectors = [
+                    "h2",
+                    "[data-testid='user-detail-username']",
+                    "header h1",
+                    "header h2"
+                ]
+                for selector in name_selectors:
+                    try:
+                        element = driver.find_element(By.CSS_SELECTOR, selector)
+                        profile_data['display_name'] = element.text.strip()
+                        break
+                    except:
+                        continue
+            except:
+                pass
         
-        # Extract follower count
-        try:
-            follower_selectors = [
-                "a[href*='followers'] span",
-                "div[title*='followers']",
-                "span[title]"
-            ]
-            for selector in follower_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        text = element.get_attribute('title') or element.text
-                        if 'follower' in text.lower() or text.replace(',', '').isdigit():
-                            profile_data['follower_count'] = parse_follower_count(text)
-                            break
-                    if profile_data['follower_count'] > 0:
+            # Extract bio
+            try:
+                bio_selectors = [
+                    "div[data-testid='user-bio']",
+                    "div.-vDIg span",
+                    "header div span",
+                    "div[style*='word-wrap'] span"
+                ]
+                for selector in bio_selectors:
+                    try:
+                        element = driver.find_element(By.CSS_SELECTOR, selector)
+                        profile_data['bio'] = element.text.strip()
                         break
-                except:
-                    continue
-        except:
-            pass
+                    except:
+                        continue
+            except:
+                pass
         
-        # Extract posts
-        try:
-            # Wait for images to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "img"))
-            )
+            # Extract follower count
+            try:
+                follower_selectors = [
+                    "a[href*='followers'] span",
+                    "div[title*='followers']",
+                    "span[title]"
+                ]
+                for selector in follower_selectors:
+                    try:
+                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                        for element in elements:
+                            text = element.get_attribute('title') or element.text
+                            if 'follower' in text.lower() or text.replace(',', '').isdigit():
+                                profile_data['follower_count'] = parse_follower_count(text)
+                                break
+                        if profile_data['follower_count'] > 0:
+                            break
+                    except:
+                        continue
+            except:
+                pass
+        
+            # Extract posts
+            try:
+                # Wait for images to load
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "img"))
+                )
             
-            images = driver.find_elements(By.CSS_SELECTOR, "img")
-            posts = []
+                images = driver.find_elements(By.CSS_SELECTOR, "img")
+                posts = []
             
-            for img in images:
-                try:
-                    src = img.get_attribute('src')
-                    alt = img.get_attribute('alt') or ''
+                for img in images:
+                    try:
+                        src = img.get_attribute('src')
+                        alt = img.get_attribute('alt') or ''
                     
-                    if (src and 'scontent' in src and 
-                        any(indicator in src for indicator in ['cdninstagram', 'fbcdn']) and
-                        not any(exclude in src.lower() for exclude in ['profile', 'avatar'])):
+                        if (src and 'scontent' in src and 
+                            any(indicator in src for indicator in ['cdninstagram', 'fbcdn']) and
+                            not any(exclude in src.lower() for exclude in ['profile', 'avatar'])):
                         
-                        posts.append({
-                            'image': src,
-                            'caption': alt,
-                            'timestamp': '',
-                            'likes': 0,
-                            'comments': 0
-                        })
-                except:
-                    continue
+                            posts.append({
+                                'image': src,
+                                'caption': alt,
+                                'timestamp': '',
+                                'likes': 0,
+                                'comments': 0
+                            })
+                    except:
+                        continue
             
-            profile_data['posts'] = posts[:12]
+                profile_data['posts'] = posts[:12]
             
-        except:
-            pass
-        
-        driver.quit()
+            except:
+                pass
         
         # Check if we got meaningful data
         if (profile_data['display_name'] or 
@@ -1648,10 +1407,6 @@ def try_selenium_extraction(username):
             
     except Exception as e:
         print(f"Selenium extraction failed: {e}")
-        try:
-            driver.quit()
-        except:
-            pass
     
     return {'success': False}
 
@@ -1674,8 +1429,10 @@ def try_api_endpoints(username):
         }
         
         for endpoint in endpoints:
+            if extraction_cancelled():
+                break
             try:
-                response = requests.get(endpoint, headers=headers, timeout=10)
+                response = http_client.get(endpoint, headers=headers, timeout=10)
                 if response.status_code == 200:
                     try:
                         data = response.json()
@@ -1810,54 +1567,66 @@ def extract_brand_colors(profile_pic_url):
         if not profile_pic_url:
             return generate_default_colors()
             
-        response = requests.get(profile_pic_url, timeout=10)
+        response = http_client.get(profile_pic_url, timeout=10)
         if response.status_code == 200:
-            image = Image.open(io.BytesIO(response.content))
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Save to temporary file for ColorThief
-            temp_file = io.BytesIO()
-            image.save(temp_file, format='JPEG')
-            temp_file.seek(0)
-            
-            color_thief = ColorThief(temp_file)
-            
-            # Get dominant color and palette
-            dominant_color = color_thief.get_color(quality=1)
-            palette = color_thief.get_palette(color_count=3, quality=1)
-            
-            # Convert RGB to hex
-            primary = f"#{dominant_color[0]:02x}{dominant_color[1]:02x}{dominant_color[2]:02x}"
-            secondary = f"#{palette[1][0]:02x}{palette[1][1]:02x}{palette[1][2]:02x}"
-            accent = f"#{palette[2][0]:02x}{palette[2][1]:02x}{palette[2][2]:02x}"
-            
-            return {
-                'primary': primary,
-                'secondary': secondary,
-                'accent': accent
-            }
+            return brand_colors_from_bytes(response.content)
+    except Exception as e:
+        print(f"Error extracting colors: {e}")
+        
+    return generate_default_colors()
+
+def brand_colors_from_bytes(content):
+    """Brand colors from already-downloaded profile picture bytes"""
+    try:
+        if content:
+            return brand_colors(content)
     except Exception as e:
         print(f"Error extracting colors: {e}")
         
     return generate_default_colors()
 
+def prepare_post_images(posts, max_side=None, limit=None, downloaded_only=False):
+    """[(post, image bytes or None)] with near-duplicate posts (the same shot posted twice, or
+    re-encoded) collapsed into the first one, up to limit posts. Each image is downloaded once;
+    with max_side the kept images come back downscaled for the consumer. Posts whose image
+    didn't download are kept (with None), since there's nothing to compare them by, unless
+    downloaded_only"""
+    posts = [post for post in posts if post.get('image')]
+    prepared = [result['signature'] or ((None, None), None)
+                for result in image_pipeline.run([(post['image'], ('signature',)) for post in posts])]
+    duplicate_of = near_duplicates([signature for signature, _ in prepared], max_distance=IMAGE_DEDUPE_DISTANCE)
+    
+    unique = [(post, content) for post, (_, content), original in zip(posts, prepared, duplicate_of) if original is None]
+    if len(unique) < len(posts):
+        print(f"🧹 Collapsed {len(posts) - len(unique)} near-duplicate posts")
+    if downloaded_only:
+        unique = [(post, content) for post, content in unique if content]
+    unique = unique[:limit] if limit else unique
+    
+    # Only the images that survived dedupe are worth resizing
+    if max_side and unique:
+        with ThreadPoolExecutor(max_workers=min(IMAGE_DOWNLOAD_WORKERS, len(unique))) as executor:
+            contents = list(executor.map(lambda item: downscale_jpeg(item[1], max_side) if item[1] else None, unique))
+        unique = [(post, content) for (post, _), content in zip(unique, contents)]
+    return unique
+
 def analyze_instagram_posts_with_vertex(posts, business_info):
     """Analyze Instagram posts using Google Vertex AI to detect products"""
     try:
-        from google.cloud import aiplatform, vision
         import json
         
-        # Check if Google Cloud is properly configured
-        if not GOOGLE_PROJECT_ID or not GOOGLE_AUTH_AVAILABLE:
+        # Check if Google Cloud is properly configured (an explicit Vision endpoint counts)
+        if not VISION_API_ENDPOINT and (not GOOGLE_PROJECT_ID or not google_auth_available()):
             print("⚠️  Google Cloud not configured, using fallback product generation")
             return generate_fallback_products(posts, business_info)
         
         # Initialize Vision API client
         try:
-            vision_client = vision.ImageAnnotatorClient()
+            vision_annotator = VisionBatchAnnotator(
+                clients.get('vision'),
+                max_images=VISION_BATCH_SIZE,
+                cache=vision_cache
+            )
             # Test the client with a quick call to make sure billing is enabled
             print("🔍 Testing Google Cloud Vision API...")
         except Exception as auth_error:
@@ -1873,33 +1642,20 @@ def analyze_instagram_posts_with_vertex(posts, business_info):
         products = []
         analyzed_count = 0
         
-        for post in posts[:6]:  # Analyze up to 6 posts
+        # Download post images in parallel, drop near-duplicates and downscale to what Vision can
+        # use, then get objects, text and labels for up to 6 of them from one batched request
+        prepared = prepare_post_images(posts[:12], VISION_IMAGE_MAX_SIDE, limit=6, downloaded_only=True)
+        candidate_posts = [post for post, _ in prepared]
+        annotations = vision_annotator.annotate([content for _, content in prepared])
+        
+        for post, annotation in zip(candidate_posts, annotations):
             try:
-                if not post.get('image'):
-                    continue
-                    
-                # Download image for analysis
-                response = requests.get(post['image'], timeout=10)
-                if response.status_code != 200:
+                if annotation is None:
                     continue
-                    
-                image_content = response.content
-                
-                # Analyze image with Vision API
-                image = vision.Image(content=image_content)
-                
-                # Detect objects
-                objects = vision_client.object_localization(image=image)
-                
-                # Detect text
-                text_detection = vision_client.text_detection(image=image)
-                
-                # Detect labels
-                label_detection = vision_client.label_detection(image=image)
                 
                 # Extract product information
                 detected_objects = []
-                for obj in objects.localized_object_annotations:
+                for obj in annotation.localized_object_annotations:
                     if obj.score > 0.5:  # Only high confidence objects
                         detected_objects.append({
                             'name': obj.name,
@@ -1908,12 +1664,12 @@ def analyze_instagram_posts_with_vertex(posts, business_info):
                 
                 # Extract text from image
                 extracted_text = ""
-                if text_detection.text_annotations:
-                    extracted_text = text_detection.text_annotations[0].description
+                if annotation.text_annotations:
+                    extracted_text = annotation.text_annotations[0].description
                 
                 # Extract labels
                 labels = []
-                for label in label_detection.label_annotations:
+                for label in annotation.label_annotations:
                     if label.score > 0.7:
                         labels.append(label.description)
                 
@@ -1996,6 +1752,7 @@ def analyze_instagram_posts_with_vertex(posts, business_info):
                         'name': product_name or f"Product {analyzed_count + 1}",
                         'price': price or "₹999",
                         'image': post['image'],
+                        'post_id': post.get('id'),
                         'description': product_description,
                         'detected_objects': detected_objects,
                         'labels': labels[:5],
@@ -2016,6 +1773,7 @@ def analyze_instagram_posts_with_vertex(posts, business_info):
                     'name': f"Featured Product {i + 1}",
                     'price': f"₹{999 + (i * 500)}",
                     'image': post.get('image', ''),
+                    'post_id': post.get('id'),
                     'description': post.get('caption', f"Premium product from {business_info.get('display_name', 'our collection')}")[:100] + "...",
                     'detected_objects': [],
                     'labels': [],
@@ -2032,39 +1790,31 @@ def analyze_instagram_posts_with_vertex(posts, business_info):
 def generate_fallback_products(posts, business_info):
     """Generate intelligent fallback products when AI analysis fails"""
     # Use intelligent business analysis even for fallback
+    category = classify(business_info.get('bio', ''), business_info.get('display_name', ''))
     smart_products = generate_smart_mock_products(
         business_info.get('display_name', 'Business'), 
-        business_info.get('bio', '')
+        business_info.get('bio', ''),
+        category=category
     )
     
     products = []
     
     # If we have posts, use their images; otherwise use placeholder images
     for i, smart_product in enumerate(smart_products):
+        post_id = None
         if i < len(posts) and posts[i].get('image'):
             image_url = posts[i]['image']
+            post_id = posts[i].get('id')
         else:
             # Use business-type appropriate placeholder images
-            business_name = business_info.get('display_name', '').lower()
-            bio = business_info.get('bio', '').lower()
-            combined = business_name + ' ' + bio
-            
-            if any(word in combined for word in ['plant', 'lily', 'flower', 'garden']):
-                image_url = f"https://images.unsplash.com/photo-1416879595882-3373a0480b5b?w=400&h=400&fit=crop"
-            elif any(word in combined for word in ['jewelry', 'gold', 'silver', 'ring']):
-                image_url = f"https://images.unsplash.com/photo-1515562141207-7a88fb7ce338?w=400&h=400&fit=crop"
-            elif any(word in combined for word in ['food', 'cake', 'bakery']):
-                image_url = f"https://images.unsplash.com/photo-1578985545062-69928b1d9587?w=400&h=400&fit=crop"
-            elif any(word in combined for word in ['fashion', 'clothing', 'dress']):
-                image_url = f"https://images.unsplash.com/photo-1434389677669-e08b4cac3105?w=400&h=400&fit=crop"
-            else:
-                image_url = f"https://images.unsplash.com/photo-1441986300917-64674bd600d8?w=400&h=400&fit=crop"
+            image_url = PLACEHOLDER_IMAGES.get(category, PLACEHOLDER_IMAGES['general'])
         
         products.append({
             'id': f"product_{i + 1}",
             'name': smart_product['name'],
             'price': smart_product['price'],
             'image': image_url,
+            'post_id': post_id,
             'description': smart_product['description'],
             'detected_objects': [],
             'labels': [],
@@ -2073,6 +1823,15 @@ def generate_fallback_products(posts, business_info):
     
     return products[:4]  # Return max 4 products
 
+# Stock photo per business category for fallback products without a post image
+PLACEHOLDER_IMAGES = {
+    'plants': "https://images.unsplash.com/photo-1416879595882-3373a0480b5b?w=400&h=400&fit=crop",
+    'jewelry': "https://images.unsplash.com/photo-1515562141207-7a88fb7ce338?w=400&h=400&fit=crop",
+    'food': "https://images.unsplash.com/photo-1578985545062-69928b1d9587?w=400&h=400&fit=crop",
+    'fashion': "https://images.unsplash.com/photo-1434389677669-e08b4cac3105?w=400&h=400&fit=crop",
+    'general': "https://images.unsplash.com/photo-1441986300917-64674bd600d8?w=400&h=400&fit=crop"
+}
+
 def generate_default_colors():
     """Generate default color scheme"""
     return {
@@ -2081,14 +1840,15 @@ def generate_default_colors():
         'accent': '#EEC373'
     }
 
-def upload_image_to_cloudinary(image_url, folder="instagram_products"):
-    """Upload image to Cloudinary and return URL"""
+def upload_image_to_cloudinary(image_url, folder="instagram_products", content=None):
+    """Upload image to Cloudinary and return URL. With content, the bytes we already downloaded
+    are sent instead of having Cloudinary fetch image_url again"""
     try:
         if not CLOUDINARY_CLOUD_NAME:
             return image_url  # Return original if Cloudinary not configured
             
         response = cloudinary.uploader.upload(
-            image_url,
+            content or image_url,
             folder=folder,
             quality="auto",
             fetch_format="auto"
@@ -2098,43 +1858,32 @@ def upload_image_to_cloudinary(image_url, folder="instagram_products"):
         print(f"Error uploading to Cloudinary: {e}")
         return image_url
 
+def upload_thumbnail(content, folder="instagram_products/thumbnails"):
+    """Upload a THUMBNAIL_SIZE JPEG of the image; None if Cloudinary isn't configured or it fails"""
+    if not CLOUDINARY_CLOUD_NAME:
+        return None
+    try:
+        response = cloudinary.uploader.upload(downscale_jpeg(content, THUMBNAIL_SIZE, quality=80), folder=folder)
+        return response.get('secure_url')
+    except Exception as e:
+        print(f"Error uploading thumbnail to Cloudinary: {e}")
+        return None
+
 def generate_ai_content(business_name, bio, image_urls):
     """Legacy function - now replaced by Google Vertex AI analysis"""
     # This function is deprecated - we now use analyze_instagram_posts_with_vertex() 
     # which provides real product detection from Instagram posts
     return generate_smart_mock_products(business_name, bio)
 
-def generate_smart_mock_products(business_name, bio):
+def generate_smart_mock_products(business_name, bio, category=None):
     """Generate highly intelligent products based on detailed business analysis"""
-    business_lower = business_name.lower()
-    bio_lower = bio.lower()
-    combined_text = business_lower + " " + bio_lower
+    combined_text = f"{business_name} {bio}".lower()
     
-    # Enhanced business type detection with more keywords
-    business_types = {
-        'plants_nursery': ['plant', 'nursery', 'garden', 'lily', 'peace lily', 'flower', 'bloom', 'botanical', 'green', 'indoor plants'],
-        'food_bakery': ['food', 'cake', 'bakery', 'restaurant', 'cafe', 'kitchen', 'cook', 'bake', 'sweet', 'pastry'],
-        'jewelry': ['jewelry', 'jewellery', 'earring', 'necklace', 'ring', 'silver', 'gold', 'diamond', 'pearl', 'bracelet'],
-        'fashion': ['fashion', 'clothing', 'dress', 'shirt', 'wear', 'style', 'boutique', 'apparel', 'textile'],
-        'arts_crafts': ['art', 'craft', 'handmade', 'pottery', 'ceramic', 'creative', 'artist', 'design', 'decor'],
-        'beauty_wellness': ['beauty', 'spa', 'skin', 'cosmetic', 'wellness', 'massage', 'therapy', 'salon'],
-        'home_decor': ['home', 'decor', 'interior', 'furniture', 'decoration', 'living', 'room', 'house'],
-        'fitness': ['fitness', 'gym', 'yoga', 'health', 'workout', 'exercise', 'training', 'wellness'],
-        'technology': ['tech', 'computer', 'software', 'digital', 'app', 'website', 'mobile', 'gadget']
-    }
-    
-    # Detect primary business type
-    detected_type = 'general'
-    max_matches = 0
-    
-    for biz_type, keywords in business_types.items():
-        matches = sum(1 for keyword in keywords if keyword in combined_text)
-        if matches > max_matches:
-            max_matches = matches
-            detected_type = biz_type
+    # Detect primary business type (callers that already classified pass it in)
+    detected_type = category or classify(bio, business_name)
     
     # Generate products based on detected business type
-    if detected_type == 'plants_nursery':
+    if detected_type == 'plants':
         return [
             {"name": "Peace Lily Plant", "price": "899", "description": "Beautiful indoor peace lily plant that purifies air and brings tranquility to your space.", "image": "https://via.placeholder.com/300x300/4CAF50/FFFFFF?text=Peace+Lily"},
             {"name": "Monstera Deliciosa", "price": "1299", "description": "Stunning large-leaf monstera plant, perfect for modern home decor.", "image": "https://via.placeholder.com/300x300/4CAF50/FFFFFF?text=Monstera"},
@@ -2142,7 +1891,7 @@ def generate_smart_mock_products(business_name, bio):
             {"name": "Ceramic Plant Pot Set", "price": "599", "description": "Handcrafted ceramic pots in various sizes, perfect for your green friends.", "image": "https://via.placeholder.com/300x300/4CAF50/FFFFFF?text=Ceramic+Pots"},
             {"name": "Plant Care Kit", "price": "399", "description": "Complete plant care kit with fertilizer, tools, and care instructions.", "image": "https://via.placeholder.com/300x300/4CAF50/FFFFFF?text=Care+Kit"}
         ]
-    elif detected_type == 'food_bakery':
+    elif detected_type == 'food':
         return [
             {"name": "Signature Chocolate Cake", "price": "1299", "description": "Rich, moist chocolate cake with premium cocoa and fresh cream frosting.", "image": "https://via.placeholder.com/300x300/8D4004/FFFFFF?text=Cake"},
             {"name": "Artisan Cookies Box", "price": "599", "description": "Handcrafted cookies made with organic ingredients, perfect for gifting.", "image": "https://via.placeholder.com/300x300/8D4004/FFFFFF?text=Cookies"},
@@ -2163,21 +1912,21 @@ def generate_smart_mock_products(business_name, bio):
             {"name": "Silk Scarf Collection", "price": "799", "description": "Premium silk scarves in vibrant patterns, perfect for any season.", "image": "https://via.placeholder.com/300x300/FF69B4/FFFFFF?text=Scarf"},
             {"name": "Ethnic Jewelry Set", "price": "999", "description": "Traditional jewelry set that complements ethnic wear beautifully.", "image": "https://via.placeholder.com/300x300/FF69B4/FFFFFF?text=Jewelry+Set"}
         ]
-    elif detected_type == 'arts_crafts':
+    elif detected_type in ('crafts', 'art'):
         return [
             {"name": "Handmade Ceramic Vase", "price": "1299", "description": "Beautiful ceramic vase with unique glaze patterns, perfect for home decor.", "image": "https://via.placeholder.com/300x300/8B4513/FFFFFF?text=Ceramic+Vase"},
             {"name": "Wooden Wall Art", "price": "1899", "description": "Intricate wooden wall art piece carved by skilled artisans.", "image": "https://via.placeholder.com/300x300/8B4513/FFFFFF?text=Wall+Art"},
             {"name": "Macrame Plant Hanger", "price": "599", "description": "Handwoven macrame plant hanger that adds boho charm to any space.", "image": "https://via.placeholder.com/300x300/8B4513/FFFFFF?text=Macrame"},
             {"name": "Clay Tea Set", "price": "1599", "description": "Traditional clay tea set including teapot and 4 cups, perfect for tea lovers.", "image": "https://via.placeholder.com/300x300/8B4513/FFFFFF?text=Tea+Set"}
         ]
-    elif detected_type == 'beauty_wellness':
+    elif detected_type == 'beauty':
         return [
             {"name": "Organic Face Care Set", "price": "1299", "description": "Complete organic skincare set with cleanser, toner, and moisturizer.", "image": "https://via.placeholder.com/300x300/FFC0CB/000000?text=Face+Care"},
             {"name": "Herbal Hair Oil", "price": "599", "description": "Natural herbal hair oil for nourishment and healthy growth.", "image": "https://via.placeholder.com/300x300/FFC0CB/000000?text=Hair+Oil"},
             {"name": "Aromatherapy Candles", "price": "799", "description": "Set of relaxing aromatherapy candles for stress relief and ambiance.", "image": "https://via.placeholder.com/300x300/FFC0CB/000000?text=Candles"},
             {"name": "Natural Body Scrub", "price": "899", "description": "Exfoliating body scrub made with natural ingredients for smooth skin.", "image": "https://via.placeholder.com/300x300/FFC0CB/000000?text=Body+Scrub"}
         ]
-    elif detected_type == 'home_decor':
+    elif detected_type == 'home':
         return [
             {"name": "Decorative Wall Mirror", "price": "1599", "description": "Elegant decorative mirror that enhances any room's aesthetic.", "image": "https://via.placeholder.com/300x300/DEB887/000000?text=Mirror"},
             {"name": "Cushion Cover Set", "price": "899", "description": "Set of 4 designer cushion covers in matching patterns and colors.", "image": "https://via.placeholder.com/300x300/DEB887/000000?text=Cushions"},
@@ -2186,7 +1935,7 @@ def generate_smart_mock_products(business_name, bio):
         ]
     else:
         # Enhanced generic products with business name integration
-        business_adj = "Premium" if "premium" in combined_text else "Handcrafted" if any(word in combined_text for word in ["handmade", "craft", "artisan"]) else "Exclusive"
+        business_adj = "Premium" if "premium" in combined_text else "Exclusive"
         
         return [
             {"name": f"{business_adj} Collection Item", "price": "1299", "description": f"Signature {business_adj.lower()} item from {business_name}, made with attention to detail.", "image": "https://via.placeholder.com/300x300/cccccc/333333?text=Collection"},
@@ -2197,7 +1946,8 @@ def generate_smart_mock_products(business_name, bio):
 
 def generate_products_from_real_posts(business_info):
     """Generate products using REAL Instagram posts and captions"""
-    posts = business_info.get('posts', [])
+    # The same product posted twice should be one product
+    posts = [post for post, _ in prepare_post_images(business_info.get('posts', [])[:16])]
     bio = business_info.get('bio', '')
     business_name = business_info.get('name', '')
     
@@ -2278,30 +2028,26 @@ def generate_products_from_real_posts(business_info):
     print(f"✅ Generated {len(products)} products from REAL Instagram posts")
     return products
 
+# Product ideas per business category when all we have is the bio
+BIO_PRODUCT_HINTS = {
+    'plants': ['plants', 'pots', 'gardening supplies'],
+    'crafts': ['handcrafted items', 'custom designs', 'artisan pieces'],
+    'jewelry': ['earrings', 'necklaces', 'rings'],
+    'food': ['baked goods', 'custom cakes', 'desserts']
+}
+
 def generate_products_from_bio_only(business_info):
     """Generate products from bio analysis when no posts are available"""
     bio = business_info.get('bio', '')
     business_name = business_info.get('name', '')
     business_type = business_info.get('business_type', 'General Business')
     
-    # Analyze bio for product keywords
-    bio_lower = bio.lower()
-    
     products = []
     
     # Extract product hints from bio
-    product_keywords = []
-    if 'plant' in bio_lower or 'nursery' in bio_lower:
-        product_keywords = ['plants', 'pots', 'gardening supplies']
-    elif 'craft' in bio_lower or 'handmade' in bio_lower:
-        product_keywords = ['handcrafted items', 'custom designs', 'artisan pieces']
-    elif 'jewelry' in bio_lower or 'jewellery' in bio_lower:
-        product_keywords = ['earrings', 'necklaces', 'rings']
-    elif 'food' in bio_lower or 'cake' in bio_lower:
-        product_keywords = ['baked goods', 'custom cakes', 'desserts']
-    else:
+    product_keywords = BIO_PRODUCT_HINTS.get(business_info.get('business_category') or classify(bio))
+    if not product_keywords:
         # Try to extract nouns from bio
-        import re
         words = re.findall(r'\b[a-zA-Z]{3,}\b', bio)
         product_keywords = words[:3] if words else ['custom items']
     
@@ -2335,23 +2081,33 @@ def generate_mock_products():
         {"name": "Premium Collection", "price": "1599", "description": "Premium quality item from our exclusive collection.", "image": "https://via.placeholder.com/300x300/cccccc/333333?text=Premium+Collection"}
     ]
 
+# Catalog page shells and product cards, compiled once at import. Shared CSS/JS is served
+# from /assets under content-hashed names; only the colour variables stay inline per store
+ENHANCED_STORE_TEMPLATE = load_template('enhanced_store.html')
+ENHANCED_STORE_PRODUCT_CARD = load_template('enhanced_store_product_card.html')
+CLASSIC_STORE_TEMPLATE = load_template('classic_store.html')
+CLASSIC_STORE_PRODUCT_CARD = load_template('classic_store_product_card.html')
+
 def generate_enhanced_shopping_website(instagram_username, profile_data, products):
     """Generate enhanced shopping website with cart functionality and dynamic colors"""
     
     # Determine business type and set appropriate color scheme
-    business_type = profile_data.get('detected_business_type', 'lifestyle')
+    # Generated profiles carry their category; real ones are classified from what they say
+    business_type = category_style(profile_data.get('detected_business_type') or classify(
+        profile_data.get('bio', ''), profile_data.get('full_name', '')
+    ))
     username_lower = instagram_username.lower()
     
     # Enhanced color schemes based on business type
     color_schemes = {
-        'craft': {
+        'crafts': {
             'primary': '#8B4513',      # Saddle Brown
             'secondary': '#D2691E',    # Chocolate  
             'accent': '#F4A460',       # Sandy Brown
             'background': '#FFF8DC',   # Cornsilk
             'card': '#FFFFFF'
         },
-        'plant': {
+        'plants': {
             'primary': '#228B22',      # Forest Green
             'secondary': '#32CD32',    # Lime Green
             'accent': '#ADFF2F',       # Green Yellow
@@ -2379,7 +2135,7 @@ def generate_enhanced_shopping_website(instagram_username, profile_data, product
             'background': '#FFF0F5',   # Lavender Blush
             'card': '#FFFFFF'
         },
-        'lifestyle': {
+        'general': {
             'primary': '#4682B4',      # Steel Blue
             'secondary': '#87CEEB',    # Sky Blue
             'accent': '#E0E0E0',       # Light Gray
@@ -2388,832 +2144,50 @@ def generate_enhanced_shopping_website(instagram_username, profile_data, product
         }
     }
     
-    colors = color_schemes.get(business_type, color_schemes['lifestyle'])
+    colors = color_schemes.get(business_type, color_schemes['general'])
     
     # Extract phone number for thepeacelily.in specifically
     whatsapp_number = '918218668337'  # Default for thepeacelily.in
     if 'thepeacelily' in username_lower or 'peace' in username_lower:
         whatsapp_number = '918218668337'
     
-    template = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{profile_data.get('full_name', instagram_username)} - Online Store</title>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Playfair+Display:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
-    <style>
-        :root {{
-            --primary-color: {colors['primary']};
-            --secondary-color: {colors['secondary']};
-            --accent-color: {colors['accent']};
-            --background-color: {colors['background']};
-            --card-color: {colors['card']};
-            --text-dark: #2c2c2c;
-            --text-light: #ffffff;
-            --text-gray: #666666;
-            --whatsapp-color: #25D366;
-            --success-color: #10B981;
-            --warning-color: #F59E0B;
-            --error-color: #EF4444;
-        }}
-        
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Inter', sans-serif;
-            background-color: var(--background-color);
-            color: var(--text-dark);
-            line-height: 1.6;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 0 20px;
-        }}
-        
-        /* Header with Cart */
-        header {{
-            background: var(--card-color);
-            box-shadow: 0 2px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }}
-        
-        .header-content {{
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            padding: 15px 0;
-        }}
-        
-        .logo {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }}
-        
-        .logo-icon {{
-            width: 50px;
-            height: 50px;
-            background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-            border-radius: 12px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: var(--text-light);
-            font-size: 20px;
-            font-weight: 700;
-            font-family: 'Playfair Display', serif;
-        }}
-        
-        .logo-text {{
-            font-family: 'Playfair Display', serif;
-            font-size: 24px;
-            font-weight: 600;
-            color: var(--text-dark);
-        }}
-        
-        .header-actions {{
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }}
-        
-        .cart-button {{
-            position: relative;
-            background: var(--primary-color);
-            color: var(--text-light);
-            border: none;
-            border-radius: 10px;
-            padding: 12px 15px;
-            cursor: pointer;
-            font-size: 16px;
-            transition: all 0.3s ease;
-        }}
-        
-        .cart-button:hover {{
-            background: var(--secondary-color);
-            transform: translateY(-2px);
-        }}
-        
-        .cart-count {{
-            position: absolute;
-            top: -8px;
-            right: -8px;
-            background: var(--error-color);
-            color: var(--text-light);
-            border-radius: 50%;
-            width: 24px;
-            height: 24px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-        
-        /* Hero Section */
-        .hero {{
-            background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-            color: var(--text-light);
-            padding: 80px 0;
-            text-align: center;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .hero::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><defs><pattern id="grain" width="100" height="100" patternUnits="userSpaceOnUse"><circle cx="50" cy="50" r="1" fill="rgba(255,255,255,0.1)"/></pattern></defs><rect width="100" height="100" fill="url(%23grain)"/></svg>');
-            opacity: 0.3;
-        }}
-        
-        .hero-content {{
-            position: relative;
-            z-index: 2;
-        }}
-        
-        .hero-title {{
-            font-family: 'Playfair Display', serif;
-            font-size: 48px;
-            font-weight: 700;
-            margin-bottom: 20px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
-        
-        .hero-subtitle {{
-            font-size: 20px;
-            margin-bottom: 30px;
-            max-width: 600px;
-            margin-left: auto;
-            margin-right: auto;
-            opacity: 0.95;
-        }}
-        
-        .hero-stats {{
-            display: flex;
-            justify-content: center;
-            gap: 40px;
-            margin-top: 40px;
-        }}
-        
-        .stat-item {{
-            text-align: center;
-        }}
-        
-        .stat-number {{
-            font-size: 28px;
-            font-weight: 700;
-            display: block;
-        }}
-        
-        .stat-label {{
-            font-size: 14px;
-            opacity: 0.8;
-        }}
-        
-        /* Products Section */
-        .products-section {{
-            padding: 80px 0;
-        }}
-        
-        .section-title {{
-            font-family: 'Playfair Display', serif;
-            font-size: 36px;
-            text-align: center;
-            margin-bottom: 20px;
-            color: var(--text-dark);
-        }}
-        
-        .section-subtitle {{
-            text-align: center;
-            color: var(--text-gray);
-            margin-bottom: 60px;
-            font-size: 18px;
-        }}
-        
-        .products-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 30px;
-        }}
-        
-        .product-card {{
-            background: var(--card-color);
-            border-radius: 16px;
-            overflow: hidden;
-            box-shadow: 0 8px 30px rgba(0,0,0,0.1);
-            transition: all 0.4s ease;
-            position: relative;
-        }}
-        
-        .product-card:hover {{
-            transform: translateY(-10px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.15);
-        }}
-        
-        .product-image {{
-            width: 100%;
-            height: 250px;
-            object-fit: cover;
-            transition: transform 0.4s ease;
-        }}
-        
-        .product-card:hover .product-image {{
-            transform: scale(1.05);
-        }}
-        
-        .product-info {{
-            padding: 24px;
-        }}
-        
-        .product-name {{
-            font-size: 20px;
-            font-weight: 600;
-            margin-bottom: 8px;
-            color: var(--text-dark);
-        }}
-        
-        .product-price {{
-            font-size: 24px;
-            font-weight: 700;
-            color: var(--primary-color);
-            margin-bottom: 12px;
-        }}
-        
-        .product-description {{
-            color: var(--text-gray);
-            margin-bottom: 20px;
-            line-height: 1.5;
-        }}
-        
-        .product-actions {{
-            display: flex;
-            gap: 10px;
-        }}
-        
-        .add-to-cart {{
-            flex: 1;
-            background: var(--primary-color);
-            color: var(--text-light);
-            border: none;
-            border-radius: 10px;
-            padding: 12px 20px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .add-to-cart:hover {{
-            background: var(--secondary-color);
-            transform: translateY(-2px);
-        }}
-        
-        .add-to-cart.added {{
-            background: var(--success-color);
-        }}
-        
-        .quantity-controls {{
-            display: none;
-            align-items: center;
-            gap: 10px;
-        }}
-        
-        .quantity-controls.active {{
-            display: flex;
-        }}
-        
-        .quantity-btn {{
-            background: var(--accent-color);
-            border: none;
-            border-radius: 6px;
-            width: 30px;
-            height: 30px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            cursor: pointer;
-            font-weight: 600;
-        }}
-        
-        .quantity-display {{
-            font-weight: 600;
-            min-width: 30px;
-            text-align: center;
-        }}
-        
-        /* Cart Sidebar */
-        .cart-sidebar {{
-            position: fixed;
-            top: 0;
-            right: -400px;
-            width: 400px;
-            height: 100vh;
-            background: var(--card-color);
-            box-shadow: -5px 0 25px rgba(0,0,0,0.2);
-            z-index: 2000;
-            transition: right 0.4s ease;
-            display: flex;
-            flex-direction: column;
-        }}
-        
-        .cart-sidebar.open {{
-            right: 0;
-        }}
-        
-        .cart-header {{
-            padding: 20px;
-            border-bottom: 1px solid #eee;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .cart-title {{
-            font-size: 20px;
-            font-weight: 600;
-        }}
-        
-        .close-cart {{
-            background: none;
-            border: none;
-            font-size: 24px;
-            cursor: pointer;
-            color: var(--text-gray);
-        }}
-        
-        .cart-items {{
-            flex: 1;
-            overflow-y: auto;
-            padding: 20px;
-        }}
-        
-        .cart-item {{
-            display: flex;
-            align-items: center;
-            gap: 15px;
-            padding: 15px 0;
-            border-bottom: 1px solid #eee;
-        }}
-        
-        .cart-item-image {{
-            width: 60px;
-            height: 60px;
-            object-fit: cover;
-            border-radius: 8px;
-        }}
-        
-        .cart-item-info {{
-            flex: 1;
-        }}
-        
-        .cart-item-name {{
-            font-weight: 600;
-            margin-bottom: 5px;
-        }}
-        
-        .cart-item-price {{
-            color: var(--primary-color);
-            font-weight: 600;
-        }}
-        
-        .cart-total {{
-            padding: 20px;
-            border-top: 2px solid var(--primary-color);
-            background: var(--background-color);
-        }}
-        
-        .total-amount {{
-            font-size: 24px;
-            font-weight: 700;
-            color: var(--primary-color);
-            margin-bottom: 20px;
-        }}
-        
-        .checkout-btn {{
-            width: 100%;
-            background: var(--whatsapp-color);
-            color: var(--text-light);
-            border: none;
-            border-radius: 12px;
-            padding: 15px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 10px;
-        }}
-        
-        .checkout-btn:hover {{
-            background: #20b954;
-            transform: translateY(-2px);
-        }}
-        
-        /* Cart Overlay */
-        .cart-overlay {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0,0,0,0.5);
-            z-index: 1500;
-            opacity: 0;
-            visibility: hidden;
-            transition: all 0.3s ease;
-        }}
-        
-        .cart-overlay.active {{
-            opacity: 1;
-            visibility: visible;
-        }}
-        
-        /* Footer */
-        footer {{
-            background: var(--text-dark);
-            color: var(--text-light);
-            padding: 60px 0 30px;
-            margin-top: 80px;
-        }}
-        
-        .footer-content {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 40px;
-            margin-bottom: 40px;
-        }}
-        
-        .footer-section h3 {{
-            font-family: 'Playfair Display', serif;
-            margin-bottom: 20px;
-            color: var(--accent-color);
-        }}
-        
-        .footer-link {{
-            color: rgba(255,255,255,0.8);
-            text-decoration: none;
-            display: block;
-            margin-bottom: 10px;
-            transition: color 0.3s ease;
-        }}
-        
-        .footer-link:hover {{
-            color: var(--accent-color);
-        }}
-        
-        .footer-bottom {{
-            text-align: center;
-            padding-top: 30px;
-            border-top: 1px solid rgba(255,255,255,0.1);
-            color: rgba(255,255,255,0.6);
-        }}
-        
-        /* Responsive Design */
-        @media (max-width: 768px) {{
-            .cart-sidebar {{
-                width: 100%;
-                right: -100%;
-            }}
-            
-            .hero-title {{
-                font-size: 36px;
-            }}
-            
-            .hero-stats {{
-                flex-direction: column;
-                gap: 20px;
-            }}
-            
-            .products-grid {{
-                grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-                gap: 20px;
-            }}
-            
-            .header-content {{
-                flex-wrap: wrap;
-                gap: 15px;
-            }}
-        }}
-        
-        /* Animations */
-        @keyframes addToCart {{
-            0% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.1); }}
-            100% {{ transform: scale(1); }}
-        }}
-        
-        .add-to-cart.animating {{
-            animation: addToCart 0.3s ease;
-        }}
-    </style>
-</head>
-<body>
-    <header>
-        <div class="container">
-            <div class="header-content">
-                <div class="logo">
-                    <div class="logo-icon">
-                        {profile_data.get('full_name', instagram_username)[0]}
-                    </div>
-                    <div class="logo-text">{profile_data.get('full_name', instagram_username)}</div>
-                </div>
-                <div class="header-actions">
-                    <button class="cart-button" onclick="toggleCart()">
-                        <i class="fas fa-shopping-cart"></i>
-                        <span class="cart-count" id="cartCount">0</span>
-                    </button>
-                </div>
-            </div>
-        </div>
-    </header>
-
-    <section class="hero">
-        <div class="container">
-            <div class="hero-content">
-                <h1 class="hero-title">{profile_data.get('full_name', instagram_username)}</h1>
-                <p class="hero-subtitle">{profile_data.get('bio', 'Discover our amazing collection of products')}</p>
-                <div class="hero-stats">
-                    <div class="stat-item">
-                        <span class="stat-number">{profile_data.get('followers', 0):,}</span>
-                        <span class="stat-label">Followers</span>
-                    </div>
-                    <div class="stat-item">
-                        <span class="stat-number">{profile_data.get('post_count', 0)}</span>
-                        <span class="stat-label">Posts</span>
-                    </div>
-                    <div class="stat-item">
-                        <span class="stat-number">{len(products)}</span>
-                        <span class="stat-label">Products</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <section class="products-section">
-        <div class="container">
-            <h2 class="section-title">Our Products</h2>
-            <p class="section-subtitle">Handpicked collection just for you</p>
-            
-            <div class="products-grid" id="productsGrid">"""
-
-    # Add products dynamically
-    for i, product in enumerate(products):
-        template += f"""
-                <div class="product-card">
-                    <img src="{product['image']}" alt="{product['name']}" class="product-image">
-                    <div class="product-info">
-                        <h3 class="product-name">{product['name']}</h3>
-                        <div class="product-price">₹{product['price']}</div>
-                        <p class="product-description">{product['description']}</p>
-                        <div class="product-actions">
-                            <button class="add-to-cart" onclick="addToCart('{product['name']}', {product['price']}, '{product['image']}', this)" data-product-id="{i}">
-                                <i class="fas fa-cart-plus"></i> Add to Cart
-                            </button>
-                            <div class="quantity-controls" id="qty-{i}">
-                                <button class="quantity-btn" onclick="updateQuantity('{product['name']}', -1)">-</button>
-                                <span class="quantity-display" id="qty-display-{i}">1</span>
-                                <button class="quantity-btn" onclick="updateQuantity('{product['name']}', 1)">+</button>
-                            </div>
-                        </div>
-                    </div>
-                </div>"""
-
-    template += f"""
-            </div>
-        </div>
-    </section>
-
-    <!-- Cart Sidebar -->
-    <div class="cart-overlay" id="cartOverlay" onclick="toggleCart()"></div>
-    <div class="cart-sidebar" id="cartSidebar">
-        <div class="cart-header">
-            <h3 class="cart-title">Your Cart</h3>
-            <button class="close-cart" onclick="toggleCart()">&times;</button>
-        </div>
-        <div class="cart-items" id="cartItems">
-            <p style="text-align: center; color: #999; padding: 40px 0;">Your cart is empty</p>
-        </div>
-        <div class="cart-total">
-            <div class="total-amount">Total: ₹<span id="totalAmount">0</span></div>
-            <button class="checkout-btn" onclick="checkout()" id="checkoutBtn" disabled>
-                <i class="fab fa-whatsapp"></i>
-                Order via WhatsApp
-            </button>
-        </div>
-    </div>
-
-    <footer>
-        <div class="container">
-            <div class="footer-content">
-                <div class="footer-section">
-                    <h3>Contact Us</h3>
-                    <a href="https://wa.me/{whatsapp_number}" class="footer-link">
-                        <i class="fab fa-whatsapp"></i> WhatsApp: +91 {whatsapp_number[2:]}
-                    </a>
-                    <a href="https://instagram.com/{instagram_username}" class="footer-link">
-                        <i class="fab fa-instagram"></i> @{instagram_username}
-                    </a>
-                </div>
-                <div class="footer-section">
-                    <h3>Quick Links</h3>
-                    <a href="#" class="footer-link">About Us</a>
-                    <a href="#" class="footer-link">Privacy Policy</a>
-                    <a href="#" class="footer-link">Terms of Service</a>
-                </div>
-                <div class="footer-section">
-                    <h3>Follow Us</h3>
-                    <a href="https://instagram.com/{instagram_username}" class="footer-link">Instagram</a>
-                    <a href="#" class="footer-link">Facebook</a>
-                    <a href="#" class="footer-link">Twitter</a>
-                </div>
-            </div>
-            <div class="footer-bottom">
-                <p>&copy; 2024 {profile_data.get('full_name', instagram_username)}. All rights reserved. | Powered by <a href="#" style="color: var(--accent-color);">InHouse</a></p>
-            </div>
-        </div>
-    </footer>
-
-    <script>
-        // Cart functionality
-        let cart = [];
-        let isCartOpen = false;
-
-        function toggleCart() {{
-            const sidebar = document.getElementById('cartSidebar');
-            const overlay = document.getElementById('cartOverlay');
-            
-            isCartOpen = !isCartOpen;
-            
-            if (isCartOpen) {{
-                sidebar.classList.add('open');
-                overlay.classList.add('active');
-                document.body.style.overflow = 'hidden';
-            }} else {{
-                sidebar.classList.remove('open');
-                overlay.classList.remove('active');
-                document.body.style.overflow = 'auto';
-            }}
-        }}
-
-        function addToCart(name, price, image, buttonElement) {{
-            const existingItem = cart.find(item => item.name === name);
-            
-            if (existingItem) {{
-                existingItem.quantity += 1;
-            }} else {{
-                cart.push({{
-                    name: name,
-                    price: parseInt(price),
-                    image: image,
-                    quantity: 1
-                }});
-            }}
-            
-            // Animation effect
-            buttonElement.classList.add('animating');
-            setTimeout(() => buttonElement.classList.remove('animating'), 300);
-            
-            updateCartDisplay();
-            updateCartUI();
-        }}
-
-        function updateQuantity(name, change) {{
-            const item = cart.find(item => item.name === name);
-            if (item) {{
-                item.quantity += change;
-                if (item.quantity <= 0) {{
-                    cart = cart.filter(item => item.name !== name);
-                }}
-            }}
-            updateCartDisplay();
-            updateCartUI();
-        }}
-
-        function removeFromCart(name) {{
-            cart = cart.filter(item => item.name !== name);
-            updateCartDisplay();
-            updateCartUI();
-        }}
-
-        function updateCartDisplay() {{
-            const cartCount = document.getElementById('cartCount');
-            const totalItems = cart.reduce((sum, item) => sum + item.quantity, 0);
-            cartCount.textContent = totalItems;
-            cartCount.style.display = totalItems > 0 ? 'flex' : 'none';
-        }}
-
-        function updateCartUI() {{
-            const cartItems = document.getElementById('cartItems');
-            const totalAmount = document.getElementById('totalAmount');
-            const checkoutBtn = document.getElementById('checkoutBtn');
-            
-            if (cart.length === 0) {{
-                cartItems.innerHTML = '<p style="text-align: center; color: #999; padding: 40px 0;">Your cart is empty</p>';
-                totalAmount.textContent = '0';
-                checkoutBtn.disabled = true;
-                return;
-            }}
-            
-            let total = 0;
-            cartItems.innerHTML = cart.map(item => {{
-                const itemTotal = item.price * item.quantity;
-                total += itemTotal;
-                
-                return `
-                    <div class="cart-item">
-                        <img src="${{item.image}}" alt="${{item.name}}" class="cart-item-image">
-                        <div class="cart-item-info">
-                            <div class="cart-item-name">${{item.name}}</div>
-                            <div class="cart-item-price">₹${{item.price}} × ${{item.quantity}} = ₹${{itemTotal}}</div>
-                        </div>
-                        <div class="quantity-controls active">
-                            <button class="quantity-btn" onclick="updateQuantity('${{item.name}}', -1)">-</button>
-                            <span class="quantity-display">${{item.quantity}}</span>
-                            <button class="quantity-btn" onclick="updateQuantity('${{item.name}}', 1)">+</button>
-                        </div>
-                        <button onclick="removeFromCart('${{item.name}}')" style="background: none; border: none; color: #999; cursor: pointer;">
-                            <i class="fas fa-trash"></i>
-                        </button>
-                    </div>
-                `;
-            }}).join('');
-            
-            totalAmount.textContent = total.toLocaleString();
-            checkoutBtn.disabled = false;
-        }}
-
-        function checkout() {{
-            if (cart.length === 0) return;
-            
-            // Create detailed order message
-            let message = `🛒 *New Order from {profile_data.get('full_name', instagram_username)}*\\n\\n`;
-            message += `📱 *Customer Details:*\\n`;
-            message += `Website: {instagram_username}\\n\\n`;
-            
-            message += `🛍️ *Order Items:*\\n`;
-            let total = 0;
-            
-            cart.forEach((item, index) => {{
-                const itemTotal = item.price * item.quantity;
-                total += itemTotal;
-                message += `${{index + 1}}. *${{item.name}}*\\n`;
-                message += `   Price: ₹${{item.price}}\\n`;
-                message += `   Quantity: ${{item.quantity}}\\n`;
-                message += `   Subtotal: ₹${{itemTotal}}\\n\\n`;
-            }});
-            
-            message += `💰 *Total Amount: ₹${{total}}*\\n\\n`;
-            message += `📞 Please confirm this order and share payment details.\\n`;
-            message += `🚚 Let me know your delivery address.\\n\\n`;
-            message += `Thank you for choosing {profile_data.get('full_name', instagram_username)}! 🙏`;
-            
-            // Create URL with all cart details as parameters
-            const cartData = encodeURIComponent(JSON.stringify(cart));
-            const orderTotal = total;
-            const customerInfo = encodeURIComponent(instagram_username);
-            
-            const whatsappUrl = `https://wa.me/{whatsapp_number}?text=${{encodeURIComponent(message)}}&cart=${{cartData}}&total=${{orderTotal}}&customer=${{customerInfo}}`;
-            
-            // Open WhatsApp
-            window.open(whatsappUrl, '_blank');
-            
-            // Clear cart after successful order
-            cart = [];
-            updateCartDisplay();
-            updateCartUI();
-            toggleCart();
-            
-            // Show success message
-            alert('Order sent to WhatsApp! We will contact you soon.');
-        }}
-
-        // Initialize cart display
-        updateCartDisplay();
-        updateCartUI();
-    </script>
-</body>
-</html>"""
-
-    return template
+    store_name = profile_data.get('full_name', instagram_username)
+    product_cards = ENHANCED_STORE_PRODUCT_CARD.render_many(
+        {
+            'IMAGE': product['image'],
+            'THUMBNAIL': product.get('thumbnail') or product['image'],
+            'NAME': product['name'],
+            'PRICE': product['price'],
+            'DESCRIPTION': product['description'],
+            'INDEX': i
+        }
+        for i, product in enumerate(products)
+    )
+    
+    return ENHANCED_STORE_TEMPLATE.render(
+        STORE_NAME=store_name,
+        STORE_INITIAL=store_name[0],
+        STORE_BIO=profile_data.get('bio', 'Discover our amazing collection of products'),
+        FOLLOWER_COUNT=f"{profile_data.get('followers', 0):,}",
+        POST_COUNT=profile_data.get('post_count', 0),
+        PRODUCT_COUNT=len(products),
+        PRIMARY_COLOR=colors['primary'],
+        SECONDARY_COLOR=colors['secondary'],
+        ACCENT_COLOR=colors['accent'],
+        BACKGROUND_COLOR=colors['background'],
+        CARD_COLOR=colors['card'],
+        STORE_CSS_URL=asset_url('enhanced_store.css'),
+        STORE_JS_URL=asset_url('enhanced_store.js'),
+        STORE_CONFIG=json.dumps({
+            'storeName': store_name,
+            'username': instagram_username,
+            'whatsappNumber': whatsapp_number
+        }).replace('</', '<\\/'),
+        WHATSAPP_NUMBER=whatsapp_number,
+        WHATSAPP_DISPLAY_NUMBER=whatsapp_number[2:],
+        USERNAME=instagram_username,
+        PRODUCT_CARDS=product_cards
+    )
 
 
 def generate_enhanced_catalog_website(instagram_username, profile_data, products):
@@ -3223,357 +2197,6 @@ def generate_enhanced_catalog_website(instagram_username, profile_data, products
 
 def generate_catalog_website(instagram_username, profile_data, products):
     """Generate a custom catalog website from template"""
-    # Since we can't read from file system easily, we'll embed the template
-    template = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{STORE_NAME}} - {{STORE_TAGLINE}}</title>
-    <link href="https://fonts.googleapis.com/css2?family=Cormorant+Garamond:wght@400;500;600;700&family=Montserrat:wght@300;400;500;600&display=swap" rel="stylesheet">
-    <style>
-        :root {
-            --primary-color: {{PRIMARY_COLOR}};
-            --secondary-color: {{SECONDARY_COLOR}};
-            --accent-color: {{ACCENT_COLOR}};
-            --text-color: #2B2B2B;
-            --text-light: #FFFFFF;
-            --background: #FAFAFA;
-            --card-bg: #FFFFFF;
-            --whatsapp-color: #25D366;
-        }
-        
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        body {
-            font-family: 'Montserrat', sans-serif;
-            color: var(--text-color);
-            line-height: 1.6;
-            background-color: var(--background);
-        }
-        
-        h1, h2, h3, h4, h5 {
-            font-family: 'Cormorant Garamond', serif;
-            font-weight: 600;
-            margin-bottom: 1rem;
-        }
-        
-        .container {
-            width: 100%;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 0 15px;
-        }
-        
-        header {
-            background-color: var(--card-bg);
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .header-inner {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            padding: 15px 0;
-        }
-        
-        .logo {
-            display: flex;
-            align-items: center;
-        }
-        
-        .logo-circle {
-            width: 48px;
-            height: 48px;
-            background-color: var(--primary-color);
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: var(--text-light);
-            font-family: 'Cormorant Garamond', serif;
-            font-size: 20px;
-            margin-right: 10px;
-        }
-        
-        .logo-text {
-            font-family: 'Cormorant Garamond', serif;
-            font-size: 22px;
-            font-weight: 600;
-        }
-        
-        .whatsapp-button {
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            background-color: var(--whatsapp-color);
-            color: var(--text-light);
-            padding: 8px 16px;
-            border-radius: 6px;
-            font-weight: 500;
-            font-size: 14px;
-            text-decoration: none;
-        }
-        
-        .hero {
-            background: linear-gradient(135deg, var(--secondary-color), var(--primary-color));
-            padding: 60px 0;
-            text-align: center;
-            min-height: 450px;
-            display: flex;
-            align-items: center;
-        }
-        
-        .hero-title {
-            font-size: 42px;
-            margin-bottom: 20px;
-            color: var(--text-light);
-        }
-        
-        .hero-subtitle {
-            font-size: 18px;
-            max-width: 600px;
-            margin: 0 auto 30px;
-            color: var(--text-light);
-        }
-        
-        .cta-button {
-            background-color: var(--accent-color);
-            color: var(--text-color);
-            padding: 12px 32px;
-            border-radius: 6px;
-            font-weight: 500;
-            font-size: 16px;
-            border: none;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-        
-        .section-title {
-            text-align: center;
-            margin: 50px 0 30px;
-            position: relative;
-            font-size: 32px;
-        }
-        
-        .section-title:after {
-            content: '';
-            display: block;
-            width: 60px;
-            height: 3px;
-            background-color: var(--primary-color);
-            margin: 10px auto 0;
-        }
-        
-        .product-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(250px, 1fr));
-            gap: 30px;
-            margin-bottom: 50px;
-        }
-        
-        .product-card {
-            background-color: var(--card-bg);
-            border-radius: 6px;
-            overflow: hidden;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-            transition: all 0.3s ease;
-        }
-        
-        .product-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 8px 20px rgba(0,0,0,0.12);
-        }
-        
-        .product-image {
-            width: 100%;
-            height: 280px;
-            object-fit: cover;
-        }
-        
-        .product-info {
-            padding: 20px;
-        }
-        
-        .product-name {
-            font-weight: 500;
-            margin-bottom: 8px;
-            font-size: 18px;
-        }
-        
-        .product-price {
-            color: var(--primary-color);
-            font-weight: 600;
-            margin-bottom: 12px;
-            font-size: 20px;
-        }
-        
-        .product-description {
-            font-size: 14px;
-            color: var(--text-color);
-            margin-bottom: 20px;
-            display: -webkit-box;
-            -webkit-line-clamp: 2;
-            -webkit-box-orient: vertical;
-            overflow: hidden;
-        }
-        
-        .whatsapp-order {
-            width: 100%;
-            padding: 10px;
-            background-color: var(--whatsapp-color);
-            color: var(--text-light);
-            border: none;
-            border-radius: 6px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 8px;
-            text-decoration: none;
-        }
-        
-        .whatsapp-order:hover {
-            background-color: #20b954;
-        }
-        
-        footer {
-            background-color: var(--primary-color);
-            color: var(--text-light);
-            padding: 60px 0 20px;
-            margin-top: 60px;
-        }
-        
-        .footer-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 30px;
-            margin-bottom: 30px;
-        }
-        
-        .footer-title {
-            font-size: 18px;
-            margin-bottom: 15px;
-            color: var(--text-light);
-        }
-        
-        .footer-link {
-            color: rgba(255,255,255,0.8);
-            margin-bottom: 10px;
-            display: block;
-            text-decoration: none;
-            transition: all 0.3s ease;
-        }
-        
-        .footer-contact {
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            margin-bottom: 15px;
-            color: rgba(255,255,255,0.8);
-        }
-        
-        .footer-bottom {
-            text-align: center;
-            padding-top: 20px;
-            border-top: 1px solid rgba(255,255,255,0.1);
-            font-size: 14px;
-            color: rgba(255,255,255,0.6);
-        }
-        
-        .powered-by {
-            color: var(--accent-color);
-            text-decoration: none;
-            font-weight: 500;
-        }
-        
-        @media (max-width: 768px) {
-            .product-grid { grid-template-columns: repeat(auto-fill, minmax(150px, 1fr)); }
-            .product-image { height: 180px; }
-            .hero-title { font-size: 32px; }
-            .hero-subtitle { font-size: 16px; }
-            .section-title { font-size: 28px; }
-        }
-    </style>
-</head>
-<body>
-    <header>
-        <div class="container">
-            <div class="header-inner">
-                <div class="logo">
-                    <div class="logo-circle">{{LOGO_INITIALS}}</div>
-                    <div class="logo-text">{{STORE_NAME}}</div>
-                </div>
-                <div class="actions">
-                    <a href="https://wa.me/{{WHATSAPP_NUMBER}}" class="whatsapp-button" target="_blank">
-                        <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" viewBox="0 0 16 16">
-                            <path d="M13.601 2.326A7.854 7.854 0 0 0 7.994 0C3.627 0 .068 3.558.064 7.926c0 1.399.366 2.76 1.057 3.965L0 16l4.204-1.102a7.933 7.933 0 0 0 3.79.965h.004c4.368 0 7.926-3.558 7.93-7.93A7.898 7.898 0 0 0 13.6 2.326zM7.994 14.521a6.573 6.573 0 0 1-3.356-.92l-.24-.144-2.494.654.666-2.433-.156-.251a6.56 6.56 0 0 1-1.007-3.505c0-3.626 2.957-6.584 6.591-6.584a6.56 6.56 0 0 1 4.66 1.931 6.557 6.557 0 0 1 1.928 4.66c-.004 3.639-2.961 6.592-6.592 6.592z"/>
-                        </svg>
-                        <span>Contact on WhatsApp</span>
-                    </a>
-                </div>
-            </div>
-        </div>
-    </header>
-
-    <section class="hero">
-        <div class="container">
-            <h1 class="hero-title">{{HERO_TITLE}}</h1>
-            <p class="hero-subtitle">{{HERO_SUBTITLE}}</p>
-            <button class="cta-button" onclick="document.getElementById('products').scrollIntoView({behavior: 'smooth'})">{{CTA_TEXT}}</button>
-        </div>
-    </section>
-
-    <section class="products" id="products">
-        <div class="container">
-            <h2 class="section-title">{{PRODUCTS_TITLE}}</h2>
-            <div class="product-grid">
-                {{PRODUCTS_HTML}}
-            </div>
-        </div>
-    </section>
-
-    <footer>
-        <div class="container">
-            <div class="footer-grid">
-                <div>
-                    <h3 class="footer-title">{{STORE_NAME}}</h3>
-                    <p>{{STORE_TAGLINE}}</p>
-                </div>
-                <div>
-                    <h3 class="footer-title">Quick Links</h3>
-                    <a href="#" class="footer-link">Home</a>
-                    <a href="#products" class="footer-link">Products</a>
-                    <a href="{{INSTAGRAM_URL}}" target="_blank" class="footer-link">Instagram</a>
-                </div>
-                <div>
-                    <h3 class="footer-title">Contact Us</h3>
-                    <div class="footer-contact">
-                        <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" viewBox="0 0 16 16">
-                            <path d="M13.601 2.326A7.854 7.854 0 0 0 7.994 0C3.627 0 .068 3.558.064 7.926c0 1.399.366 2.76 1.057 3.965L0 16l4.204-1.102a7.933 7.933 0 0 0 3.79.965h.004c4.368 0 7.926-3.558 7.93-7.93A7.898 7.898 0 0 0 13.6 2.326zM7.994 14.521a6.573 6.573 0 0 1-3.356-.92l-.24-.144-2.494.654.666-2.433-.156-.251a6.56 6.56 0 0 1-1.007-3.505c0-3.626 2.957-6.584 6.591-6.584a6.56 6.56 0 0 1 4.66 1.931 6.557 6.557 0 0 1 1.928 4.66c-.004 3.639-2.961 6.592-6.592 6.592z"/>
-                        </svg>
-                        <span>{{CONTACT_PHONE}}</span>
-                    </div>
-                    <div class="footer-contact">
-                        <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" viewBox="0 0 16 16">
-                            <path d="M8 16s6-5.686 6-10A6 6 0 0 0 2 6c0 4.314 6 10 6 10zm0-7a3 3 0 1 1 0-6 3 3 0 0 1 0 6z"/>
-                        </svg>
-                        <span>{{CONTACT_LOCATION}}</span>
-                    </div>
-                </div>
-            </div>
-            <div class="footer-bottom">
-                <p>&copy; 2025 {{STORE_NAME}}. All rights reserved. | Powered by <a href="https://inhouseapp.in" class="powered-by">InHouse</a></p>
-            </div>
-        </div>
-    </footer>
-</body>
-</html>"""
     
     # Extract business name from Instagram data
     business_name = profile_data.get('display_name') or profile_data.get('full_name') or instagram_username.title().replace('_', ' ').replace('.', ' ')
@@ -3594,61 +2217,46 @@ def generate_catalog_website(instagram_username, profile_data, products):
     accent_color = f"#{hash_hex[12:14]}{hash_hex[14:16]}{hash_hex[16:18]}"
     
     # Generate products HTML
-    products_html = ""
-    for product in products:
-        whatsapp_message = f"Hi! I'm interested in {product['name']} (₹{product['price']}) from your Instagram catalog."
-        whatsapp_url = f"https://wa.me/{PHONE_NUMBER_ID.replace('+', '')}?text={requests.utils.quote(whatsapp_message)}"
-        
-        # Get product image with fallback
-        product_image = product.get('image', 'https://via.placeholder.com/300x300/cccccc/333333?text=Product')
-        
-        products_html += f"""
-        <div class="product-card">
-            <img src="{product_image}" alt="{product['name']}" class="product-image">
-            <div class="product-info">
-                <h3 class="product-name">{product['name']}</h3>
-                <div class="product-price">₹{product['price']}</div>
-                <p class="product-description">{product['description']}</p>
-                <a href="{whatsapp_url}" class="whatsapp-order" target="_blank">
-                    <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" fill="currentColor" viewBox="0 0 16 16">
-                        <path d="M13.601 2.326A7.854 7.854 0 0 0 7.994 0C3.627 0 .068 3.558.064 7.926c0 1.399.366 2.76 1.057 3.965L0 16l4.204-1.102a7.933 7.933 0 0 0 3.79.965h.004c4.368 0 7.926-3.558 7.93-7.93A7.898 7.898 0 0 0 13.6 2.326zM7.994 14.521a6.573 6.573 0 0 1-3.356-.92l-.24-.144-2.494.654.666-2.433-.156-.251a6.56 6.56 0 0 1-1.007-3.505c0-3.626 2.957-6.584 6.591-6.584a6.56 6.56 0 0 1 4.66 1.931 6.557 6.557 0 0 1 1.928 4.66c-.004 3.639-2.961 6.592-6.592 6.592z"/>
-                    </svg>
-                    Order on WhatsApp
-                </a>
-            </div>
-        </div>
-        """
-    
-    # Replace template variables
-    replacements = {
-        '{{STORE_NAME}}': business_name,
-        '{{STORE_TAGLINE}}': profile_data.get('bio', 'Handcrafted with love and precision'),
-        '{{LOGO_INITIALS}}': logo_initials,
-        '{{PRIMARY_COLOR}}': profile_data.get('colors', {}).get('primary', primary_color),
-        '{{SECONDARY_COLOR}}': profile_data.get('colors', {}).get('secondary', secondary_color),
-        '{{ACCENT_COLOR}}': profile_data.get('colors', {}).get('accent', accent_color),
-        '{{WHATSAPP_NUMBER}}': PHONE_NUMBER_ID.replace('+', ''),
-        '{{HERO_TITLE}}': f"Welcome to {business_name}",
-        '{{HERO_SUBTITLE}}': profile_data.get('bio', 'Discover our unique collection of handcrafted items'),
-        '{{CTA_TEXT}}': 'Shop Now',
-        '{{PRODUCTS_TITLE}}': 'Our Collection',
-        '{{PRODUCTS_HTML}}': products_html,
-        '{{INSTAGRAM_URL}}': f"https://instagram.com/{instagram_username}",
-        '{{CONTACT_PHONE}}': f"+91 {PHONE_NUMBER_ID}",
-        '{{CONTACT_LOCATION}}': 'India | Worldwide shipping'
-    }
-    
-    # Apply replacements
-    for placeholder, value in replacements.items():
-        template = template.replace(placeholder, str(value))
+    whatsapp_number = PHONE_NUMBER_ID.replace('+', '')
+    products_html = CLASSIC_STORE_PRODUCT_CARD.render_many(
+        {
+            'IMAGE': product.get('image', 'https://via.placeholder.com/300x300/cccccc/333333?text=Product'),
+            'NAME': product['name'],
+            'PRICE': product['price'],
+            'DESCRIPTION': product['description'],
+            'WHATSAPP_URL': f"https://wa.me/{whatsapp_number}?text=" + requests.utils.quote(
+                f"Hi! I'm interested in {product['name']} (₹{product['price']}) from your Instagram catalog."
+            )
+        }
+        for product in products
+    )
     
-    return template
+    return CLASSIC_STORE_TEMPLATE.render(
+        STORE_NAME=business_name,
+        STORE_TAGLINE=profile_data.get('bio', 'Handcrafted with love and precision'),
+        LOGO_INITIALS=logo_initials,
+        PRIMARY_COLOR=profile_data.get('colors', {}).get('primary', primary_color),
+        SECONDARY_COLOR=profile_data.get('colors', {}).get('secondary', secondary_color),
+        ACCENT_COLOR=profile_data.get('colors', {}).get('accent', accent_color),
+        STORE_CSS_URL=asset_url('classic_store.css'),
+        WHATSAPP_NUMBER=whatsapp_number,
+        HERO_TITLE=f"Welcome to {business_name}",
+        HERO_SUBTITLE=profile_data.get('bio', 'Discover our unique collection of handcrafted items'),
+        CTA_TEXT='Shop Now',
+        PRODUCTS_TITLE='Our Collection',
+        PRODUCTS_HTML=products_html,
+        INSTAGRAM_URL=f"https://instagram.com/{instagram_username}",
+        CONTACT_PHONE=f"+91 {PHONE_NUMBER_ID}",
+        CONTACT_LOCATION='India | Worldwide shipping'
+    )
 
-def process_smart_business_analysis(username, phone_number):
-    """Process business using real Instagram data + smart AI analysis"""
+def process_smart_business_analysis(username, phone_number, job):
+    """Process business using real Instagram data + smart AI analysis. `job` is the claim from
+    job_status.claim(); every state change goes through it, and the job stops once it's lost"""
     print(f"🎯 FUNCTION CALLED: process_smart_business_analysis for @{username} phone: {phone_number}")
     try:
-        processing_status[username] = "analyzing"
+        if not job.advance("analyzing"):
+            return
         print(f"🧠 Starting smart business analysis for @{username}")
         
         # Get real Instagram data first
@@ -3673,7 +2281,7 @@ def process_smart_business_analysis(username, phone_number):
             print(f"   Posts: {'✅' if has_posts else '❌'} {len(real_data.get('posts', []))}")
             
             # Accept data if we have at least name OR bio OR followers (some real content)
-            if has_full_name or has_bio or has_followers:
+            if has_real_profile_data(real_data):
                 business_info = {
                     'name': real_data.get('full_name') or f"{username.replace('.', ' ').replace('_', ' ').title()}",
                     'bio': real_data.get('bio') or f"Instagram: @{username}",
@@ -3703,8 +2311,8 @@ For now, please:
 
 We're working to improve data extraction reliability."""
 
-                send_whatsapp_message(phone_number, error_message)
-                processing_status[username] = 'failed'
+                if job.advance('failed'):
+                    send_whatsapp_message(phone_number, error_message)
                 return
         else:
             # Extraction completely failed
@@ -3721,8 +2329,8 @@ Please try:
 
 We're continuously improving our extraction methods."""
 
-            send_whatsapp_message(phone_number, error_message)
-            processing_status[username] = 'failed'
+            if job.advance('failed'):
+                send_whatsapp_message(phone_number, error_message)
             return
         
         # Detect business type from real data
@@ -3775,9 +2383,6 @@ We're continuously improving our extraction methods."""
             print(f"🌐 Generating website for {username}")
             html_content = generate_enhanced_shopping_website(username, profile_data, products)
             print(f"📄 Website generated, length: {len(html_content)} characters")
-            
-            catalog_url = save_catalog_website(username, html_content)
-            print(f"💾 Website saved at: {catalog_url}")
         except Exception as website_error:
             print(f"❌ Website generation failed: {website_error}")
             # Create a simple fallback website
@@ -3794,19 +2399,22 @@ We're continuously improving our extraction methods."""
             </body>
             </html>
             """
-            catalog_url = save_catalog_website(username, html_content)
-        
-        # Store results
-        generated_websites[username] = {
-            'html': html_content,
-            'products': products,
-            'profile': profile_data,
-            'timestamp': datetime.now(),
-            'colors': colors,
-            'source': 'smart_analysis'
-        }
         
-        processing_status[username] = 'completed'
+        # Store results, unless a newer job for this username has taken over meanwhile
+        if not job.advance('saving'):
+            return
+        catalog_url = save_catalog_website(
+            username,
+            html_content,
+            products=products,
+            profile=profile_data,
+            colors=colors,
+            source='smart_analysis'
+        )
+        print(f"💾 Website saved at: {catalog_url}")
+        
+        if not job.advance('completed'):
+            return
         
         # Send completion message
         catalog_url = f"https://whatsapp-instagram-bot.onrender.com/catalog/{username}"
@@ -3824,49 +2432,20 @@ Want updates? Send me your Instagram again anytime!"""
         
     except Exception as e:
         print(f"❌ Error in smart business analysis: {e}")
-        processing_status[username] = 'failed'
-        
-        # Clear the failed status after sending error message
-        import time
-        def clear_failed_status():
-            time.sleep(10)  # Wait 10 seconds then clear
-            if username in processing_status and processing_status[username] == 'failed':
-                del processing_status[username]
-        
-        threading.Thread(target=clear_failed_status, daemon=True).start()
-        
-        error_msg = f"😅 Oops! Something went wrong with @{username}. Try sending it again!"
-        send_whatsapp_message(phone_number, error_msg)
+        # 'failed' expires after a few seconds so the user can simply resend
+        if job.advance('failed'):
+            error_msg = f"😅 Oops! Something went wrong with @{username}. Try sending it again!"
+            send_whatsapp_message(phone_number, error_msg)
 
 def detect_business_type(business_info):
-    """Detect business type from real Instagram data"""
-    bio_lower = business_info['bio'].lower()
-    name_lower = business_info['name'].lower()
-    username_lower = business_info['username'].lower()
-    
-    # Combine all text for analysis
-    all_text = f"{bio_lower} {name_lower} {username_lower}"
-    
-    if any(word in all_text for word in ['crochet', 'handmade', 'macrame', 'crafts', 'gifts', 'accessories', 'aesthetic', 'bouquet']):
-        return 'Handmade Crafts & Gifts'
-    elif any(word in all_text for word in ['plant', 'nursery', 'garden', 'flower', 'green', 'lily']):
-        return 'Plant Nursery'
-    elif any(word in all_text for word in ['fashion', 'boutique', 'clothing', 'style', 'wear', 'dress']):
-        return 'Fashion & Clothing'
-    elif any(word in all_text for word in ['food', 'cafe', 'restaurant', 'kitchen', 'bakery', 'cook']):
-        return 'Food & Beverage'
-    elif any(word in all_text for word in ['beauty', 'cosmetic', 'makeup', 'skincare', 'salon', 'spa']):
-        return 'Beauty & Cosmetics'
-    elif any(word in all_text for word in ['tech', 'software', 'digital', 'app', 'web', 'code']):
-        return 'Technology'
-    elif any(word in all_text for word in ['art', 'design', 'creative', 'studio', 'gallery']):
-        return 'Art & Design'
-    elif any(word in all_text for word in ['jewelry', 'jewellery', 'rings', 'necklace', 'earrings']):
-        return 'Jewelry'
-    elif any(word in all_text for word in ['home', 'decor', 'furniture', 'interior']):
-        return 'Home & Decor'
-    else:
-        return 'General Business'
+    """Detect business type from real Instagram data (the category id is kept in
+    business_info['business_category'] for the product generators)"""
+    category = classify(business_info['bio'], business_info['name'])
+    if category == 'general':
+        # Usernames run words together, so they're only searched when the bio and name say nothing
+        category = classify(business_info['username'], anywhere=True)
+    business_info['business_category'] = category
+    return category_label(category)
 
 def generate_business_colors(business_type):
     """Generate appropriate colors based on detected business type"""
@@ -3934,84 +2513,60 @@ def generate_business_colors(business_type):
             'accent': '#E74C3C'       # Red
         }
 
+def gemini_available():
+    return bool(GOOGLE_PROJECT_ID) and google_auth_available()
+
+def products_from_suggestions(suggestions):
+    return [
+        {
+            'name': item['name'],
+            'price': item['price'],
+            'description': item['description'],
+            'image': 'https://via.placeholder.com/300x300/cccccc/333333?text=Product'
+        }
+        for item in suggestions
+    ]
+
 def analyze_business_with_vertex(username, business_info):
     """Use Vertex AI to analyze business and generate relevant products"""
     try:
-        if not ('VERTEX_AI_AVAILABLE' in globals() and VERTEX_AI_AVAILABLE):
+        if not gemini_available():
             return generate_smart_mock_products(business_info['name'], business_info['bio'])
-        
-        # Create business analysis prompt
-        prompt = f"""
-        Analyze this business and generate 6-8 relevant products:
-        
-        Business Name: {business_info['name']}
-        Instagram Handle: @{username}
-        
-        Based on the business name and handle, determine:
-        1. What type of business this is
-        2. What products they likely sell
-        3. Generate specific product names with descriptions
-        
-        Create realistic products with:
-        - Product name
-        - Price range appropriate for the business type
-        - Brief description (2-3 sentences)
-        - Product category
-        
-        Format as JSON array with objects containing: name, price, description, category
-        """
-        
-        model = GenerativeModel("gemini-pro")
-        response = model.generate_content(prompt)
-        
-        if response and response.text:
-            try:
-                # Try to extract JSON from response
-                import re
-                json_match = re.search(r'\[.*\]', response.text, re.DOTALL)
-                if json_match:
-                    products_data = json.loads(json_match.group())
-                    
-                    products = []
-                    for item in products_data:
-                        product = {
-                            'name': item.get('name', 'Product'),
-                            'price': item.get('price', '$25'),
-                            'description': item.get('description', 'Quality product'),
-                            'image': 'https://via.placeholder.com/300x300/cccccc/333333?text=Product'
-                        }
-                        products.append(product)
-                    
-                    return products[:8]  # Limit to 8 products
-            except:
-                pass
-        
+
+        suggestions = gemini_products.suggest(username, business_info['name'])
+        if suggestions:
+            return products_from_suggestions(suggestions)
+
         # Fallback to smart mock products
         return generate_smart_mock_products(business_info['name'], business_info['bio'])
-        
+
     except Exception as e:
         print(f"Error in Vertex AI business analysis: {e}")
         return generate_smart_mock_products(business_info['name'], business_info['bio'])
 
-def process_instagram_async(username, phone_number):
-    """Process Instagram profile asynchronously with advanced AI analysis"""
+def process_instagram_async(username, phone_number, job):
+    """Process Instagram profile asynchronously with advanced AI analysis (`job` as for
+    process_smart_business_analysis)"""
     try:
-        processing_status[username] = "scraping"
+        if not job.advance("scraping"):
+            return
         print(f"🔄 Starting advanced processing for @{username}")
         
         # Step 1: Advanced Instagram scraping with real posts
         profile_data = scrape_instagram_profile_advanced(username)
         if not profile_data:
-            send_whatsapp_message(phone_number, f"❌ Could not access Instagram profile @{username}. Please check the username and try again.")
+            if job.advance("failed"):
+                send_whatsapp_message(phone_number, f"❌ Could not access Instagram profile @{username}. Please check the username and try again.")
             return
         
-        processing_status[username] = "extracting_colors"
+        if not job.advance("extracting_colors"):
+            return
         
-        # Step 2: Extract brand colors from profile picture
-        colors = extract_brand_colors(profile_data.get('profile_pic'))
-        profile_data['colors'] = colors
+        # Step 2: Extract brand colors from profile picture, in the background while posts are analyzed
+        colors_run = image_pipeline.submit([(profile_data.get('profile_pic'), ('colors',))])
         
-        processing_status[username] = "analyzing_posts"
+        if not job.advance("analyzing_posts"):
+            return
         
         # Step 3: Analyze posts with Google Vertex AI for product detection
         ai_products = analyze_instagram_posts_with_vertex(
@@ -4019,29 +2574,35 @@ def process_instagram_async(username, phone_number):
             profile_data
         )
         
-        processing_status[username] = "uploading_images"
+        if not job.advance("uploading_images"):
+            return
+        
+        # Step 4: Upload every product image (and a thumbnail) to Cloudinary at once, each downloaded once
+        stages = ('upload', 'thumbnail') if CLOUDINARY_CLOUD_NAME else ()
+        uploads = image_pipeline.run(
+            [(product['image'], stages) for product in ai_products],
+            folder=f"instagram_{username}/products"
+        ) if stages else [{} for _ in ai_products]
         
-        # Step 4: Upload images to Cloudinary and create final product data
         products = []
         
-        for i, product in enumerate(ai_products):
-            # Upload product image to Cloudinary for faster loading
-            optimized_image_url = upload_image_to_cloudinary(
-                product['image'], 
-                f"instagram_{username}/products"
-            )
-            
+        for product, upload in zip(ai_products, uploads):
             products.append({
                 'name': product['name'],
                 'price': product['price'], 
                 'description': product['description'],
-                'image': optimized_image_url,
+                'image': upload.get('upload') or product['image'],
+                'thumbnail': upload.get('thumbnail'),
                 'confidence': product.get('confidence', 0.8),
                 'detected_objects': product.get('detected_objects', []),
                 'labels': product.get('labels', [])
             })
         
-        processing_status[username] = "generating_website"
+        colors = (colors_run.results() or [{}])[0].get('colors') or generate_default_colors()
+        profile_data['colors'] = colors
+        
+        if not job.advance("generating_website"):
+            return
         
         # Step 5: Generate website with dynamic content
         website_data = {
@@ -4055,10 +2616,20 @@ def process_instagram_async(username, phone_number):
         
         html_content = generate_enhanced_shopping_website(username, website_data, products)
         
-        # Step 6: Save website
-        catalog_url = save_catalog_website(username, html_content)
+        # Step 6: Save website, unless a newer job for this username has taken over meanwhile
+        if not job.advance("saving"):
+            return
+        catalog_url = save_catalog_website(
+            username,
+            html_content,
+            products=products,
+            profile=website_data,
+            colors=colors,
+            source='instagram_scraping'
+        )
         
-        processing_status[username] = "completed"
+        if not job.advance("completed"):
+            return
         
         # Step 7: Send completion message with AI analysis details
         ai_confidence = sum(p.get('confidence', 0.8) for p in products) / len(products) if products else 0.8
@@ -4091,16 +2662,16 @@ Your customers can browse real products from your Instagram and order directly v
         
     except Exception as e:
         print(f"❌ Error processing @{username}: {e}")
-        error_msg = f"❌ Sorry, there was an error creating your minisite for @{username}. Please try again or contact support."
-        send_whatsapp_message(phone_number, error_msg)
-        processing_status[username] = "failed"
+        if job.advance("failed"):
+            error_msg = f"❌ Sorry, there was an error creating your minisite for @{username}. Please try again or contact support."
+            send_whatsapp_message(phone_number, error_msg)
 
-def save_catalog_website(instagram_username, html_content):
-    """Save the generated website to memory (in production, save to database/file server)"""
+def save_catalog_website(instagram_username, html_content, **metadata):
+    """Save the generated website (plus products/profile/colors metadata) to the catalog store"""
     catalog_url = f"https://whatsapp-instagram-bot.onrender.com/catalog/{instagram_username}"
     
-    # Store in memory for now
-    generated_websites[instagram_username] = html_content
+    metadata.setdefault('timestamp', datetime.now().isoformat())
+    catalog_store.save(instagram_username, html_content, metadata)
     
     print(f"📄 Generated catalog website for {instagram_username}")
     print(f"🔗 Available at: {catalog_url}")
@@ -4113,7 +2684,7 @@ def send_whatsapp_message(to, message):
         print("❌ WhatsApp token not configured")
         return False
         
-    url = f"https://graph.facebook.com/v22.0/{PHONE_NUMBER_ID}/messages"
+    url = f"{WHATSAPP_API_URL}/{PHONE_NUMBER_ID}/messages"
     headers = {
         'Authorization': f'Bearer {WHATSAPP_TOKEN}',
         'Content-Type': 'application/json'
@@ -4128,7 +2699,7 @@ def send_whatsapp_message(to, message):
     try:
         print(f"🔄 Attempting to send message to {to}")
         
-        response = requests.post(url, headers=headers, json=payload)
+        response = http_client.post(url, headers=headers, json=payload)
         print(f"📤 Response status: {response.status_code}")
         
         if response.status_code == 200:
@@ -4183,11 +2754,13 @@ def instagram_callback():
         # Store token for this username
         instagram_tokens[state] = long_lived_token
         
-        # Now process the Instagram account with the API
-        threading.Thread(
-            target=process_instagram_with_api,
-            args=(state, long_lived_token)
-        ).start()
+        # Now process the Instagram account with the API (one job per username across workers)
+        job = job_status.claim(state, 'queued')
+        if not job:
+            return f"Already working on @{state}'s catalog. You will receive a WhatsApp message when it's ready.", 409
+        if job_queue.submit(process_instagram_with_api, state, long_lived_token, job) is None:
+            job.release()
+            return "We're very busy right now. Please try again in a few minutes.", 503
         
         return f"""
         <html>
@@ -4204,25 +2777,32 @@ def instagram_callback():
     else:
         return "Failed to get access token", 500
 
-def process_instagram_with_api(username, access_token):
-    """Process Instagram account using the Graph API"""
+def process_instagram_with_api(username, access_token, job):
+    """Process Instagram account using the Graph API (`job` as for process_smart_business_analysis)"""
     try:
+        if not job.advance('analyzing'):
+            return
         print(f"🔄 Processing {username} with Instagram API...")
         
         # Fetch real Instagram data using API
         profile_data = fetch_instagram_profile_api(access_token)
         if not profile_data:
             print(f"❌ Failed to fetch Instagram data for {username}")
+            job.advance('failed')
             return
         
         print(f"✅ Fetched {len(profile_data.get('posts', []))} posts from {username}")
-        
-        # Enhance posts with comments for review data
-        posts_with_comments = []
-        for post in profile_data.get('posts', [])[:10]:  # Limit to first 10 posts
-            comments = fetch_instagram_comments(post['id'], access_token, limit=5)
-            post['comments'] = comments
-            posts_with_comments.append(post)
+        all_posts = profile_data.get('posts', [])
+        updated_posts = profile_data.pop('updated_posts', all_posts)
+        profile_data.pop('removed_post_ids', None)
+        
+        # Enhance posts with comments for review data, all posts in one round trip
+        posts_with_comments = all_posts[:10]  # Limit to first 10 posts
+        start = time.time()
+        comments = comment_fetcher.fetch([post['id'] for post in posts_with_comments], access_token, limit=5)
+        for post in posts_with_comments:
+            post['comments'] = comments.get(post['id'], [])
+        print(f"💬 Fetched comments for {len(posts_with_comments)} posts in {time.time() - start:.2f}s")
         
         profile_data['posts'] = posts_with_comments
         
@@ -4236,6 +2816,28 @@ def process_instagram_with_api(username, access_token):
             'post_count': profile_data.get('media_count', len(posts_with_comments))
         }
         
+        # Only new or edited posts go through product analysis. Products from posts analyzed on
+        # an earlier run are kept
+        current_posts = {post['id']: post for post in all_posts}
+        updated_ids = {post['id'] for post in updated_posts}
+        previous = catalog_store.get(username)
+        kept = []
+        for product in ((previous or {}).get('metadata') or {}).get('products') or []:
+            post = current_posts.get(product.get('post_id'))
+            if post and post['id'] not in updated_ids:
+                kept.append((product, post))
+        
+        # An incremental sync only re-reads new posts; older ones carry the media_url from the run
+        # that first saw them, and Instagram's signed CDN URLs expire. Re-read the ones still on
+        # show (kept products and the colour source) in one request
+        if not profile_data.get('full_sync'):
+            shown_ids = [post['id'] for _, post in kept] + [post['id'] for post in posts_with_comments[:1]]
+            stale_ids = [media_id for media_id in shown_ids if media_id not in updated_ids]
+            if stale_ids:
+                for media_id, url in media_sync.refresh_urls(stale_ids, access_token).items():
+                    current_posts[media_id]['image'] = url
+        kept_products = [dict(product, image=post.get('image') or product.get('image')) for product, post in kept]
+        
         # Extract colors from profile picture if available
         profile_pic_url = None
         if posts_with_comments:
@@ -4246,27 +2848,35 @@ def process_instagram_with_api(username, access_token):
         else:
             colors = generate_default_colors()
         
-        # Analyze posts with Vertex AI
-        if 'VERTEX_AI_AVAILABLE' in globals() and VERTEX_AI_AVAILABLE:
-            products = analyze_instagram_posts_with_vertex(posts_with_comments, business_info)
+        # analyze_instagram_posts_with_vertex falls back on its own when Google Cloud isn't set up
+        if not kept_products:
+            new_products = analyze_instagram_posts_with_vertex(posts_with_comments, business_info)
+        elif updated_posts:
+            print(f"🆕 Analyzing {len(updated_posts)} new/edited posts, keeping {len(kept_products)} products")
+            new_products = analyze_instagram_posts_with_vertex(updated_posts, business_info)
         else:
-            products = generate_smart_mock_products(business_info['name'], business_info['bio'])
+            new_products = []
+            print(f"♻️ No new posts since the last sync, reusing {len(kept_products)} products")
         
-        # Generate website
+        products = (new_products + kept_products)[:6]
+        for i, product in enumerate(products):
+            product['id'] = f"product_{i + 1}"
+        
+        # Generate website, unless a newer job for this username has taken over meanwhile
+        if not job.advance('saving'):
+            return
         html_content = generate_enhanced_shopping_website(username, profile_data, products)
-        save_catalog_website(username, html_content)
-        
-        # Store in global dict
-        generated_websites[username] = {
-            'html': html_content,
-            'products': products,
-            'profile': profile_data,
-            'timestamp': datetime.now(),
-            'colors': colors,
-            'source': 'instagram_api'
-        }
+        save_catalog_website(
+            username,
+            html_content,
+            products=products,
+            profile=profile_data,
+            colors=colors,
+            source='instagram_api'
+        )
         
-        processing_status[username] = 'completed'
+        if not job.advance('completed'):
+            return
         
         # Send completion message via WhatsApp
         catalog_url = f"https://whatsapp-instagram-bot.onrender.com/catalog/{username}"
@@ -4278,7 +2888,93 @@ def process_instagram_with_api(username, access_token):
         
     except Exception as e:
         print(f"❌ Error processing {username} with API: {e}")
-        processing_status[username] = 'failed'
+        job.advance('failed')
+
+def dispatch_webhook_payload(data):
+    """Parse a WhatsApp webhook payload and reply to each message (runs off the request path)"""
+    try:
+        for entry in data.get('entry', []):
+            for change in entry.get('changes', []):
+                if change.get('field') == 'messages':
+                    value = change.get('value', {})
+                    for message in value.get('messages', []):
+                        if is_duplicate_message(message.get('id')):
+                            print(f"♻️ Skipping duplicate delivery {message.get('id')}")
+                            continue
+                        if message.get('type') == 'text':
+                            handle_text_message(message)
+    except Exception as e:
+        print(f"❌ Error processing webhook: {e}")
+
+def handle_text_message(message):
+    """Bot logic for a single incoming WhatsApp text message"""
+    from_number = message.get('from')
+    text_body = message.get('text', {}).get('body', '').lower().strip()
+    
+    print(f"📱 Message from {from_number}: '{text_body}'")
+    
+    # Bot logic
+    if 'hi' in text_body or 'hello' in text_body:
+        print(f"🎯 Detected greeting: '{text_body}'")
+        welcome_msg = """🎉 Hi! I create free product catalogs for your business!
+
+Just send me your Instagram username (like @yourbusiness) and I'll make you a beautiful website in 30 seconds! 
+
+Try it now! 📸"""
+        send_whatsapp_message(from_number, welcome_msg)
+    
+    elif 'instagram.com' in text_body or '@' in text_body:
+        print(f"🔍 Processing Instagram URL: {text_body}")
+        
+        # Extract Instagram username
+        instagram_username = extract_instagram_username(text_body)
+        
+        if not instagram_username:
+            error_msg = "🤔 I need your Instagram username! \n\nTry: @yourbusiness or https://instagram.com/yourbusiness"
+            send_whatsapp_message(from_number, error_msg)
+            return
+        
+        # Check if already processing (atomic across workers: only one claim wins)
+        job = job_status.claim(instagram_username, "queued")
+        if not job:
+            status_msg = f"⏳ Already working on @{instagram_username}! Almost done..."
+            send_whatsapp_message(from_number, status_msg)
+            return
+        
+        # Queue smart analysis on the worker pool - no complex choices
+        print(f"🚀 Queueing processing job for {instagram_username}")
+        position = job_queue.submit(process_smart_business_analysis, instagram_username, from_number, job)
+        
+        if position is None:
+            job.release()
+            busy_msg = f"""😅 We're creating a lot of catalogs right now!
+
+Please send @{instagram_username} again in a few minutes."""
+            send_whatsapp_message(from_number, busy_msg)
+            print(f"🚫 Job queue full, rejected {instagram_username}")
+            return
+        
+        if position > 0:
+            processing_msg = f"""🚀 Got it! Your catalog for @{instagram_username} is queued.
+
+⏳ You're #{position} in line - we'll message you as soon as it's ready! ✨"""
+        else:
+            processing_msg = f"""🚀 Creating your catalog for @{instagram_username}...
+
+⏱️ Just 30 seconds! 
+
+Building your beautiful website now! ✨"""
+        
+        send_whatsapp_message(from_number, processing_msg)
+        print(f"🔥 Processing job queued for {instagram_username} (position {position})")
+    
+    else:
+        help_msg = """🤔 I didn't understand that.
+
+Send me your Instagram username (like @yourbusiness) and I'll create your free catalog! 
+
+Try: @thepeacelily.in"""
+        send_whatsapp_message(from_number, help_msg)
 
 @app.route('/webhook', methods=['GET', 'POST'])
 def webhook():
@@ -4298,86 +2994,20 @@ def webhook():
             return 'Forbidden', 403
     
     if request.method == 'POST':
-        print("🚀 WEBHOOK RECEIVED!")
-        print(f"⏰ Time: {datetime.now()}")
-        print(f"📦 Headers: {dict(request.headers)}")
+        # Ingest only: validate, enqueue, acknowledge. Parsing and replies happen in the dispatcher
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'entry' not in data:
+            print("⚠️ Ignoring webhook without entries")
+            return jsonify({"status": "ignored"})
         
-        try:
-            data = request.get_json()
-            print(f"📄 Data: {json.dumps(data, indent=2)}")
-            
-            # Process WhatsApp messages
-            if data and 'entry' in data:
-                for entry in data['entry']:
-                    for change in entry.get('changes', []):
-                        if change.get('field') == 'messages':
-                            value = change.get('value', {})
-                            messages = value.get('messages', [])
-                            
-                            for message in messages:
-                                if message.get('type') == 'text':
-                                    from_number = message.get('from')
-                                    text_body = message.get('text', {}).get('body', '').lower().strip()
-                                    
-                                    print(f"📱 Message from {from_number}: '{text_body}'")
-                                    print(f"🤖 Processing message type: {message.get('type')}")
-                                    
-                                    # Bot logic
-                                    if 'hi' in text_body or 'hello' in text_body:
-                                        print(f"🎯 Detected greeting: '{text_body}'")
-                                        welcome_msg = """🎉 Hi! I create free product catalogs for your business!
-
-Just send me your Instagram username (like @yourbusiness) and I'll make you a beautiful website in 30 seconds! 
-
-Try it now! 📸"""
-                                        send_whatsapp_message(from_number, welcome_msg)
-                                    
-                                    elif 'instagram.com' in text_body or '@' in text_body:
-                                        print(f"🔍 Processing Instagram URL: {text_body}")
-                                        
-                                        # Extract Instagram username
-                                        instagram_username = extract_instagram_username(text_body)
-                                        
-                                        if not instagram_username:
-                                            error_msg = "🤔 I need your Instagram username! \n\nTry: @yourbusiness or https://instagram.com/yourbusiness"
-                                            send_whatsapp_message(from_number, error_msg)
-                                            continue
-                                        
-                                        # Check if already processing
-                                        if instagram_username in processing_status and processing_status[instagram_username] != "completed":
-                                            status_msg = f"⏳ Already working on @{instagram_username}! Almost done..."
-                                            send_whatsapp_message(from_number, status_msg)
-                                            continue
-                                        
-                                        # Start smart analysis immediately - no complex choices
-                                        processing_msg = f"""🚀 Creating your catalog for @{instagram_username}...
-
-⏱️ Just 30 seconds! 
-
-Building your beautiful website now! ✨"""
-                                        
-                                        send_whatsapp_message(from_number, processing_msg)
-                                        
-                                        # Start smart processing immediately
-                                        print(f"🚀 About to start processing thread for {instagram_username}")
-                                        thread = threading.Thread(
-                                            target=process_smart_business_analysis, 
-                                            args=(instagram_username, from_number)
-                                        )
-                                        thread.daemon = True
-                                        thread.start()
-                                        print(f"🔥 Processing thread started for {instagram_username}")
-                                    
-                                    else:
-                                        help_msg = """🤔 I didn't understand that.
-
-Send me your Instagram username (like @yourbusiness) and I'll create your free catalog! 
-
-Try: @thepeacelily.in"""
-                                        send_whatsapp_message(from_number, help_msg)
-            
-        except Exception as e:
-            print(f"❌ Error processing webhook: {e}")
+        if not WEBHOOK_ASYNC_DISPATCH:
+            dispatch_webhook_payload(data)
+            return jsonify({"status": "received"})
+        
+        if webhook_dispatcher.submit(dispatch_webhook_payload, data) is None:
+            # Let Meta redeliver later rather than silently dropping the message
+            print("🚫 Webhook dispatch queue full")
+            return jsonify({"status": "busy"}), 503
         
         return jsonify({"status": "received"})
 
@@ -4400,11 +3030,27 @@ def debug():
         "phone_number_id": PHONE_NUMBER_ID,
         "verify_token": VERIFY_TOKEN,
         "token_length": len(WHATSAPP_TOKEN) if WHATSAPP_TOKEN else 0,
-        "generated_sites": list(generated_websites.keys()),
-        "processing_status": processing_status,
+        "generated_sites": catalog_store.usernames(),
+        "catalog_store": catalog_store.stats(),
+        "job_status": job_status.stats(),
+        "job_queue": job_queue.stats(),
+        "webhook_dispatcher": webhook_dispatcher.stats(),
+        "seen_messages": seen_messages.size(),
+        "http": http_client.metrics(),
+        "comment_fetcher": comment_fetcher.stats(),
+        "media_sync": media_sync.stats(),
+        "image_pipeline": image_pipeline.stats(),
+        "profile_cache": profile_cache.stats(),
+        "vision_cache": vision_cache.stats(),
+        "gemini_products": gemini_products.stats(),
+        "extraction_methods": profile_extractor.stats(),
+        "browser_pool": browser_pool.stats(),
+        "clients": clients.stats(),
+        "static_assets": static_assets.stats(),
         "cloudinary_configured": bool(CLOUDINARY_CLOUD_NAME),
         "google_project_id": GOOGLE_PROJECT_ID,
-        "google_auth_available": GOOGLE_AUTH_AVAILABLE,
+        "google_auth_available": google_auth_available(timeout=0) if google_auth_check.done() else "probing",
+        "lazy_imports": import_stats(),
         "vertex_ai_location": GOOGLE_LOCATION,
         "google_project_number": "340700288264"
     })
@@ -4412,19 +3058,18 @@ def debug():
 @app.route('/status/<username>')
 def check_status(username):
     """Check processing status for a username"""
-    status = processing_status.get(username, "not_found")
+    status = job_status.get(username, "not_found")
     return jsonify({
         "username": username,
         "status": status,
-        "catalog_ready": username in generated_websites
+        "catalog_ready": catalog_store.exists(username)
     })
 
 @app.route('/reset/<username>')
 def reset_status(username):
     """Reset processing status for a username (debug endpoint)"""
-    if username in processing_status:
-        old_status = processing_status[username]
-        del processing_status[username]
+    old_status = job_status.reset(username)
+    if old_status is not None:
         return jsonify({
             "username": username,
             "old_status": old_status,
@@ -4440,15 +3085,17 @@ def reset_status(username):
 
 @app.route('/catalog/<username>')
 def serve_catalog(username):
-    """Serve generated catalog websites"""
-    if username in generated_websites:
-        # Return only the HTML content, not the entire JSON object
-        website_data = generated_websites[username]
-        if isinstance(website_data, dict) and 'html' in website_data:
-            return website_data['html']
-        else:
-            # If it's just HTML string (old format)
-            return website_data
+    """Serve generated catalog websites (ETag/Last-Modified revalidation, pre-compressed bodies)"""
+    record = catalog_store.get(username)
+    if record is not None:
+        status, body, headers = catalog_response(
+            record,
+            if_none_match=request.if_none_match,
+            if_modified_since=request.if_modified_since,
+            accept_encodings=request.accept_encodings,
+            max_age=CATALOG_CACHE_MAX_AGE
+        )
+        return Response(body, status=status, headers=headers)
     else:
         return '''
         <html>
@@ -4461,6 +3108,16 @@ def serve_catalog(username):
         </html>
         '''.format(username, PHONE_NUMBER_ID), 404
 
+@app.route('/assets/<filename>')
+def serve_asset(filename):
+    """Serve shared catalog CSS/JS; hashed names are immutable and cached by browsers for a year"""
+    status, body, headers = static_assets.respond(
+        filename,
+        if_none_match=request.if_none_match,
+        accept_gzip='gzip' in request.accept_encodings
+    )
+    return Response(body, status=status, headers=headers)
+
 @app.route('/test-extraction/<username>')
 def test_extraction(username):
     """Test Instagram extraction directly"""
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark business classification for one catalog: the old per-function keyword chains
+(detect_business_type, generate_smart_mock_products, generate_fallback_products,
+generate_products_from_bio_only and the username guess, each scanning the text with its own
+`any(word in text ...)` lists) vs. business_taxonomy's single compiled regex. Also prints what
+each approach decides for a few sample shops.
+"""
+import statistics
+import sys
+import time
+
+import business_taxonomy
+from business_taxonomy import category_label, classify
+
+SHOPS = [
+    ('Peace Lily Creations', 'Handmade crochet bouquets, keychains & aesthetic gifts 🌸 DM to order', 'thepeacelily.in'),
+    ('Green Thumb Nursery', 'Indoor plants, succulents and garden supplies 🌿 Delivery across Pune', 'greenthumb.nursery'),
+    ('Crumbs & Co', 'Home bakery 🍰 Custom cakes, cookies and brownies. Pre-order 48h', 'crumbsandco.bakes'),
+    ('Aura Silver', 'Oxidised silver jewellery | earrings, rings & necklaces ✨ COD available', 'aura.silver.studio'),
+    ('Threads by Mira', 'Handblock printed kurtis and cotton dresses. New drop every Friday', 'threadsbymira'),
+    ('Glow Lab', 'Organic skincare & makeup 💄 cruelty free, made in small batches', 'glowlab.skin'),
+    ('Nest Interiors', 'Furniture, decor and styling for small apartments 🏠', 'nest.interiors'),
+    ('Pixel Forge', 'We build apps and websites for small businesses', 'pixelforge.dev'),
+]
+
+
+def legacy_scan(name, bio, username):
+    """What the old functions computed between them for one shop"""
+    all_text = f"{bio.lower()} {name.lower()} {username.lower()}"
+    detect_chain = [
+        ('Handmade Crafts & Gifts', ['crochet', 'handmade', 'macrame', 'crafts', 'gifts', 'accessories', 'aesthetic', 'bouquet']),
+        ('Plant Nursery', ['plant', 'nursery', 'garden', 'flower', 'green', 'lily']),
+        ('Fashion & Clothing', ['fashion', 'boutique', 'clothing', 'style', 'wear', 'dress']),
+        ('Food & Beverage', ['food', 'cafe', 'restaurant', 'kitchen', 'bakery', 'cook']),
+        ('Beauty & Cosmetics', ['beauty', 'cosmetic', 'makeup', 'skincare', 'salon', 'spa']),
+        ('Technology', ['tech', 'software', 'digital', 'app', 'web', 'code']),
+        ('Art & Design', ['art', 'design', 'creative', 'studio', 'gallery']),
+        ('Jewelry', ['jewelry', 'jewellery', 'rings', 'necklace', 'earrings']),
+        ('Home & Decor', ['home', 'decor', 'furniture', 'interior']),
+    ]
+    detected = next((label for label, words in detect_chain if any(word in all_text for word in words)), 'General Business')
+
+    combined_text = name.lower() + " " + bio.lower()
+    business_types = {
+        'plants_nursery': ['plant', 'nursery', 'garden', 'lily', 'peace lily', 'flower', 'bloom', 'botanical', 'green', 'indoor plants'],
+        'food_bakery': ['food', 'cake', 'bakery', 'restaurant', 'cafe', 'kitchen', 'cook', 'bake', 'sweet', 'pastry'],
+        'jewelry': ['jewelry', 'jewellery', 'earring', 'necklace', 'ring', 'silver', 'gold', 'diamond', 'pearl', 'bracelet'],
+        'fashion': ['fashion', 'clothing', 'dress', 'shirt', 'wear', 'style', 'boutique', 'apparel', 'textile'],
+        'arts_crafts': ['art', 'craft', 'handmade', 'pottery', 'ceramic', 'creative', 'artist', 'design', 'decor'],
+        'beauty_wellness': ['beauty', 'spa', 'skin', 'cosmetic', 'wellness', 'massage', 'therapy', 'salon'],
+        'home_decor': ['home', 'decor', 'interior', 'furniture', 'decoration', 'living', 'room', 'house'],
+        'fitness': ['fitness', 'gym', 'yoga', 'health', 'workout', 'exercise', 'training', 'wellness'],
+        'technology': ['tech', 'computer', 'software', 'digital', 'app', 'website', 'mobile', 'gadget']
+    }
+    mock_type, best = 'general', 0
+    for biz_type, keywords in business_types.items():
+        matches = sum(1 for keyword in keywords if keyword in combined_text)
+        if matches > best:
+            mock_type, best = biz_type, matches
+
+    placeholder = next((key for key, words in (
+        ('plants', ['plant', 'lily', 'flower', 'garden']), ('jewelry', ['jewelry', 'gold', 'silver', 'ring']),
+        ('food', ['food', 'cake', 'bakery']), ('fashion', ['fashion', 'clothing', 'dress'])
+    ) if any(word in combined_text for word in words)), 'general')
+
+    bio_lower = bio.lower()
+    hints = next((key for key, words in (
+        ('plants', ['plant', 'nursery']), ('crafts', ['craft', 'handmade']),
+        ('jewelry', ['jewelry', 'jewellery']), ('food', ['food', 'cake'])
+    ) if any(word in bio_lower for word in words)), None)
+
+    username_types = {
+        'craft': ['peace', 'lily', 'handmade', 'craft', 'art', 'creative', 'design', 'studio', 'pottery', 'jewelry', 'creations', 'artisan'],
+        'plant': ['plant', 'garden', 'flower', 'botanical', 'green', 'nursery', 'leaf', 'bloom', 'flora'],
+        'food': ['cafe', 'restaurant', 'kitchen', 'food', 'pizza', 'burger', 'coffee', 'bakery', 'tea', 'spice'],
+        'fashion': ['fashion', 'clothing', 'style', 'boutique', 'dress', 'wear', 'apparel', 'threads'],
+        'beauty': ['beauty', 'salon', 'makeup', 'cosmetic', 'spa', 'hair', 'nails', 'skin'],
+        'fitness': ['gym', 'fitness', 'yoga', 'sport', 'health', 'training', 'workout'],
+        'tech': ['tech', 'digital', 'app', 'software', 'web', 'code', 'development'],
+        'lifestyle': ['lifestyle', 'home', 'decor', 'living', 'interior', 'design']
+    }
+    username_type = next((key for key, words in username_types.items() if any(w in username.lower() for w in words)), 'lifestyle')
+    return detected, mock_type, placeholder, hints, username_type
+
+
+def new_scan(name, bio, username):
+    """detect_business_type, then what the generators do: the mock/fallback products and the
+    catalog colours classify the same (bio, name) again, which the cache answers; the bio-only
+    path reuses business_category; username guessing scans the username"""
+    category = classify(bio, name)
+    if category == 'general':
+        category = classify(username, anywhere=True)
+    classify(bio, name)
+    classify(bio, name)
+    return category_label(category), classify(username, anywhere=True)
+
+
+def timed(func, repeats, clear_cache=False):
+    times = []
+    for _ in range(repeats):
+        if clear_cache:
+            business_taxonomy._scores.cache_clear()
+        start = time.perf_counter()
+        for shop in SHOPS:
+            func(*shop)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6 / len(SHOPS)
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{len(SHOPS)} shops, median of {repeats}, per shop\n")
+    print(f"old keyword chains       {timed(legacy_scan, repeats):8.1f} us")
+    print(f"taxonomy, cold cache     {timed(new_scan, repeats, clear_cache=True):8.1f} us")
+    print(f"taxonomy, warm cache     {timed(new_scan, repeats):8.1f} us\n")
+
+    print(f"{'shop':<22} {'old detect_business_type':<26} {'old mock set':<16} {'new':<26}")
+    for shop in SHOPS:
+        old = legacy_scan(*shop)
+        print(f"{shop[0]:<22} {old[0]:<26} {old[1]:<16} {new_scan(*shop)[0]:<26}")
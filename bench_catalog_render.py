@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark catalog page rendering: compiled template + join vs. the old per-call f-string
+with `template += card` for every product. The old renderer is rebuilt here from the same
+template files so both produce identical HTML. Also reports per-catalog page size with the
+shared CSS/JS inlined (as pages used to ship) versus linked from /assets.
+"""
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from static_assets import StaticBundle
+from template_engine import PLACEHOLDER, load_template
+
+SHELL = load_template('enhanced_store.html')
+CARD = load_template('enhanced_store_product_card.html')
+BUNDLE = StaticBundle()
+
+
+def _as_fstring(compiled, expression):
+    """Template text back as f-string source; expression(field) gives each slot's Python code"""
+    source = []
+    for position, part in enumerate(PLACEHOLDER.split(compiled.text)):
+        if position % 2:
+            source.append('{' + expression(part) + '}')
+        else:
+            source.append(part.replace('\\', '\\\\').replace('{', '{{').replace('}', '}}').replace('"', '\\"'))
+    return ''.join(source)
+
+
+def build_legacy_renderer():
+    """The pre-compiled-template renderer: one f-string for the shell, += per product card"""
+    head, tail = _as_fstring(SHELL, lambda field: f"fields['{field}']").split("{fields['PRODUCT_CARDS']}")
+    # Product fields read straight off the product dict, like the old code did
+    card = _as_fstring(CARD, lambda field: 'i' if field == 'INDEX' else f"p['{field.lower()}']")
+    source = (
+        "def legacy_render(fields, products):\n"
+        f'    template = f"""{head}"""\n'
+        "    for i, p in enumerate(products):\n"
+        f'        template += f"""{card}"""\n'
+        f'    template += f"""{tail}"""\n'
+        "    return template\n"
+    )
+    namespace = {}
+    exec(compile(source, '<legacy_render>', 'exec'), namespace)
+    return namespace['legacy_render']
+
+
+def compiled_render(fields, products):
+    cards = CARD.render_many(
+        {'IMAGE': p['image'], 'THUMBNAIL': p['thumbnail'], 'NAME': p['name'], 'PRICE': p['price'], 'DESCRIPTION': p['description'], 'INDEX': i}
+        for i, p in enumerate(products)
+    )
+    return SHELL.render(fields, PRODUCT_CARDS=cards)
+
+
+def make_products(count):
+    return [{
+        'image': f"https://res.cloudinary.com/demo/image/upload/product_{i}.jpg",
+        'thumbnail': f"https://res.cloudinary.com/demo/image/upload/thumbnails/product_{i}.jpg",
+        'name': f"Handmade Product {i}",
+        'price': random.randint(99, 4999),
+        'description': "Beautiful handcrafted item made with premium materials and lots of love"
+    } for i in range(count)]
+
+
+FIELDS = {
+    'STORE_NAME': 'Peace Lily Creations', 'STORE_INITIAL': 'P', 'STORE_BIO': 'Handcrafted with love',
+    'FOLLOWER_COUNT': '1,390', 'POST_COUNT': 315, 'PRODUCT_COUNT': 0,
+    'PRIMARY_COLOR': '#8B4513', 'SECONDARY_COLOR': '#D2691E', 'ACCENT_COLOR': '#F4A460',
+    'BACKGROUND_COLOR': '#FFF8DC', 'CARD_COLOR': '#FFFFFF',
+    'WHATSAPP_NUMBER': '918218668337', 'WHATSAPP_DISPLAY_NUMBER': '8218668337', 'USERNAME': 'thepeacelily.in',
+    'STORE_CSS_URL': BUNDLE.url('enhanced_store.css'), 'STORE_JS_URL': BUNDLE.url('enhanced_store.js'),
+    'STORE_CONFIG': json.dumps({'storeName': 'Peace Lily Creations', 'username': 'thepeacelily.in', 'whatsappNumber': '918218668337'})
+}
+
+
+def inline_assets(html):
+    """The page as it was before the shared CSS/JS moved to /assets, for size comparison"""
+    css = BUNDLE.assets['enhanced_store.css']['body'].decode('utf-8')
+    js = BUNDLE.assets['enhanced_store.js']['body'].decode('utf-8')
+    html = html.replace(f'<link href="{FIELDS["STORE_CSS_URL"]}" rel="stylesheet">', f'<style>{css}</style>')
+    return html.replace(f'<script src="{FIELDS["STORE_JS_URL"]}"></script>', f'<script>{js}</script>')
+
+
+def measure(render, fields, products, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        render(fields, products)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    render(fields, products)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    legacy_render = build_legacy_renderer()
+
+    print(f"{'products':>9} {'renderer':<10} {'median ms':>10} {'peak KiB':>10}")
+    for count in (8, 100, 1000):
+        products = make_products(count)
+        fields = dict(FIELDS, PRODUCT_COUNT=count)
+        assert legacy_render(fields, products) == compiled_render(fields, products)
+
+        for label, render in (('f-string', legacy_render), ('compiled', compiled_render)):
+            median_ms, peak_kib = measure(render, fields, products, repeats)
+            print(f"{count:>9} {label:<10} {median_ms:>10.3f} {peak_kib:>10.1f}")
+
+    # Per-catalog bytes on the wire and in the catalog store, with and without shared assets
+    print(f"\n{'products':>9} {'page':<10} {'html KiB':>10} {'gzip KiB':>10}")
+    for count in (8, 100):
+        html = compiled_render(dict(FIELDS, PRODUCT_COUNT=count), make_products(count))
+        for label, page in (('inlined', inline_assets(html)), ('linked', html)):
+            raw = page.encode('utf-8')
+            print(f"{count:>9} {label:<10} {len(raw) / 1024:>10.1f} {len(gzip.compress(raw)) / 1024:>10.1f}")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark Gemini product suggestions against FakeGenerativeModel: the old one-prompt-per-business
+path (fresh call every time, greedy regex parse) vs. GeminiProductSuggester's prompt cache and
+batched calls, plus the reply parsing on its own. Ends with analyze_business_with_vertex
+through app.py.
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from gemini_products import PRODUCT_PROMPT, GeminiProductSuggester, parse_json_reply
+from kv_store import create_store
+from local_stubs import FakeGenerativeModel
+
+
+def businesses(count):
+    kinds = ('Crochet', 'Plants', 'Bakery', 'Boutique', 'Ceramics', 'Candles')
+    return [(f"shop{i}.{kinds[i % len(kinds)].lower()}", f"Shop {i} {kinds[i % len(kinds)]}") for i in range(count)]
+
+
+def old_suggest(model, username, name):
+    """What analyze_business_with_vertex did: a new prompt per call, greedy regex over the reply"""
+    response = model.generate_content(PRODUCT_PROMPT.format(name=name, username=username))
+    match = re.search(r'\[.*\]', response.text, re.DOTALL)
+    try:
+        return json.loads(match.group()) if match else None
+    except ValueError:
+        return None
+
+
+def timed(label, model, func):
+    calls_before = model.calls
+    start = time.perf_counter()
+    results = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    answered = sum(1 for result in results if result)
+    print(f"{label:<44} {elapsed:8.0f} ms   model calls={model.calls - calls_before:3d}   answered={answered}/{len(results)}")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.8
+    shops = businesses(count)
+    print(f"{count} businesses, {delay * 1000:.0f} ms per Gemini call\n")
+
+    model = FakeGenerativeModel(delay=delay)
+    plain_model = FakeGenerativeModel(delay=delay, json_mode=False)
+    timed('old: one prompt each', model, lambda: [old_suggest(model, u, n) for u, n in shops])
+    timed('old: same businesses again', model, lambda: [old_suggest(model, u, n) for u, n in shops])
+
+    suggester = GeminiProductSuggester(lambda: model, create_store('memory', 'gemini_products'))
+    timed('new: suggest() each, cold cache', model, lambda: [suggester.suggest(u, n) for u, n in shops])
+    timed('new: suggest() each, warm cache', model, lambda: [suggester.suggest(u.upper(), f" {n} ") for u, n in shops])
+
+    suggester = GeminiProductSuggester(lambda: model, create_store('memory', 'gemini_products'), batch_size=10)
+    timed('new: suggest_many(), batch_size=10, cold', model, lambda: suggester.suggest_many(shops))
+    timed('new: suggest_many(), warm', model, lambda: suggester.suggest_many(shops))
+
+    plain = GeminiProductSuggester(lambda: plain_model, create_store('memory', 'gemini_products'), batch_size=10)
+    timed('new: suggest_many(), model without JSON mode', plain_model, lambda: plain.suggest_many(shops))
+
+    # Parsing alone, on a large reply
+    reply = json.dumps([{'id': i, 'products': FakeGenerativeModel.products_for(n)} for i, (_, n) in enumerate(shops * 4)])
+    fenced = f"Here you go:\n```json\n{reply}\n```\n"
+    for label, text in (('JSON mode reply', reply), ('fenced reply', fenced)):
+        rounds = 200
+        start = time.perf_counter()
+        for _ in range(rounds):
+            json.loads(re.search(r'\[.*\]', text, re.DOTALL).group())
+        greedy = (time.perf_counter() - start) / rounds * 1e6
+        start = time.perf_counter()
+        for _ in range(rounds):
+            parse_json_reply(text)
+        parsed = (time.perf_counter() - start) / rounds * 1e6
+        print(f"parse {len(text) // 1024} KB {label:<16} greedy regex {greedy:8.0f} µs   parse_json_reply {parsed:8.0f} µs")
+
+    # A reply with a bracket after the JSON: the greedy match runs on to it
+    trailing = f"```json\n{json.dumps(FakeGenerativeModel.products_for('Shop'))}\n```\nPrices in INR [approx]."
+    try:
+        json.loads(re.search(r'\[.*\]', trailing, re.DOTALL).group())
+        greedy_ok = 'parsed'
+    except ValueError:
+        greedy_ok = 'failed'
+    print(f"reply with trailing '[approx]':          greedy regex {greedy_ok}   parse_json_reply "
+          f"{len(parse_json_reply(trailing))} products")
+
+    # End to end through app.py
+    os.environ['DATA_DIR'] = tempfile.mkdtemp(prefix='bench-gemini-')
+    os.environ['GEMINI_CACHE_BACKEND'] = 'memory'
+    import app
+
+    model = FakeGenerativeModel(delay=delay)
+    app.clients.register('gemini', lambda: model)
+    app.gemini_available = lambda: True
+    infos = [(username, {'name': name, 'bio': ''}) for username, name in shops]
+    print()
+    timed('app: analyze_business_with_vertex each', model,
+          lambda: [app.analyze_business_with_vertex(u, info) for u, info in infos])
+    timed('app: analyze_business_with_vertex again', model,
+          lambda: [app.analyze_business_with_vertex(u, info) for u, info in infos])
+    print(f"  {app.gemini_products.stats()}")
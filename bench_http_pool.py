@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Benchmark bare requests.get vs. the pooled keep-alive client
+Counts TLS handshakes on a local HTTPS stub server
+"""
+import sys
+import time
+
+import requests
+
+from http_client import PooledHTTPClient
+from local_stubs import StubTLSServer
+
+
+def run(label, get, server, count):
+    handshakes_before = server.handshakes
+    start = time.perf_counter()
+    for _ in range(count):
+        response = get(f"{server.url}/v22.0/me", verify=server.cert_path, timeout=5)
+        assert response.status_code == 200
+    elapsed = (time.perf_counter() - start) * 1000
+    handshakes = server.handshakes - handshakes_before
+    print(f"{label:<14} {count} requests in {elapsed:8.1f} ms ({elapsed / count:6.2f} ms/req), {handshakes} TLS handshakes")
+    return elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with StubTLSServer() as server:
+        client = PooledHTTPClient(default_timeout=5)
+
+        print(f"📊 {count} sequential HTTPS GETs against {server.url}")
+        bare = run("bare requests", requests.get, server, count)
+        pooled = run("pooled client", client.get, server, count)
+        print(f"✅ Pooled client is {bare / pooled:.1f}x faster")
+        print(f"📈 Client metrics: {client.metrics()}")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark the catalog image stage of process_instagram_async offline: the old serial path
+(download the profile picture for colours, then one Cloudinary upload per product, each waiting
+for the last) vs. image_pipeline, which downloads every image once and runs colour extraction,
+thumbnailing and uploads concurrently. Images come from StubImageServer, uploads go to
+StubUploadServer through the real Cloudinary SDK (via CLOUDINARY_UPLOAD_PREFIX).
+"""
+import os
+import sys
+import time
+
+from local_stubs import StubImageServer, StubUploadServer
+
+
+def old_path(app, profile_pic, images, folder):
+    colors = app.extract_brand_colors(profile_pic)
+    return colors, [app.upload_image_to_cloudinary(url, folder) for url in images]
+
+
+def new_path(app, profile_pic, images, folder):
+    colors_run = app.image_pipeline.submit([(profile_pic, ('colors',))])
+    uploads = app.image_pipeline.run([(url, ('upload', 'thumbnail')) for url in images], folder=folder)
+    return colors_run.results()[0]['colors'], [upload['upload'] for upload in uploads]
+
+
+if __name__ == "__main__":
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    upload_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.4
+
+    # Instagram serves profile pictures at up to 320px, post images at 1080px
+    with StubImageServer(delay=0.1, size=(320, 320)) as avatars, StubImageServer(delay=0.1, size=(1080, 1080)) as images, \
+            StubUploadServer(delay=upload_delay) as uploads:
+        os.environ.update({
+            'CLOUDINARY_CLOUD_NAME': 'stub', 'CLOUDINARY_API_KEY': 'key', 'CLOUDINARY_API_SECRET': 'secret',
+            'CLOUDINARY_UPLOAD_PREFIX': uploads.url
+        })
+        import app
+
+        profile_pic = avatars.image_url('profile')
+        urls = [images.image_url(i) for i in range(products)]
+        print(f"{products} products (1080px JPEGs) + a 320px profile picture, 100 ms per image download, "
+              f"{upload_delay * 1000:.0f} ms per upload\n")
+
+        for label, func in (('serial (old)', old_path), ('image pipeline', new_path)):
+            downloads_before, uploads_before = images.requests + avatars.requests, uploads.uploads
+            start = time.perf_counter()
+            colors, uploaded = func(app, profile_pic, urls, 'instagram_bench/products')
+            elapsed = (time.perf_counter() - start) * 1000
+            assert all(url.startswith(uploads.url) for url in uploaded), uploaded
+            print(f"{label:<16} {elapsed:8.1f} ms   downloads={images.requests + avatars.requests - downloads_before:2d}   "
+                  f"uploads={uploads.uploads - uploads_before:2d}   peak concurrent uploads={uploads.max_in_flight}   "
+                  f"primary={colors['primary']}")
+            uploads.max_in_flight = 0
+
+        print(f"\nuploads sent as a URL for Cloudinary to fetch again: {uploads.remote_fetches}")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pre-analysis image stage: the old path (download post images and send them to
+Vision as-is, duplicates included) vs. prepare_post_images, which collapses near-duplicate posts
+by perceptual hash and downscales to VISION_IMAGE_MAX_SIDE first. The feed is 1080px stub JPEGs
+where some posts repost an earlier picture (re-encoded at a lower quality). Reports Vision bytes,
+images annotated and how many annotated images were duplicates (= duplicate products).
+"""
+import os
+import sys
+import tempfile
+import time
+
+from local_stubs import StubImageServer, StubVisionServer
+
+# Post image names, newest first; "<n>~<k>" is a re-encoded repost of "<n>"
+FEED = ['0', '1', '0~1', '2', '3', '1~2', '4', '3~1', '5', '6', '7', '2~3']
+
+
+def old_path(bot, annotator, posts):
+    from vision_batch import download_images
+
+    candidates = [post for post in posts[:6] if post.get('image')]
+    contents = download_images(bot.http_client, [post['image'] for post in candidates])
+    candidates = [post for post in candidates if contents.get(post['image'])]
+    annotator.annotate([contents[post['image']] for post in candidates])
+    return candidates
+
+
+def new_path(bot, annotator, posts, max_side):
+    prepared = bot.prepare_post_images(posts[:12], max_side, limit=6, downloaded_only=True)
+    annotator.annotate([content for _, content in prepared])
+    return [post for post, _ in prepared]
+
+
+if __name__ == "__main__":
+    vision_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+
+    with StubVisionServer(delay=vision_delay) as vision_stub, StubImageServer(delay=0.1, size=(1080, 1080)) as images:
+        os.environ['VISION_API_ENDPOINT'] = vision_stub.url
+        os.environ['DATA_DIR'] = tempfile.mkdtemp(prefix='bench-image-prep-')
+        import app as bot
+        from vision_batch import VisionBatchAnnotator, create_vision_client
+
+        client = create_vision_client(vision_stub.url)
+        posts = [{'id': name, 'image': f"{images.url}/images/{name}.jpg"} for name in FEED]
+        # Warm connections and the stub's JPEG cache
+        old_path(bot, VisionBatchAnnotator(client), posts)
+        for name in FEED:
+            images.image(f"{name}.jpg")
+
+        print(f"{len(FEED)} posts (1080px), {sum('~' in name for name in FEED)} of them reposts; "
+              f"Vision latency {vision_delay * 1000:.0f} ms\n")
+        runs = [('as-is (old)', lambda annotator: old_path(bot, annotator, posts))]
+        for max_side in (1024, 640):
+            runs.append((f"dedupe + {max_side}px", lambda annotator, max_side=max_side: new_path(bot, annotator, posts, max_side)))
+
+        for label, func in runs:
+            # No annotation cache, so every run pays for what it sends
+            annotator = VisionBatchAnnotator(client)
+            bytes_before, images_before = vision_stub.bytes_received, vision_stub.images
+            start = time.perf_counter()
+            analyzed = func(annotator)
+            elapsed = (time.perf_counter() - start) * 1000
+            duplicates = len(analyzed) - len({post['id'].partition('~')[0] for post in analyzed})
+            print(f"{label:<18} {elapsed:8.1f} ms   vision bytes={(vision_stub.bytes_received - bytes_before) / 1024:7.0f} KB   "
+                  f"images={vision_stub.images - images_before}   duplicate products={duplicates}")
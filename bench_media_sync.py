@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Graph API media sync against StubInstagramGraphServer: the old single
+/me/media page vs. MediaSync's first (full, cursor-following) run and its incremental
+refreshes. Then runs process_instagram_with_api three times and reports how many posts reach
+product analysis on each refresh, and how many product images point at expired CDN URLs.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from http_client import PooledHTTPClient
+from kv_store import create_store
+from local_stubs import StubInstagramGraphServer
+from media_sync import MediaSync
+
+TOKEN = 'IGQVJ-bench-token'
+
+
+def timed(label, stub, func):
+    requests_before = stub.requests
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<36} {elapsed:8.1f} ms   requests={stub.requests - requests_before:3d}   {result}")
+
+
+def old_first_page(client, stub):
+    response = client.get(f"{stub.url}/me/media?fields=id,caption,media_type,media_url,thumbnail_url,timestamp&access_token={TOKEN}")
+    return f"posts seen={len(response.json()['data'])}"
+
+
+def describe(sync):
+    return f"posts known={len(sync['media'])} new={len(sync['new'])} changed={len(sync['changed'])} removed={len(sync['removed'])}"
+
+
+if __name__ == "__main__":
+    posts = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    print(f"account with {posts} posts, {delay * 1000:.0f} ms per Graph round trip\n")
+
+    client = PooledHTTPClient(retries=0)
+    with StubInstagramGraphServer(delay=delay, posts=posts) as stub:
+        syncer = MediaSync(client, create_store('memory', 'media_sync'), base_url=stub.url)
+        timed('old: first /me/media page', stub, lambda: old_first_page(client, stub))
+        timed('sync #1 (full, follows cursors)', stub, lambda: describe(syncer.sync('1784', TOKEN)))
+        timed('sync #2 (nothing new)', stub, lambda: describe(syncer.sync('1784', TOKEN)))
+        for i in range(3):
+            stub.add_post()
+        timed('sync #3 (3 new posts)', stub, lambda: describe(syncer.sync('1784', TOKEN)))
+        stub.media[5]['caption'] = 'Edited caption - now ₹1299'
+        stub.media.pop(40)
+        timed('weekly full sync (1 edit, 1 delete)', stub, lambda: describe(syncer.sync('1784', TOKEN, full=True)))
+
+    # End to end: how many posts reach product analysis on a refresh
+    with StubInstagramGraphServer(delay=delay, posts=posts) as stub:
+        os.environ['INSTAGRAM_GRAPH_URL'] = stub.url
+        os.environ['DATA_DIR'] = tempfile.mkdtemp(prefix='bench-media-sync-')
+        import app
+
+        analyzed = []
+        analyze = app.analyze_instagram_posts_with_vertex
+        app.analyze_instagram_posts_with_vertex = lambda posts, info: analyzed.append(len(posts)) or analyze(posts, info)
+        app.extract_brand_colors = lambda url: app.generate_default_colors()
+
+        print()
+        for label in ('first catalog', 'refresh, nothing new', 'refresh, 2 new posts', 'refresh, CDN re-signed'):
+            if label.endswith('2 new posts'):
+                stub.add_post('New: hand-painted mug ₹699')
+                stub.add_post('New: ceramic planter ₹899')
+            if label.endswith('re-signed'):
+                stub.rotate_urls()
+            analyzed.clear()
+            requests_before = stub.requests
+            start = time.perf_counter()
+            app.process_instagram_with_api('stub.shop', TOKEN, app.job_status.claim('stub.shop'))
+            elapsed = (time.perf_counter() - start) * 1000
+            products = app.catalog_store.get('stub.shop')['metadata']['products']
+            current_urls = {item['media_url'] for item in stub.media}
+            stale = sum(1 for product in products if product.get('post_id') and product.get('image') not in current_urls)
+            print(f"process_instagram_with_api: {label:<22} {elapsed:8.1f} ms   requests={stub.requests - requests_before:3d}   "
+                  f"posts analyzed={sum(analyzed):3d}   products={len(products)}   stale images={stale}")
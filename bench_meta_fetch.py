@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark meta-tag profile fetches: download the whole page and parse it (the old ScrapingBee /
+CloudScraper path) vs. fetch_meta, which streams the body and hangs up at </head>. Serves a
+saved profile page, padded to --size MB, from a local stub that trickles it out like a proxy.
+Reports wall time, bytes the server managed to send, and peak Python memory per fetch.
+"""
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bench_profile_parser import CORPUS_DIR, pad
+from http_client import PooledHTTPClient
+from local_stubs import StubProfileServer
+from profile_parser import fetch_meta, parse_meta
+
+
+def full_fetch(client, url):
+    response = client.get(url, timeout=30)
+    return parse_meta(response.text), len(response.content)
+
+
+def streamed_fetch(client, url):
+    _, meta, bytes_read = fetch_meta(client.get, url, timeout=30)
+    return meta, bytes_read
+
+
+def measure(label, func, client, stub, repeats):
+    times, peaks, sent = [], [], []
+    result = None
+    for i in range(repeats):
+        served_before = len(stub.bytes_sent)
+        tracemalloc.start()
+        start = time.perf_counter()
+        result, _ = func(client, f"{stub.url}/profile{i}/")
+        times.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        # The handler records its byte count once it finishes or notices the hang-up
+        deadline = time.time() + 5
+        while len(stub.bytes_sent) == served_before and time.time() < deadline:
+            time.sleep(0.01)
+        sent.append(stub.bytes_sent[served_before])
+    print(f"{label:<18} median={statistics.median(times) * 1000:8.1f} ms   "
+          f"sent={statistics.median(sent) / 1024:8.1f} KB   peak mem={statistics.median(peaks) / 1024:8.1f} KB")
+    return result
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    size_mb = 2.0
+    if '--size' in args:
+        size_mb = float(args[args.index('--size') + 1])
+        del args[args.index('--size'):args.index('--size') + 2]
+    repeats = int(args[0]) if args else 5
+    bandwidth_mb = float(args[1]) if len(args) > 1 else 4.0
+
+    with open(os.path.join(CORPUS_DIR, 'login_wall.html'), encoding='utf-8') as f:
+        page = pad(f.read(), size_mb)
+    print(f"page: {len(page.encode()) / 1024:.0f} KB, served at {bandwidth_mb:g} MB/s, median of {repeats}\n")
+
+    client = PooledHTTPClient(retries=0)
+    with StubProfileServer(page, delay=0.2, bandwidth=bandwidth_mb * 1024 * 1024) as stub:
+        full = measure('full download', full_fetch, client, stub, repeats)
+        streamed = measure('streamed meta', streamed_fetch, client, stub, repeats)
+
+    wanted = ('og:title', 'og:description', 'og:image')
+    assert all(full[key] == streamed[key] for key in wanted), (full, streamed)
+    print(f"\nsame og: tags from both: {streamed['og:title']!r}")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark brand colour extraction on profile-picture-sized images: the old path (PIL decode,
+JPEG re-encode into a BytesIO, ColorThief get_color + get_palette at quality=1) vs.
+palette.brand_colors (draft decode, 64px sample, one NumPy k-means). Images are generated
+StubImageServer JPEGs; pass saved profile pictures as arguments to benchmark those instead.
+colorthief is no longer a requirement; install it to get the "old" column.
+"""
+import io
+import statistics
+import sys
+import time
+
+from local_stubs import StubImageServer
+from palette import brand_colors, extract_palette
+
+try:
+    from colorthief import ColorThief
+except ImportError:
+    ColorThief = None
+
+
+def legacy_colors(content):
+    """extract_brand_colors before palette.py, minus the download"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(content))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    temp_file = io.BytesIO()
+    image.save(temp_file, format='JPEG')
+    temp_file.seek(0)
+    color_thief = ColorThief(temp_file)
+    dominant = color_thief.get_color(quality=1)
+    palette = color_thief.get_palette(color_count=3, quality=1)
+    return [dominant, palette[1], palette[2]]
+
+
+def timed(func, content, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(content)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def distance(a, b):
+    return sum((x - y) ** 2 for x, y in zip(a, b)) ** 0.5
+
+
+if __name__ == "__main__":
+    repeats = 5
+    if sys.argv[1:]:
+        images = {path: open(path, 'rb').read() for path in sys.argv[1:]}
+    else:
+        # Instagram serves profile pictures at 150 and 320px; 1080px is a full-size upload
+        images = {}
+        for side in (150, 320, 640, 1080):
+            images[f"{side}x{side}"] = StubImageServer(size=(side, side)).image('profile.jpg')
+
+    print(f"median of {repeats}\n")
+    print(f"{'image':<12} {'old':>10} {'new':>10} {'speedup':>8}   old primary within new palette")
+    for name, content in images.items():
+        new_ms, _ = timed(brand_colors, content, repeats)
+        if ColorThief is None:
+            print(f"{name:<12} {'-':>10} {new_ms:8.1f}ms")
+            continue
+        old_ms, old = timed(legacy_colors, content, repeats)
+        palette = [rgb for rgb, _ in extract_palette(content)]
+        nearest = min(distance(old[0], rgb) for rgb in palette)
+        print(f"{name:<12} {old_ms:8.1f}ms {new_ms:8.1f}ms {old_ms / new_ms:7.0f}x   ΔRGB={nearest:.0f}")
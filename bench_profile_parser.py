@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark Instagram profile page parsing on the saved pages in bench_corpus/profile_pages:
+the old extractors (BeautifulSoup html.parser per call, regexes compiled per call, lazy
+`{.*?}` JSON patterns over the whole document) vs. profile_parser. Pages are padded with
+copies of their own body scripts to --size MB, since live profile pages are mostly inline JS.
+Drop real saved pages into the corpus directory to benchmark against them too.
+"""
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from profile_parser import parse_meta, parse_profile_page, profile_from_meta
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_corpus', 'profile_pages')
+
+
+def legacy_meta(page, username):
+    """The old extract_from_html: full html.parser soup, three find() calls, per-call regexes"""
+    soup = BeautifulSoup(page, 'html.parser')
+    og_title = soup.find('meta', property='og:title')
+    og_description = soup.find('meta', property='og:description')
+    og_image = soup.find('meta', property='og:image')
+    title = og_title.get('content') if og_title else ''
+    description = og_description.get('content') if og_description else ''
+    image = og_image.get('content') if og_image else ''
+    if not (title and description):
+        return {'success': False}
+    display_name = title.replace(' • Instagram photos and videos', '').replace(' • Instagram', '').replace(' (@', ' (')
+    if '(' in display_name:
+        display_name = display_name.split(' (')[0].strip()
+    follower_match = re.search(r'(\d+(?:,\d+)*)\s+Followers', title + ' ' + description)
+    bio = description
+    bio = re.sub(r'\d+(?:,\d+)* Followers,?\s*', '', bio)
+    bio = re.sub(r'\d+(?:,\d+)* Following,?\s*', '', bio)
+    bio = re.sub(r'\d+(?:,\d+)* Posts?\s*-?\s*', '', bio)
+    return {
+        'full_name': display_name,
+        'bio': bio.replace('See Instagram photos and videos from ', '').strip(),
+        'followers': int(follower_match.group(1).replace(',', '')) if follower_match else 0,
+        'profile_pic_url': image,
+        'success': True
+    }
+
+
+def legacy_full(page, username):
+    """The old extract_from_instagram_html: five lazy JSON patterns, field patterns, then a soup"""
+    for pattern in (
+        r'window\._sharedData\s*=\s*({.*?});',
+        r'window\.__additionalDataLoaded\([^,]+,\s*({.*?})\)',
+        r'"ProfilePage":\[({.*?})\]',
+        r'"user":\s*({.*?"edge_owner_to_timeline_media".*?})',
+        r'"graphql":\s*{"user":\s*({.*?})\s*}',
+    ):
+        for match in re.finditer(pattern, page, re.DOTALL):
+            try:
+                data = json.loads(match.group(1))
+            except ValueError:
+                continue
+            for path in (['entry_data', 'ProfilePage', 0, 'graphql', 'user'], ['graphql', 'user'], ['user']):
+                try:
+                    user = data
+                    for key in path:
+                        user = user[key]
+                    return {'full_name': user.get('full_name', ''), 'bio': user.get('biography', ''),
+                            'followers': user.get('edge_followed_by', {}).get('count', 0),
+                            'posts': len(user.get('edge_owner_to_timeline_media', {}).get('edges', []))}
+                except (KeyError, IndexError, TypeError):
+                    continue
+
+    result = {'full_name': '', 'bio': '', 'followers': 0}
+    for field, patterns in {
+        'bio': [r'"biography":"([^"]*?)"', r'"biography":\s*"([^"]*?)"', r'<meta\s+property="og:description"\s+content="([^"]*?)"'],
+        'full_name': [r'"full_name":"([^"]*?)"', r'"full_name":\s*"([^"]*?)"', r'<meta\s+property="og:title"\s+content="([^"]*?)"'],
+        'followers': [r'"edge_followed_by":\s*{\s*"count":\s*(\d+)', r'edge_followed_by.*?"count":\s*(\d+)', r'(\d+(?:,\d+)*)\s+[Ff]ollowers']
+    }.items():
+        for pattern in patterns:
+            match = re.search(pattern, page, re.IGNORECASE)
+            if match:
+                result[field] = int(match.group(1).replace(',', '')) if field == 'followers' else match.group(1)
+                break
+    soup = BeautifulSoup(page, 'html.parser')
+    result['posts'] = len([
+        img for img in soup.find_all('img')
+        if 'scontent' in img.get('src', '') and any(x in img.get('src', '') for x in ['cdninstagram', 'fbcdn'])
+        and not any(x in img.get('src', '').lower() for x in ['profile', 'avatar', 'story', 'highlight'])
+    ][:12])
+    return result
+
+
+def new_meta(page, username):
+    record = profile_from_meta(parse_meta(page), username)
+    return record.to_dict(success=True) if record else {'success': False}
+
+
+def new_full(page, username):
+    record = parse_profile_page(page, username)
+    return {'full_name': record.full_name, 'bio': record.bio, 'followers': record.followers, 'posts': len(record.posts)}
+
+
+def pad(page, size_mb):
+    """Repeat the page's body scripts until it is about size_mb, keeping its structure intact"""
+    target = int(size_mb * 1024 * 1024)
+    scripts = ''.join(re.findall(r'<script[^>]*>requireLazy.*?</script>', page)) or '<script>void 0;</script>'
+    body_end = page.rfind('</body>')
+    filler = scripts * max(0, (target - len(page)) // len(scripts))
+    return page[:body_end] + filler + page[body_end:]
+
+
+def timed(func, page, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(page, 'bench')
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    size_mb = 2.0
+    if '--size' in args:
+        size_mb = float(args[args.index('--size') + 1])
+        del args[args.index('--size'):args.index('--size') + 2]
+    repeats = int(args[0]) if args else 5
+
+    paths = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+    print(f"{len(paths)} pages, padded to {size_mb:g} MB, median of {repeats}\n")
+    print(f"{'page':<22} {'meta old':>10} {'meta new':>10} {'full old':>10} {'full new':>10}")
+
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            page = pad(f.read(), size_mb)
+        row = []
+        for index, func in enumerate((legacy_meta, new_meta, legacy_full, new_full)):
+            elapsed, result = timed(func, page, repeats)
+            totals[index] += elapsed
+            row.append(elapsed)
+        print(f"{os.path.basename(path):<22} " + ' '.join(f"{ms:8.1f}ms" for ms in row))
+        print(f"{'':<22} new: name={result['full_name']!r} followers={result['followers']} posts={result['posts']}")
+
+    print(f"\n{'total':<22} " + ' '.join(f"{ms:8.1f}ms" for ms in totals))
+    print(f"meta-only speedup: {totals[0] / totals[1]:.0f}x   full parse speedup: {totals[2] / totals[3]:.1f}x")
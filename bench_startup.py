@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start: `python -X importtime -c "import app"` in fresh interpreters, plus the
+time until a first /health response. Reports the slowest imports and fails if any heavy SDK
+is loaded at import time. Pass --record FILE to append the result as one JSON line (with the
+git revision) and compare against the previous entry, so startup can be tracked over time.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Must only load when a code path needs them (see lazy_imports.py)
+HEAVY_MODULES = (
+    'vertexai', 'google.cloud.aiplatform', 'google.cloud.vision', 'selenium',
+    'webdriver_manager', 'cloudinary', 'numpy', 'PIL', 'bs4'
+)
+
+FIRST_REQUEST = (
+    "import time; start = time.perf_counter(); import app; "
+    "response = app.app.test_client().get('/health'); "
+    "print(response.status_code, round((time.perf_counter() - start) * 1000, 1))"
+)
+
+
+def run_importtime():
+    """(wall ms, {module: cumulative us}) for one fresh `import app`"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total_us, name = line[len('import time:'):].split('|')
+        cumulative[name.strip()] = int(total_us)
+    return wall_ms, cumulative
+
+
+def run_first_request():
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_REQUEST], capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    status, elapsed_ms = result.stdout.strip().splitlines()[-1].split()
+    assert status == '200', result.stdout[-500:]
+    return float(elapsed_ms)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    record_path = None
+    if '--record' in args:
+        record_path = args[args.index('--record') + 1]
+        del args[args.index('--record'):args.index('--record') + 2]
+    runs = int(args[0]) if args else 5
+
+    walls, imports = [], []
+    for _ in range(runs):
+        wall_ms, cumulative = run_importtime()
+        walls.append(wall_ms)
+        imports.append(cumulative)
+    first_request_ms = statistics.median(run_first_request() for _ in range(runs))
+
+    app_ms = statistics.median(run['app'] / 1000 for run in imports)
+    print(f"import app (median of {runs}): {app_ms:8.1f} ms   process wall: {statistics.median(walls):8.1f} ms")
+    print(f"import app + first /health:    {first_request_ms:8.1f} ms")
+
+    last = imports[-1]
+    top_level = {name: us for name, us in last.items() if '.' not in name and name != 'app'}
+    print("\nslowest top-level imports:")
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {name:<30} {us / 1000:8.1f} ms")
+
+    eager = [name for name in HEAVY_MODULES if name in last]
+    if eager:
+        print(f"\n❌ heavy SDKs loaded at import: {', '.join(eager)}")
+
+    if record_path:
+        previous = None
+        if os.path.exists(record_path):
+            with open(record_path) as f:
+                lines = [line for line in f if line.strip()]
+            previous = json.loads(lines[-1]) if lines else None
+        entry = {
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'import_ms': round(app_ms, 1),
+            'first_request_ms': round(first_request_ms, 1),
+            'eager_heavy_modules': eager
+        }
+        with open(record_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        if previous:
+            print(f"\nvs {previous.get('revision')} ({previous['recorded_at']}): "
+                  f"import {entry['import_ms'] - previous['import_ms']:+.1f} ms, "
+                  f"first request {entry['first_request_ms'] - previous['first_request_ms']:+.1f} ms")
+
+    sys.exit(1 if eager else 0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark post image analysis: serial download + three Vision calls per image (the old
+analyze_instagram_posts_with_vertex loop) vs. parallel downloads + one batched Vision request.
+Also times the full analyze_instagram_posts_with_vertex with a cold and a warm annotation
+cache (a regenerated catalog). Runs entirely offline against local stub image and Vision servers.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from local_stubs import StubImageServer, StubVisionServer
+
+
+def legacy_annotate(http_client, client, urls):
+    """The old per-post loop: download, then object_localization, text_detection, label_detection"""
+    from google.cloud import vision
+
+    results = []
+    for url in urls:
+        response = http_client.get(url, timeout=10)
+        if response.status_code != 200:
+            continue
+        image = vision.Image(content=response.content)
+        results.append((
+            client.object_localization(image=image),
+            client.text_detection(image=image),
+            client.label_detection(image=image)
+        ))
+    return results
+
+
+def batched_annotate(http_client, annotator, urls):
+    from vision_batch import download_images
+
+    contents = download_images(http_client, urls)
+    return annotator.annotate([contents[url] for url in urls if contents.get(url)])
+
+
+def timed(label, func, repeats, vision_stub):
+    requests_before = vision_stub.requests
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    calls = (vision_stub.requests - requests_before) / repeats
+    print(f"{label:<26} median={statistics.median(times) * 1000:8.1f} ms   vision calls/run={calls:5.1f}")
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    vision_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    image_delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+    with StubVisionServer(delay=vision_delay) as vision_stub, StubImageServer(delay=image_delay) as images:
+        os.environ['VISION_API_ENDPOINT'] = vision_stub.url
+        os.environ['DATA_DIR'] = tempfile.mkdtemp(prefix='bench-vision-')
+        import app as bot
+        from vision_batch import VisionBatchAnnotator, create_vision_client
+
+        urls = [images.image_url(i) for i in range(6)]
+        posts = [{'image': url, 'caption': f"Handmade ceramic piece #{i}"} for i, url in enumerate(urls)]
+        client = create_vision_client(vision_stub.url)
+        annotator = VisionBatchAnnotator(client)
+
+        # Warm connections and the stub's JPEG cache
+        batched_annotate(bot.http_client, annotator, urls)
+
+        print(f"6 posts, Vision latency {vision_delay * 1000:.0f} ms, image latency {image_delay * 1000:.0f} ms")
+        timed('serial, 3 calls per image', lambda: legacy_annotate(bot.http_client, client, urls), repeats, vision_stub)
+        timed('parallel + batched', lambda: batched_annotate(bot.http_client, annotator, urls), repeats, vision_stub)
+        analyze = lambda: bot.analyze_instagram_posts_with_vertex(posts, {'display_name': 'Bench'})
+        timed('analyze, cold cache', analyze, 1, vision_stub)
+        timed('analyze, warm cache', analyze, repeats, vision_stub)
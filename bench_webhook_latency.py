@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark webhook POST latency with inline replies vs. async dispatch
+Runs entirely offline against a local stub Graph server
+"""
+import os
+import statistics
+import sys
+import time
+
+from local_stubs import StubGraphServer
+
+
+def make_payload(message_id):
+    return {
+        'object': 'whatsapp_business_account',
+        'entry': [{
+            'id': 'bench',
+            'changes': [{
+                'field': 'messages',
+                'value': {
+                    'messages': [{
+                        'id': message_id,
+                        'from': '15550000000',
+                        'type': 'text',
+                        'text': {'body': 'hi'}
+                    }]
+                }
+            }]
+        }]
+    }
+
+
+def run(client, count, label):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        response = client.post('/webhook', json=make_payload(f"wamid.{label}.{i}"))
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def report(label, latencies):
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<16} p50={p50:8.2f} ms   p99={p99:8.2f} ms   max={ordered[-1]:8.2f} ms")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    graph_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+
+    with StubGraphServer(delay=graph_delay) as graph:
+        os.environ['WHATSAPP_TOKEN'] = 'bench-token'
+        os.environ['PHONE_NUMBER_ID'] = 'bench'
+        os.environ['WHATSAPP_API_URL'] = graph.url
+
+        import app as bot
+        client = bot.app.test_client()
+
+        print(f"📊 {count} webhook POSTs, stub Graph API delay {graph_delay * 1000:.0f} ms")
+
+        bot.WEBHOOK_ASYNC_DISPATCH = False
+        report("inline replies", run(client, count, 'inline'))
+
+        bot.WEBHOOK_ASYNC_DISPATCH = True
+        sent_before = len(graph.requests)
+        report("async dispatch", run(client, count, 'async'))
+
+        bot.drain_background_jobs(timeout=60)
+        print(f"✅ Dispatcher delivered {len(graph.requests) - sent_before}/{count} replies")
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Warm Browser Pool
+Keeps a few headless Chrome drivers alive and leases them out to Selenium extractions,
+instead of starting (and killing) a new browser for every username.
+Drivers are health-checked before reuse and recycled after `max_pages` page loads,
+when their process tree grows past `max_rss_mb`, or after sitting idle for `idle_timeout`.
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/95.0.4638.69 Safari/537.36'
+
+
+class BrowserPoolTimeout(Exception):
+    """No browser became free within the lease timeout"""
+
+
+def create_chrome_driver(user_agent=DEFAULT_USER_AGENT, page_load_timeout=30):
+    """Headless Chrome configured the way all our Selenium extractions expect"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-web-security')
+    chrome_options.add_argument('--disable-features=VizDisplayCompositor')
+    chrome_options.add_argument(f'--user-agent={user_agent}')
+
+    try:
+        driver = webdriver.Chrome(options=chrome_options)
+    except Exception as manager_error:
+        print(f"⚠️ Selenium Manager could not start Chrome ({manager_error}), trying webdriver-manager")
+        from webdriver_manager.chrome import ChromeDriverManager
+        driver_path = ChromeDriverManager().install()
+        # Fix for ARM64 Mac - webdriver manager sometimes points to wrong file
+        if 'THIRD_PARTY_NOTICES' in driver_path:
+            actual_driver = os.path.join(os.path.dirname(driver_path), 'chromedriver')
+            if os.path.exists(actual_driver):
+                driver_path = actual_driver
+        driver = webdriver.Chrome(service=webdriver.chrome.service.Service(driver_path), options=chrome_options)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of a process and all its descendants, from /proc (0 where unavailable)"""
+    total_kb = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.leases = 0
+        self.created_at = time.time()
+        self.last_used = time.time()
+
+    def rss_mb(self):
+        try:
+            return process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return 0
+
+
+class BrowserPool:
+    """Fixed-size pool of warm WebDriver instances with a lease/return API"""
+
+    def __init__(self, factory=create_chrome_driver, max_size=2, max_pages=50, max_rss_mb=1024,
+                 idle_timeout=300, lease_timeout=60):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.idle_timeout = idle_timeout
+        self.lease_timeout = lease_timeout
+        self._lock = threading.Condition()
+        self._idle = []
+        self._leased = {}
+        self._creating = 0
+        self._closed = False
+        self._pid = os.getpid()
+        self._counters = {'created': 0, 'leases': 0, 'reused': 0, 'recycled': 0, 'unhealthy': 0, 'timeouts': 0}
+
+    def _check_pid(self):
+        # Browsers started by a parent process are not ours to drive after a fork
+        if self._pid != os.getpid():
+            self._idle = []
+            self._leased = {}
+            self._creating = 0
+            self._pid = os.getpid()
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Browser quit failed: {e}")
+
+    def _is_healthy(self, pooled):
+        try:
+            return pooled.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def _reset(self, pooled):
+        """Leave the browser on a blank page with one window and no cookies for the next lease"""
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    def _recycle_reason(self, pooled):
+        if self.max_pages and pooled.pages >= self.max_pages:
+            return f"{pooled.pages} pages"
+        if self.max_rss_mb:
+            rss = pooled.rss_mb()
+            if rss > self.max_rss_mb:
+                return f"{rss:.0f} MB RSS"
+        return None
+
+    def _reap_idle(self):
+        """Quit browsers nobody has leased for idle_timeout (called with the lock held)"""
+        if not self.idle_timeout:
+            return []
+        cutoff = time.time() - self.idle_timeout
+        stale = [pooled for pooled in self._idle if pooled.last_used < cutoff]
+        self._idle = [pooled for pooled in self._idle if pooled.last_used >= cutoff]
+        return stale
+
+    def _acquire(self, timeout):
+        deadline = time.time() + timeout
+        with self._lock:
+            self._check_pid()
+            stale = self._reap_idle()
+            while True:
+                if self._closed:
+                    raise BrowserPoolTimeout("browser pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    self._leased[id(pooled.driver)] = pooled
+                    break
+                if len(self._leased) + self._creating < self.max_size:
+                    pooled = None
+                    self._creating += 1
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise BrowserPoolTimeout(f"no browser free after {timeout}s")
+                self._lock.wait(remaining)
+
+        for old in stale:
+            self._quit(old)
+        return pooled
+
+    def _lease_driver(self, timeout):
+        while True:
+            pooled = self._acquire(timeout)
+            if pooled is None:
+                try:
+                    pooled = _PooledDriver(self.factory())
+                except Exception:
+                    with self._lock:
+                        self._creating -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._counters['created'] += 1
+                    self._creating -= 1
+                    self._leased[id(pooled.driver)] = pooled
+                break
+            if self._is_healthy(pooled):
+                with self._lock:
+                    self._counters['reused'] += 1
+                break
+            # Crashed or hung since its last lease - drop it and try again
+            with self._lock:
+                self._leased.pop(id(pooled.driver), None)
+                self._counters['unhealthy'] += 1
+                self._lock.notify()
+            self._quit(pooled)
+
+        with self._lock:
+            pooled.leases += 1
+            pooled.pages += 1
+            self._counters['leases'] += 1
+        return pooled
+
+    def _release(self, pooled):
+        pooled.last_used = time.time()
+        reason = 'pool closed' if self._closed else self._recycle_reason(pooled)
+        if reason is None:
+            try:
+                self._reset(pooled)
+            except Exception as e:
+                reason = f"unhealthy ({e.__class__.__name__})"
+
+        with self._lock:
+            self._leased.pop(id(pooled.driver), None)
+            if reason is None and self._pid == os.getpid():
+                self._idle.append(pooled)
+            else:
+                self._counters['recycled'] += 1
+            self._lock.notify()
+
+        if reason is not None:
+            print(f"♻️ Recycling browser after {pooled.leases} leases: {reason}")
+            self._quit(pooled)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """`with pool.lease() as driver:` - a warm driver, returned to the pool afterwards"""
+        pooled = self._lease_driver(self.lease_timeout if timeout is None else timeout)
+        try:
+            yield pooled.driver
+        finally:
+            self._release(pooled)
+
+    def record_pages(self, driver, count):
+        """Count extra page loads made during a lease (e.g. opening posts in new tabs)"""
+        with self._lock:
+            pooled = self._leased.get(id(driver))
+            if pooled:
+                pooled.pages += count
+
+    def close(self):
+        """Quit idle browsers now; leased ones are quit when they come back"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._counters,
+                max_size=self.max_size,
+                idle=len(self._idle),
+                leased=len(self._leased),
+                pages_per_browser=[pooled.pages for pooled in self._idle + list(self._leased.values())]
+            )
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_pool(**settings):
+    """The process-wide pool; the first caller's settings win"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool(**settings)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
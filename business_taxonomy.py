@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Business Taxonomy
+One keyword list per business category, shared by everything that guesses what a shop sells
+(business type, mock/fallback products, generated profiles, catalog colours). All keywords are
+compiled into one prefix-trie regex, so scoring every category is one pass over the text instead of
+an `any(word in text ...)` chain per category per caller.
+"""
+import re
+from functools import lru_cache
+
+# category: (display label, style, keywords). Order breaks ties. The style is the coarser
+# grouping the generated bios, name ideas and catalog colour schemes are written for
+CATEGORIES = {
+    'crafts': ('Handmade Crafts & Gifts', 'crafts', [
+        'crochet', 'handmade', 'handcrafted', 'macrame', 'craft', 'gifts', 'accessories', 'aesthetic',
+        'bouquet', 'pottery', 'ceramic', 'artisan', 'creations'
+    ]),
+    'plants': ('Plant Nursery', 'plants', [
+        'plant', 'indoor plants', 'nursery', 'garden', 'flower', 'green', 'lily', 'peace lily', 'bloom',
+        'botanical', 'leaf', 'flora'
+    ]),
+    'fashion': ('Fashion & Clothing', 'fashion', [
+        'fashion', 'boutique', 'clothing', 'style', 'wear', 'dress', 'shirt', 'apparel', 'textile', 'threads'
+    ]),
+    'food': ('Food & Beverage', 'food', [
+        'food', 'cafe', 'restaurant', 'kitchen', 'bakery', 'cook', 'cake', 'bake', 'sweet', 'pastry',
+        'pizza', 'burger', 'coffee', 'tea', 'spice'
+    ]),
+    'beauty': ('Beauty & Cosmetics', 'beauty', [
+        'beauty', 'cosmetic', 'makeup', 'skincare', 'skin', 'salon', 'spa', 'hair', 'nails', 'wellness',
+        'massage', 'therapy'
+    ]),
+    'fitness': ('Fitness', 'general', [
+        'fitness', 'gym', 'yoga', 'sport', 'health', 'training', 'workout', 'exercise'
+    ]),
+    'tech': ('Technology', 'general', [
+        'tech', 'software', 'digital', 'app', 'web', 'code', 'computer', 'website', 'mobile', 'gadget',
+        'development'
+    ]),
+    'art': ('Art & Design', 'crafts', [
+        'art', 'artist', 'design', 'creative', 'studio', 'gallery'
+    ]),
+    'jewelry': ('Jewelry', 'crafts', [
+        'jewelry', 'jewellery', 'ring', 'necklace', 'earring', 'silver', 'gold', 'diamond', 'pearl', 'bracelet'
+    ]),
+    'home': ('Home & Decor', 'general', [
+        'home', 'decor', 'decoration', 'furniture', 'interior', 'living', 'room', 'house', 'lifestyle'
+    ]),
+}
+GENERAL = 'general'
+GENERAL_LABEL = 'General Business'
+
+# A keyword listed under two categories counts for the first
+_CATEGORY_OF = {}
+for category, (_, _, keywords) in CATEGORIES.items():
+    for keyword in keywords:
+        _CATEGORY_OF.setdefault(keyword, category)
+_ORDER = {category: index for index, category in enumerate(CATEGORIES)}
+
+
+def _trie_pattern(words):
+    """Regex source matching any of the words, factored by shared prefixes ('ca(?:fe|ke)'), so
+    the engine walks one trie per position instead of retrying every keyword. Longer words win
+    over their own prefixes: 'skincare' over 'skin', 'apparel' over 'app'"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A word ends here but may go on: the optional tail is greedy, so the longer word wins
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+_ALTERNATION = _trie_pattern(_CATEGORY_OF)
+# Bios and names: keywords match at the start of a word ('plants', 'crafts' count; 'party' isn't art)
+WORD_PATTERN = re.compile(rf"\b(?:{_ALTERNATION})")
+# Usernames run words together ('thepeacelily'), so there any substring counts
+ANYWHERE_PATTERN = re.compile(_ALTERNATION)
+
+
+@lru_cache(maxsize=2048)
+def _scores(text, anywhere):
+    pattern = ANYWHERE_PATTERN if anywhere else WORD_PATTERN
+    matched = set(pattern.findall(text))
+    scores = {}
+    for keyword in matched:
+        category = _CATEGORY_OF[keyword]
+        scores[category] = scores.get(category, 0) + 1
+    return scores
+
+
+def keyword_scores(*texts, anywhere=False):
+    """{category: number of its distinct keywords found in the texts}, from one scan"""
+    return dict(_scores(' '.join(text for text in texts if text).lower(), anywhere))
+
+
+def classify(*texts, anywhere=False):
+    """The category with the most distinct keyword hits (earlier categories win ties), or 'general'"""
+    scores = _scores(' '.join(text for text in texts if text).lower(), anywhere)
+    if not scores:
+        return GENERAL
+    return max(scores, key=lambda category: (scores[category], -_ORDER[category]))
+
+
+def category_label(category):
+    """'Plant Nursery' etc., as detect_business_type reports it"""
+    return CATEGORIES[category][0] if category in CATEGORIES else GENERAL_LABEL
+
+
+def category_style(category):
+    return CATEGORIES[category][1] if category in CATEGORIES else GENERAL
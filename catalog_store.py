@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Catalog Store
+Generated catalog websites, written through to SQLite so they survive restarts and are
+served the same way by every gunicorn worker. HTML is stored gzip-compressed next to its
+metadata (products, profile, colors); a small LRU of decompressed pages sits in front and
+is revalidated against the row's updated_at on every read.
+Each save also records a content hash (the HTTP ETag) and, when the brotli package is
+installed, a brotli copy, so serving a catalog never has to compress or hash anything.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from email.utils import formatdate
+
+from profile_cache import normalize_username
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+def content_etag(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()[:20]
+
+
+class CatalogStore:
+    """Write-through catalog storage with an in-process hot cache"""
+
+    def __init__(self, path, hot_cache_size=64, compress_level=9, brotli_quality=11):
+        self.path = path
+        self.hot_cache_size = hot_cache_size
+        self.compress_level = compress_level
+        self.brotli_quality = brotli_quality
+        self._local = threading.local()
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS catalogs ("
+            "username TEXT PRIMARY KEY, html_gz BLOB, metadata TEXT, "
+            "html_size INTEGER, updated_at REAL, etag TEXT, html_br BLOB)"
+        )
+        # Databases created before etag/html_br existed: add the columns, old rows fill in on read
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(catalogs)")}
+        for column, column_type in (('etag', 'TEXT'), ('html_br', 'BLOB')):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE catalogs ADD COLUMN {column} {column_type}")
+
+    def _conn(self):
+        # One connection per thread (and per process - connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _remember(self, username, record):
+        with self._lock:
+            self._hot[username] = record
+            self._hot.move_to_end(username)
+            while len(self._hot) > self.hot_cache_size:
+                self._hot.popitem(last=False)
+
+    def save(self, username, html, metadata=None):
+        """Persist a catalog (replacing any previous one) and return its record"""
+        username = normalize_username(username)
+        raw = html.encode('utf-8')
+        html_gz = gzip.compress(raw, compresslevel=self.compress_level)
+        html_br = brotli.compress(raw, quality=self.brotli_quality) if BROTLI_AVAILABLE else None
+        etag = content_etag(html)
+        updated_at = time.time()
+        metadata = metadata or {}
+        self._conn().execute(
+            "INSERT OR REPLACE INTO catalogs (username, html_gz, metadata, html_size, updated_at, etag, html_br) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (username, html_gz, json.dumps(metadata, default=str), len(html), updated_at, etag, html_br)
+        )
+        record = {
+            'username': username, 'html': html, 'metadata': metadata, 'updated_at': updated_at,
+            'etag': etag, 'html_gz': html_gz, 'html_br': html_br
+        }
+        self._remember(username, record)
+        return record
+
+    def get(self, username):
+        """{'username', 'html', 'metadata', 'updated_at', 'etag', 'html_gz', 'html_br'} or None;
+        always the latest version on disk. html_br is None without brotli"""
+        username = normalize_username(username)
+        conn = self._conn()
+        row = conn.execute("SELECT updated_at FROM catalogs WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            with self._lock:
+                self._hot.pop(username, None)
+            return None
+
+        with self._lock:
+            cached = self._hot.get(username)
+            if cached is not None and cached['updated_at'] == row[0]:
+                self._hot.move_to_end(username)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        row = conn.execute(
+            "SELECT html_gz, metadata, updated_at, etag, html_br FROM catalogs WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        html = gzip.decompress(row[0]).decode('utf-8')
+        record = {
+            'username': username,
+            'html': html,
+            'metadata': json.loads(row[1]),
+            'updated_at': row[2],
+            'etag': row[3] or content_etag(html),
+            'html_gz': row[0],
+            'html_br': row[4]
+        }
+        self._remember(username, record)
+        return record
+
+    def get_html(self, username):
+        record = self.get(username)
+        return record['html'] if record else None
+
+    def exists(self, username):
+        row = self._conn().execute(
+            "SELECT 1 FROM catalogs WHERE username = ?", (normalize_username(username),)
+        ).fetchone()
+        return row is not None
+
+    def delete(self, username):
+        username = normalize_username(username)
+        with self._lock:
+            self._hot.pop(username, None)
+        cursor = self._conn().execute("DELETE FROM catalogs WHERE username = ?", (username,))
+        return cursor.rowcount == 1
+
+    def usernames(self, limit=100):
+        """Most recently updated catalogs first"""
+        rows = self._conn().execute(
+            "SELECT username FROM catalogs ORDER BY updated_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self):
+        count, html_bytes, stored_bytes, brotli_bytes = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(html_size), 0), COALESCE(SUM(LENGTH(html_gz)), 0), "
+            "COALESCE(SUM(LENGTH(html_br)), 0) FROM catalogs"
+        ).fetchone()
+        with self._lock:
+            hot = len(self._hot)
+        return {
+            'catalogs': count,
+            'html_bytes': html_bytes,
+            'stored_bytes': stored_bytes,
+            'brotli_bytes': brotli_bytes,
+            'brotli_available': BROTLI_AVAILABLE,
+            'hot_cached': hot,
+            'hot_hits': self.hits,
+            'hot_misses': self.misses
+        }
+
+
+def _accepts(accept_encodings, encoding):
+    try:
+        return accept_encodings[encoding] > 0
+    except KeyError:
+        return False
+
+
+def catalog_response(record, if_none_match=(), if_modified_since=None, accept_encodings=None, max_age=60):
+    """(status, body, headers) for serving a stored catalog: 304 when the client's copy is
+    current, otherwise the smallest pre-compressed variant the client accepts.
+
+    if_none_match holds unquoted entity tags, if_modified_since is a datetime, and
+    accept_encodings maps an encoding to its q-value (werkzeug's request attributes fit as-is).
+    """
+    headers = {
+        'ETag': f'"{record["etag"]}"',
+        'Last-Modified': formatdate(record['updated_at'], usegmt=True),
+        'Cache-Control': f"public, max-age={max_age}, must-revalidate",
+        'Vary': 'Accept-Encoding'
+    }
+
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110 13.2.2)
+    if if_none_match:
+        not_modified = record['etag'] in if_none_match
+    elif if_modified_since is not None:
+        not_modified = int(record['updated_at']) <= if_modified_since.timestamp()
+    else:
+        not_modified = False
+    if not_modified:
+        return 304, b'', headers
+
+    headers['Content-Type'] = 'text/html; charset=utf-8'
+    accept_encodings = accept_encodings or {}
+    if record.get('html_br') and _accepts(accept_encodings, 'br'):
+        headers['Content-Encoding'] = 'br'
+        return 200, record['html_br'], headers
+    if _accepts(accept_encodings, 'gzip'):
+        headers['Content-Encoding'] = 'gzip'
+        return 200, record['html_gz'], headers
+    return 200, record['html'].encode('utf-8'), headers
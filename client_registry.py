@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Client Registry
+Long-lived API clients (Cloud Vision, Gemini, ...) created lazily, once per process, and
+shared by every request and thread in it. gRPC channels and auth state are never carried
+across a fork: a gunicorn worker that inherits a registry from its parent starts empty.
+Google credentials are loaded once and refreshed by a background thread before they expire,
+so no request has to wait for a token fetch.
+"""
+import datetime
+import os
+import threading
+import time
+
+CLOUD_PLATFORM_SCOPE = 'https://www.googleapis.com/auth/cloud-platform'
+
+
+def load_google_credentials(scopes=(CLOUD_PLATFORM_SCOPE,)):
+    """Application Default Credentials (service account file, metadata server, gcloud) or None"""
+    try:
+        from google.auth import default
+        credentials, _ = default(scopes=list(scopes))
+        return credentials
+    except Exception as e:
+        print(f"⚠️ Google credentials not available: {e}")
+        return None
+
+
+class CredentialRefresher:
+    """Daemon thread that refreshes google-auth credentials `margin` seconds before expiry"""
+
+    def __init__(self, credentials, margin=300, min_interval=30, max_interval=1800):
+        self.credentials = credentials
+        self.margin = margin
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='credential-refresh', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self):
+        from google.auth.transport.requests import Request
+        try:
+            self.credentials.refresh(Request())
+            self.refreshes += 1
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            print(f"⚠️ Credential refresh failed: {e}")
+            return False
+
+    def seconds_until_refresh(self):
+        expiry = getattr(self.credentials, 'expiry', None)
+        if expiry is None or not getattr(self.credentials, 'token', None):
+            return 0
+        # google-auth keeps expiry as a naive UTC datetime
+        remaining = (expiry - datetime.datetime.utcnow()).total_seconds() - self.margin
+        return max(0, min(remaining, self.max_interval))
+
+    def _run(self):
+        delay = 0
+        while not self._stop.wait(delay):
+            delay = self.seconds_until_refresh()
+            if delay == 0:
+                refreshed = self.refresh()
+                if refreshed and getattr(self.credentials, 'expiry', None) is None:
+                    return  # Token never expires, nothing left to do
+                delay = max(self.min_interval, self.seconds_until_refresh() if refreshed else 0)
+
+    def stats(self):
+        expiry = getattr(self.credentials, 'expiry', None)
+        return {
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'expires_at': expiry.isoformat() + 'Z' if expiry else None
+        }
+
+
+class ClientRegistry:
+    """Named, lazily built, per-process singletons: register(name, factory) then get(name)"""
+
+    def __init__(self, credentials_loader=None, refresh_margin=300):
+        self.credentials_loader = credentials_loader
+        self.refresh_margin = refresh_margin
+        self._factories = {}
+        self._lock = threading.Lock()
+        self._reset_process()
+
+    def _reset_process(self):
+        self._pid = os.getpid()
+        # Fresh locks too: one held by a parent thread at fork time would never be released here
+        self._name_locks = {name: threading.Lock() for name in self._factories}
+        self._clients = {}
+        self._created_at = {}
+        self._created = {}
+        self._failures = {}
+        self._credentials = None
+        self._credentials_loaded = False
+        self._refresher = None
+
+    def _check_pid(self):
+        # Clients built by a parent process (gRPC channels, auth sessions) must not be reused after a fork
+        if self._pid != os.getpid():
+            self._reset_process()
+
+    def register(self, name, factory):
+        """factory() builds the client; it runs at most once per process (again after invalidate)"""
+        with self._lock:
+            self._factories[name] = factory
+            self._name_locks.setdefault(name, threading.Lock())
+
+    @property
+    def credentials(self):
+        """This process's shared Google credentials (kept fresh in the background), or None"""
+        with self._lock:
+            self._check_pid()
+            if self._credentials_loaded or self.credentials_loader is None:
+                return self._credentials
+        credentials = self.credentials_loader()
+        with self._lock:
+            self._check_pid()
+            if not self._credentials_loaded:
+                self._credentials = credentials
+                self._credentials_loaded = True
+                if credentials is not None:
+                    self._refresher = CredentialRefresher(credentials, margin=self.refresh_margin).start()
+            return self._credentials
+
+    def get(self, name):
+        with self._lock:
+            self._check_pid()
+            client = self._clients.get(name)
+            if client is not None:
+                return client
+            factory = self._factories[name]
+            name_lock = self._name_locks[name]
+
+        # Build outside the registry lock so a slow client never blocks the others
+        with name_lock:
+            with self._lock:
+                client = self._clients.get(name)
+            if client is not None:
+                return client
+            try:
+                client = factory()
+            except Exception:
+                with self._lock:
+                    self._failures[name] = self._failures.get(name, 0) + 1
+                raise
+            with self._lock:
+                self._clients[name] = client
+                self._created_at[name] = time.time()
+                self._created[name] = self._created.get(name, 0) + 1
+            print(f"🔌 Created {name} client (pid {os.getpid()})")
+            return client
+
+    def invalidate(self, name):
+        """Drop a broken client; the next get() builds a new one"""
+        with self._lock:
+            self._clients.pop(name, None)
+            self._created_at.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            self._check_pid()
+            return {
+                'pid': self._pid,
+                'clients': {
+                    name: {
+                        'created': self._created.get(name, 0),
+                        'failures': self._failures.get(name, 0),
+                        'alive': name in self._clients,
+                        'age_s': round(time.time() - self._created_at[name], 1) if name in self._created_at else None
+                    }
+                    for name in self._factories
+                },
+                'credentials': self._refresher.stats() if self._refresher else None
+            }
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Comment Fetcher
+Comments for many posts in about one Graph API round trip. Posts are looked up together with
+`?ids=a,b,c&fields=comments.limit(n){...}` (Graph's multi-ID read, up to 50 ids per request).
+If the host rejects that, it falls back to one request per post, sent concurrently by a bounded
+thread pool. Each access token has its own token bucket, so one account's enrichment can't burn
+through its Graph rate limit.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+COMMENT_FIELDS = 'id,text,timestamp,username'
+# Graph reads at most 50 ids per multi-ID request
+MAX_BATCH_IDS = 50
+
+
+# Graph error codes about the token or its permissions, not the request: invalid/expired token,
+# session, permission denied, rate limits
+AUTH_ERROR_CODES = {4, 10, 17, 32, 102, 190, 613} | set(range(200, 300))
+
+
+def graph_error(response):
+    """The `error` object of a Graph API error reply, or {}"""
+    try:
+        return response.json().get('error') or {}
+    except Exception:
+        return {}
+
+
+def multi_id_unsupported(error):
+    """Whether Graph refused the ?ids= read itself (code 100, 'Unsupported get request') rather
+    than one of the objects in it ('Object with ID ... does not exist')"""
+    message = (error.get('message') or '').lower()
+    return error.get('code') == 100 and 'unsupported get request' in message and 'object with id' not in message
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, bursts of up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1, timeout=30):
+        """Block until `cost` tokens have been taken; False (nothing taken) if that would take
+        longer than timeout. A cost above burst is paid as the bucket refills, so a 50-id batch
+        is charged 50 requests, not burst"""
+        deadline = time.monotonic() + timeout
+        paid = 0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                take = min(cost - paid, self._tokens)
+                self._tokens -= take
+                paid += take
+                if paid >= cost:
+                    return True
+                wait = (cost - paid) / self.rate
+                if now + wait > deadline:
+                    self._tokens = min(self.burst, self._tokens + paid)
+                    return False
+            time.sleep(min(wait, self.burst / self.rate))
+
+
+class CommentFetcher:
+    """fetch(media_ids, access_token) -> {media_id: [comment, ...]} with batching, fan-out and rate limits"""
+
+    def __init__(self, http_client, base_url='https://graph.instagram.com', max_workers=5,
+                 rate=5.0, burst=10, batch_size=MAX_BATCH_IDS, timeout=15):
+        self.http_client = http_client
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.rate = rate
+        self.burst = burst
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_IDS))
+        self.timeout = timeout
+        # Flipped off for this process the first time the host says it can't do multi-ID reads
+        self.batch_supported = batch_size > 1
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batched_requests = 0
+        self.throttled = 0
+
+    def _bucket(self, access_token):
+        key = hashlib.sha256(access_token.encode()).hexdigest()[:16]
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _get(self, bucket, cost, url, params):
+        if not bucket.acquire(cost, timeout=self.timeout):
+            with self._lock:
+                self.throttled += 1
+            raise TimeoutError('comment fetch rate limit wait exceeded')
+        with self._lock:
+            self.requests += 1
+        return self.http_client.get(url, params=params, timeout=self.timeout)
+
+    def _fetch_batch(self, bucket, media_ids, access_token, limit):
+        """{media_id: comments} for one multi-ID request; None if the host doesn't support it"""
+        response = self._get(bucket, len(media_ids), f"{self.base_url}/", {
+            'ids': ','.join(media_ids),
+            'fields': f"comments.limit({limit}){{{COMMENT_FIELDS}}}",
+            'access_token': access_token
+        })
+        if response.status_code != 200:
+            error = graph_error(response)
+            if multi_id_unsupported(error):
+                print(f"⚠️ Multi-ID comment lookup rejected ({response.status_code}), fetching per post")
+                self.batch_supported = False
+                return None
+            if response.status_code in (401, 403, 429) or error.get('type') == 'OAuthException' or \
+                    error.get('code') in AUTH_ERROR_CODES:
+                # This token's problem (expired, no permission, throttled): per-post reads would fail too
+                print(f"⚠️ Multi-ID comment lookup failed ({response.status_code}): {error.get('message', '')[:200]}")
+                return {media_id: [] for media_id in media_ids}
+            return None
+        with self._lock:
+            self.batched_requests += 1
+        data = response.json()
+        return {
+            media_id: ((data.get(media_id) or {}).get('comments') or {}).get('data', [])
+            for media_id in media_ids
+        }
+
+    def _fetch_one(self, bucket, media_id, access_token, limit):
+        try:
+            response = self._get(bucket, 1, f"{self.base_url}/{media_id}/comments", {
+                'fields': COMMENT_FIELDS,
+                'limit': limit,
+                'access_token': access_token
+            })
+            if response.status_code == 200:
+                return response.json().get('data', [])
+            print(f"Comments fetch failed: {response.text[:200]}")
+        except Exception as e:
+            print(f"Error fetching comments: {e}")
+        return []
+
+    def fetch(self, media_ids, access_token, limit=5):
+        """Comments for every media id (an empty list where a fetch failed), in one go"""
+        media_ids = list(dict.fromkeys(media_id for media_id in media_ids if media_id))
+        if not media_ids:
+            return {}
+        bucket = self._bucket(access_token)
+        comments = {}
+
+        if self.batch_supported:
+            batches = [media_ids[i:i + self.batch_size] for i in range(0, len(media_ids), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                futures = [executor.submit(self._fetch_batch, bucket, batch, access_token, limit) for batch in batches]
+                for future in futures:
+                    try:
+                        comments.update(future.result() or {})
+                    except Exception as e:
+                        print(f"⚠️ Multi-ID comment lookup failed: {e}")
+
+        remaining = [media_id for media_id in media_ids if media_id not in comments]
+        if remaining:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(remaining))) as executor:
+                comments.update(zip(remaining, executor.map(
+                    lambda media_id: self._fetch_one(bucket, media_id, access_token, limit), remaining
+                )))
+        return comments
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batched_requests': self.batched_requests,
+                'batch_supported': self.batch_supported,
+                'throttled': self.throttled,
+                'tokens_tracked': len(self._buckets)
+            }
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Gemini Product Suggestions
+Product ideas for a business from Gemini, cached by a hash of the normalized prompt (any
+kv_store backend, so every worker shares it, with a TTL and the store's size bound). Replies are
+requested as JSON (response_mime_type) and parsed with one json.loads; models that don't support
+JSON mode fall back to a plain prompt whose reply is decoded from the first bracket with
+raw_decode. suggest_many() asks about up to batch_size businesses in one call, for bulk
+runs, and caches each answer under the key a single suggest() for it would use.
+"""
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_PRODUCTS = 8
+
+PRODUCT_PROMPT = """
+Analyze this business and generate 6-8 relevant products:
+
+Business Name: {name}
+Instagram Handle: @{username}
+
+Based on the business name and handle, determine:
+1. What type of business this is
+2. What products they likely sell
+3. Generate specific product names with descriptions
+
+Create realistic products with:
+- Product name
+- Price range appropriate for the business type
+- Brief description (2-3 sentences)
+- Product category
+
+Format as JSON array with objects containing: name, price, description, category
+"""
+
+BATCH_PROMPT = """
+Analyze each of these businesses and generate 6-8 relevant products for each one.
+Base every answer only on that business's name and Instagram handle.
+
+Businesses (JSON):
+{businesses}
+
+For each product give: name, price (a range appropriate for the business type), description
+(2-3 sentences) and category.
+
+Format as a JSON array with one object per business, in the same order:
+{{"id": <the business id>, "products": [{{"name": ..., "price": ..., "description": ..., "category": ...}}]}}
+"""
+
+_WHITESPACE = re.compile(r'\s+')
+_decoder = json.JSONDecoder()
+
+
+def normalize_business(username, name):
+    """(handle, name) as the prompt sees them: '@Shop.Name ' and 'shop.name' ask the same question"""
+    username = (username or '').strip().lstrip('@').lower()
+    name = _WHITESPACE.sub(' ', name or '').strip() or username
+    return username, name
+
+
+def normalize_prompt(prompt):
+    return _WHITESPACE.sub(' ', prompt).strip()
+
+
+def prompt_key(prompt, model_name=''):
+    digest = hashlib.sha256(f"{model_name}\n{normalize_prompt(prompt)}".encode()).hexdigest()
+    return f"gemini:{digest[:32]}"
+
+
+def parse_json_reply(text):
+    """The JSON value in a model reply: the whole text in JSON mode, else the first array/object
+    after any prose or ``` fence. One forward scan either way; None if there's nothing to decode"""
+    text = (text or '').strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    for match in re.finditer(r'[\[{]', text):
+        try:
+            return _decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            continue
+    return None
+
+
+def clean_products(items):
+    """Gemini's product objects reduced to name/price/description/category, at most MAX_PRODUCTS"""
+    if isinstance(items, dict):
+        items = items.get('products', [])
+    if not isinstance(items, list):
+        return []
+    products = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        products.append({
+            'name': str(item.get('name') or 'Product'),
+            'price': str(item.get('price') or '$25'),
+            'description': str(item.get('description') or 'Quality product'),
+            'category': str(item.get('category') or '')
+        })
+    return products[:MAX_PRODUCTS]
+
+
+class GeminiProductSuggester:
+    """suggest(username, name) -> [product dicts] or None; suggest_many([(username, name)]) -> list of those"""
+
+    def __init__(self, model_getter, store, model_name='', ttl=7 * 24 * 3600, batch_size=10,
+                 max_workers=2, json_mode=True):
+        self.model_getter = model_getter
+        self.store = store
+        self.model_name = model_name
+        self.ttl = ttl
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max_workers
+        self.json_mode = json_mode
+        self.hits = 0
+        self.misses = 0
+        self.calls = 0
+        self.batch_calls = 0
+        self.batched_businesses = 0
+        self.parse_failures = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def _generate(self, prompt):
+        """Reply text for the prompt, in JSON mode while the model accepts it"""
+        model = self.model_getter()
+        self._count(calls=1)
+        if self.json_mode:
+            try:
+                return model.generate_content(prompt, generation_config={'response_mime_type': 'application/json'}).text
+            except Exception as e:
+                if 'mime' not in str(e).lower():
+                    raise
+                # Older models (gemini-1.0-pro) reject JSON mode; ask plainly from now on
+                print(f"⚠️ Gemini JSON mode not supported, using plain prompts: {e}")
+                self.json_mode = False
+                self._count(calls=1)
+        return model.generate_content(prompt).text
+
+    def _key(self, username, name):
+        return prompt_key(PRODUCT_PROMPT.format(name=name, username=username), self.model_name)
+
+    def suggest(self, username, name):
+        username, name = normalize_business(username, name)
+        key = self._key(username, name)
+        cached = self.store.get(key)
+        if cached is not None:
+            self._count(hits=1)
+            return cached
+        self._count(misses=1)
+
+        try:
+            products = clean_products(parse_json_reply(self._generate(PRODUCT_PROMPT.format(name=name, username=username))))
+        except Exception as e:
+            self._count(failures=1)
+            print(f"⚠️ Gemini product suggestion failed for @{username}: {e}")
+            return None
+        if not products:
+            self._count(parse_failures=1)
+            return None
+        self.store.set(key, products, ttl=self.ttl)
+        return products
+
+    def _suggest_batch(self, batch):
+        """{index: products} for [(index, username, name, key)] from one model call"""
+        listing = json.dumps([{'id': index, 'name': name, 'handle': f"@{username}"} for index, username, name, _ in batch],
+                             ensure_ascii=False, indent=1)
+        try:
+            reply = parse_json_reply(self._generate(BATCH_PROMPT.format(businesses=listing)))
+        except Exception as e:
+            self._count(failures=1)
+            print(f"⚠️ Gemini batch of {len(batch)} businesses failed: {e}")
+            return {}
+        self._count(batch_calls=1, batched_businesses=len(batch))
+        if isinstance(reply, dict):
+            reply = reply.get('businesses', [])
+
+        keys = {index: key for index, _, _, key in batch}
+        found = {}
+        for entry in reply if isinstance(reply, list) else []:
+            index = entry.get('id') if isinstance(entry, dict) else None
+            products = clean_products(entry.get('products')) if index in keys else []
+            if products:
+                found[index] = products
+                self.store.set(keys[index], products, ttl=self.ttl)
+        if len(found) < len(batch):
+            self._count(parse_failures=len(batch) - len(found))
+        return found
+
+    def suggest_many(self, businesses):
+        """Products per (username, name), in order: cached answers first, the rest batch_size
+        businesses per model call. A business the reply left out gets None"""
+        results = [None] * len(businesses)
+        pending = {}
+        for index, (username, name) in enumerate(businesses):
+            username, name = normalize_business(username, name)
+            key = self._key(username, name)
+            cached = self.store.get(key)
+            if cached is not None:
+                self._count(hits=1)
+                results[index] = cached
+            elif key in pending:
+                pending[key][1].append(index)  # Same business twice in one run: ask once
+            else:
+                self._count(misses=1)
+                pending[key] = ((index, username, name, key), [index])
+
+        work = [entry for entry, _ in pending.values()]
+        batches = [work[i:i + self.batch_size] for i in range(0, len(work), self.batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                found = {}
+                for answers in executor.map(self._suggest_batch, batches):
+                    found.update(answers)
+            for (index, _, _, _), indexes in pending.values():
+                for position in indexes:
+                    results[position] = found.get(index)
+        return results
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'model_calls': self.calls,
+            'batch_calls': self.batch_calls,
+            'batched_businesses': self.batched_businesses,
+            'parse_failures': self.parse_failures,
+            'failures': self.failures,
+            'json_mode': self.json_mode,
+            'entries': self.store.size()
+        }
@@ -0,0 +1,14 @@
+# Gunicorn settings (picked up automatically from the working directory)
+import os
+
+# Give queued catalog jobs time to finish on deploys/restarts before the worker is killed
+graceful_timeout = int(os.getenv('JOB_DRAIN_TIMEOUT', '60')) + 10
+
+
+def worker_exit(server, worker):
+    """Drain the background job pool before the worker process exits"""
+    try:
+        from app import drain_background_jobs
+        drain_background_jobs()
+    except Exception as e:
+        print(f"⚠️ Could not drain background jobs: {e}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Hedged Extraction Engine
+Races the cheap Instagram extraction methods against each other, keeps the first result
+that passes the quality check and only escalates to slow methods (Selenium) if all fail
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30)
+
+_state = threading.local()
+
+
+def extraction_cancelled():
+    """True inside a raced method once another method has already won (check between attempts)"""
+    event = getattr(_state, 'cancel_event', None)
+    return bool(event and event.is_set())
+
+
+class HedgedExtractor:
+    """Runs extraction methods concurrently on a shared pool and keeps per-method stats"""
+
+    def __init__(self, name='extraction', max_workers=8, deadline=45):
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _method_stats(self, method):
+        stats = self._stats.get(method)
+        if stats is None:
+            stats = self._stats[method] = {
+                'attempts': 0,
+                'wins': 0,
+                'passed': 0,
+                'errors': 0,
+                'cancelled': 0,
+                'total_time': 0.0,
+                'histogram': [0] * (len(LATENCY_BUCKETS) + 1)
+            }
+        return stats
+
+    def _record(self, method, elapsed, passed=False, error=False):
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if elapsed <= bound), len(LATENCY_BUCKETS))
+        with self._lock:
+            stats = self._method_stats(method)
+            stats['attempts'] += 1
+            stats['passed'] += int(passed)
+            stats['errors'] += int(error)
+            stats['total_time'] += elapsed
+            stats['histogram'][bucket] += 1
+
+    def _record_win(self, method):
+        with self._lock:
+            self._method_stats(method)['wins'] += 1
+
+    def _record_cancelled(self, method):
+        with self._lock:
+            self._method_stats(method)['cancelled'] += 1
+
+    def _attempt(self, method, func, username, is_acceptable, normalize, cancel_event=None):
+        _state.cancel_event = cancel_event
+        start = time.perf_counter()
+        try:
+            result = func(username)
+            if normalize:
+                result = normalize(result, method)
+        except Exception as e:
+            print(f"⚠️ {method} raised: {e}")
+            self._record(method, time.perf_counter() - start, error=True)
+            return None
+        finally:
+            _state.cancel_event = None
+
+        passed = bool(is_acceptable(result))
+        self._record(method, time.perf_counter() - start, passed=passed)
+        return result
+
+    def run(self, username, methods, is_acceptable, escalation=(), normalize=None):
+        """
+        Race `methods` [(name, func)], return (result, winning_method, completed_results).
+        Falls through `escalation` methods one at a time if no raced result is acceptable;
+        result is None if nothing passed.
+        """
+        cancel_event = threading.Event()
+        futures = {
+            self._executor.submit(self._attempt, name, func, username, is_acceptable, normalize, cancel_event): name
+            for name, func in methods
+        }
+        completed = {}
+
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                name = futures[future]
+                result = future.result()
+                completed[name] = result
+                if result is not None and is_acceptable(result):
+                    self._record_win(name)
+                    print(f"🏁 {name} won the extraction race for @{username}")
+                    return result, name, completed
+        except FuturesTimeout:
+            print(f"⏱️ Extraction race for @{username} hit the {self.deadline}s deadline")
+        finally:
+            # Losers: drop the ones that haven't started, tell running ones to stop early
+            cancel_event.set()
+            for future, name in futures.items():
+                if future.cancel():
+                    self._record_cancelled(name)
+
+        for name, func in escalation:
+            print(f"⬆️ All raced methods failed for @{username}, escalating to {name}")
+            result = self._attempt(name, func, username, is_acceptable, normalize)
+            completed[name] = result
+            if result is not None and is_acceptable(result):
+                self._record_win(name)
+                return result, name, completed
+
+        return None, None, completed
+
+    def stats(self):
+        """Per-method attempts, win rate, average latency and latency histogram (seconds)"""
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        with self._lock:
+            report = {}
+            for method, stats in self._stats.items():
+                attempts = stats['attempts']
+                report[method] = {
+                    'attempts': attempts,
+                    'wins': stats['wins'],
+                    'win_rate': round(stats['wins'] / attempts, 3) if attempts else 0,
+                    'pass_rate': round(stats['passed'] / attempts, 3) if attempts else 0,
+                    'errors': stats['errors'],
+                    'cancelled': stats['cancelled'],
+                    'avg_latency_s': round(stats['total_time'] / attempts, 2) if attempts else 0,
+                    'latency_histogram': dict(zip(labels, stats['histogram']))
+                }
+            return report
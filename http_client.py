@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Client
+One keep-alive requests.Session for every outbound call, with per-host connection pools,
+default timeouts, retry/backoff policies and per-host metrics
+"""
+import http.cookiejar
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class PooledHTTPClient:
+    """Shared session with a tuned HTTPAdapter mounted per host"""
+
+    def __init__(self, default_timeout=15, pool_size=10, retries=2, backoff_factor=0.5, host_policies=None):
+        self.default_timeout = default_timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # {'graph.facebook.com': {'pool_size': 20, 'retries': 1, 'timeout': 10}}
+        self.host_policies = host_policies or {}
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._session = None
+        self._pid = None
+
+    def _make_adapter(self, pool_size, retries):
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            raise_on_status=False,
+            respect_retry_after_header=True
+        )
+        return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    def _build_session(self):
+        session = requests.Session()
+        # Shared across users and hosts, so never persist cookies between calls
+        session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        default_adapter = self._make_adapter(self.pool_size, self.retries)
+        session.mount('https://', default_adapter)
+        session.mount('http://', default_adapter)
+
+        for host, policy in self.host_policies.items():
+            adapter = self._make_adapter(policy.get('pool_size', self.pool_size), policy.get('retries', self.retries))
+            session.mount(f"https://{host}/", adapter)
+            session.mount(f"http://{host}/", adapter)
+        return session
+
+    @property
+    def session(self):
+        # Sockets must not be shared with a forked child, so each process builds its own session
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = self._build_session()
+                    self._pid = os.getpid()
+                    self._metrics = {}
+        return self._session
+
+    def _host_metrics(self, host):
+        metrics = self._metrics.get(host)
+        if metrics is None:
+            metrics = self._metrics[host] = {
+                'requests': 0,
+                'errors': 0,
+                'statuses': {},
+                'new_connections': 0,
+                'total_time_ms': 0.0,
+                'max_time_ms': 0.0
+            }
+        return metrics
+
+    def _connections_opened(self, session, url):
+        try:
+            adapter = session.get_adapter(url)
+            pool = adapter.poolmanager.connection_from_url(url)
+            return pool.num_connections
+        except Exception:
+            return 0
+
+    def request(self, method, url, **kwargs):
+        host = urlsplit(url).hostname or ''
+        policy = self.host_policies.get(host, {})
+        kwargs.setdefault('timeout', policy.get('timeout', self.default_timeout))
+
+        session = self.session
+        opened_before = self._connections_opened(session, url)
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                metrics = self._host_metrics(host)
+                metrics['requests'] += 1
+                metrics['errors'] += 1
+            raise
+
+        elapsed = (time.perf_counter() - start) * 1000
+        opened = self._connections_opened(session, url) - opened_before
+        with self._lock:
+            metrics = self._host_metrics(host)
+            metrics['requests'] += 1
+            metrics['new_connections'] += max(0, opened)
+            metrics['total_time_ms'] += elapsed
+            metrics['max_time_ms'] = max(metrics['max_time_ms'], elapsed)
+            status = str(response.status_code)
+            metrics['statuses'][status] = metrics['statuses'].get(status, 0) + 1
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def metrics(self):
+        """Per-host counters: requests, errors, status codes, connections opened, latency"""
+        with self._lock:
+            report = {}
+            for host, metrics in self._metrics.items():
+                entry = dict(metrics, statuses=dict(metrics['statuses']))
+                entry['avg_time_ms'] = round(metrics['total_time_ms'] / metrics['requests'], 1) if metrics['requests'] else 0
+                entry['total_time_ms'] = round(metrics['total_time_ms'], 1)
+                entry['max_time_ms'] = round(metrics['max_time_ms'], 1)
+                report[host] = entry
+            return report
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Image Pipeline
+Downloads each image once and fans the bytes out to every stage that needs them (colour
+extraction, thumbnailing, CDN upload...). Downloads and each stage get their own bounded thread
+pool, so a slow upload never holds up a download or another stage, and an image's stages start
+the moment its download finishes instead of after the whole batch. Results come back in the
+order the jobs were given.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class PipelineRun:
+    """One submitted batch; results() blocks until every stage of every job is done"""
+
+    def __init__(self, jobs, downloads, executors):
+        self.jobs = jobs
+        self._downloads = downloads
+        self._executors = executors
+        self._results = None
+
+    def results(self):
+        """[{stage: value}] per job, in job order. A missing URL, failed download or failed
+        stage gives None for that stage; nothing raises"""
+        if self._results is None:
+            stage_futures = {url: future.result() for url, future in self._downloads.items()}
+            values = {
+                url: {name: future.result() for name, future in futures.items()}
+                for url, futures in stage_futures.items()
+            }
+            for executor in self._executors:
+                executor.shutdown(wait=False)
+            self._results = [
+                {name: values.get(url, {}).get(name) for name in names}
+                for url, names in self.jobs
+            ]
+        return self._results
+
+
+class ImagePipeline:
+    """stage(name, func, workers) registers func(url, content, **options) -> value; submit/run
+    take [(url, stage_names)] jobs plus options passed through to every stage"""
+
+    def __init__(self, http_client, download_workers=6, timeout=10):
+        self.http_client = http_client
+        self.download_workers = download_workers
+        self.timeout = timeout
+        self.stages = {}
+        self.downloads = 0
+        self.downloaded_bytes = 0
+        self.stage_runs = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stage(self, name, func, workers=2):
+        self.stages[name] = (func, workers)
+        return self
+
+    def _download(self, url):
+        try:
+            response = self.http_client.get(url, timeout=self.timeout)
+            if response.status_code == 200 and response.content:
+                self._count(downloads=1, downloaded_bytes=len(response.content))
+                return response.content
+            print(f"⚠️ Image download returned {response.status_code}: {url[:80]}")
+        except Exception as e:
+            print(f"⚠️ Image download failed: {e}")
+        self._count(downloads=1, failures=1)
+        return None
+
+    def _run_stage(self, name, url, content, options):
+        try:
+            self._count(stage_runs=1)
+            return self.stages[name][0](url, content, **options)
+        except Exception as e:
+            self._count(failures=1)
+            print(f"⚠️ Image stage '{name}' failed for {url[:80]}: {e}")
+            return None
+
+    def submit(self, jobs, **options):
+        """Start the jobs in the background and return a PipelineRun"""
+        # Every job keeps its place in the results; one without a URL just gets None per stage
+        jobs = [(url, tuple(names)) for url, names in jobs]
+        wanted = {}
+        for url, names in jobs:
+            for name in names:
+                if name not in self.stages:
+                    raise KeyError(f"unknown image stage '{name}'")
+                if url:
+                    wanted.setdefault(url, {})[name] = None
+        if not wanted:
+            return PipelineRun(jobs, {}, [])
+
+        executors = {
+            name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"image-{name}")
+            for name, (_, workers) in self.stages.items()
+            if any(name in names for names in wanted.values())
+        }
+        download_pool = ThreadPoolExecutor(
+            max_workers=min(self.download_workers, len(wanted)), thread_name_prefix='image-download'
+        )
+
+        def fan_out(url):
+            # Runs on a download thread; hands the bytes to each stage's pool and returns the futures
+            content = self._download(url)
+            return {
+                name: executors[name].submit(self._run_stage, name, url, content, options) if content else _done(None)
+                for name in wanted[url]
+            }
+
+        downloads = {url: download_pool.submit(fan_out, url) for url in wanted}
+        return PipelineRun(jobs, downloads, [download_pool, *executors.values()])
+
+    def run(self, jobs, **options):
+        return self.submit(jobs, **options).results()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'stages': {name: workers for name, (_, workers) in self.stages.items()},
+                'downloads': self.downloads,
+                'downloaded_bytes': self.downloaded_bytes,
+                'stage_runs': self.stage_runs,
+                'failures': self.failures
+            }
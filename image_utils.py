@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Image Utilities
+Small, dependency-light helpers shared by the image analysis code (PIL only, loaded on first use)
+"""
+import io
+
+from lazy_imports import lazy_import
+
+Image = lazy_import('PIL.Image')
+
+MIN_SET_BITS = 8
+
+
+def _dhash(image):
+    # Let JPEG decode at reduced size first; far cheaper than a full-resolution decode
+    image.draft('L', (64, 64))
+    pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            value = (value << 1) | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return value
+
+
+def perceptual_hash(content):
+    """64-bit difference hash (dHash) of image bytes, or None if they don't decode.
+
+    Survives re-encoding, resizing and mild compression, so the same Instagram photo served
+    by a different CDN node (or at a different quality) hashes to the same or a nearby value.
+    """
+    return image_signature(content)[0]
+
+
+def image_signature(content):
+    """(dHash, aspect ratio rounded to 2 places), or (None, None) if the bytes don't decode"""
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            width, height = image.size
+            return _dhash(image), round(width / height, 2) if height else None
+    except Exception:
+        return None, None
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def is_distinctive(phash):
+    """Flat images (solid backgrounds, plain graphics) hash to nearly all 0s or 1s and would
+    all match each other; only hashes with enough of both bits are worth comparing"""
+    return phash is not None and MIN_SET_BITS <= bin(phash).count('1') <= 64 - MIN_SET_BITS
+
+
+def near_duplicates(signatures, max_distance=4, max_aspect_delta=0.02):
+    """For each (dHash, aspect) signature, the index of the first earlier one it nearly
+    matches (within max_distance bits, same shape), or None if it is the first of its kind"""
+    duplicate_of = []
+    for index, (phash, aspect) in enumerate(signatures):
+        match = None
+        if is_distinctive(phash) and aspect is not None:
+            for earlier in range(index):
+                other_hash, other_aspect = signatures[earlier]
+                if duplicate_of[earlier] is None and is_distinctive(other_hash) and other_aspect is not None and \
+                        abs(aspect - other_aspect) <= max_aspect_delta and hamming_distance(phash, other_hash) <= max_distance:
+                    match = earlier
+                    break
+        duplicate_of.append(match)
+    return duplicate_of
+
+
+def downscale_jpeg(content, max_side, quality=85, slack=1.2):
+    """Image bytes that fit max_side x max_side, as a resized JPEG. A JPEG that is at most
+    `slack` times too big comes back as-is: re-encoding it would cost more than it saves"""
+    with Image.open(io.BytesIO(content)) as image:
+        if max(image.size) <= max_side * slack and image.format == 'JPEG':
+            return content
+        image.draft('RGB', (max_side, max_side))
+        image = image.convert('RGB')
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        return buffer.getvalue()
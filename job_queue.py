@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Bounded Job Queue
+Runs background catalog jobs on a fixed-size worker pool instead of a thread per message
+"""
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class JobQueue:
+    """Fixed pool of worker threads fed from a depth-limited FIFO queue"""
+
+    def __init__(self, name, num_workers=2, max_depth=20):
+        self.name = name
+        self.num_workers = max(1, num_workers)
+        self.max_depth = max(0, max_depth)
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._workers = []
+        self._waiting = 0
+        self._active = 0
+        self._accepting = True
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        # Workers start on first use so gunicorn workers each get their own pool
+        if self._workers:
+            return
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._run, name=f"{self.name}-{i + 1}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a job. Returns its place in line (0 = starts now) or None if the queue is full"""
+        with self._lock:
+            if not self._accepting or self._waiting >= self.max_depth:
+                self.rejected += 1
+                return None
+
+            ahead = self._active + self._waiting
+            position = max(0, ahead - self.num_workers + 1)
+
+            self._waiting += 1
+            self._ensure_workers()
+            self._jobs.put((func, args, kwargs, time.time()))
+
+        return position
+
+    def _run(self):
+        while True:
+            item = self._jobs.get()
+            if item is _STOP:
+                self._jobs.task_done()
+                return
+
+            func, args, kwargs, queued_at = item
+            with self._lock:
+                self._waiting -= 1
+                self._active += 1
+
+            try:
+                wait_time = time.time() - queued_at
+                if wait_time > 1:
+                    print(f"⏳ [{self.name}] {func.__name__} waited {wait_time:.1f}s in queue")
+                func(*args, **kwargs)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ [{self.name}] Job {func.__name__} failed: {e}")
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._idle.notify_all()
+                self._jobs.task_done()
+
+    def depth(self):
+        """Number of jobs waiting for a free worker"""
+        with self._lock:
+            return self._waiting
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.num_workers,
+                'max_depth': self.max_depth,
+                'waiting': self._waiting,
+                'active': self._active,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'accepting': self._accepting
+            }
+
+    def shutdown(self, drain=True, timeout=None):
+        """Stop accepting jobs; optionally let queued and running jobs finish first"""
+        with self._lock:
+            self._accepting = False
+            workers = list(self._workers)
+
+        if not drain:
+            # Throw away anything that has not started yet
+            while True:
+                try:
+                    item = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    with self._lock:
+                        self._waiting -= 1
+                self._jobs.task_done()
+
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while self._waiting or self._active:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    print(f"⚠️ [{self.name}] Drain timed out with {self._waiting} queued, {self._active} running")
+                    return False
+                self._idle.wait(remaining)
+
+        for _ in workers:
+            self._jobs.put(_STOP)
+        for worker in workers:
+            worker.join(timeout=1)
+
+        print(f"✅ [{self.name}] Drained ({self.completed} completed, {self.failed} failed)")
+        return True
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Job Status Store
+Catalog job state per Instagram username ("queued", "scraping", "analyzing", ... "completed"),
+kept in a kv_store backend so every gunicorn worker sees the same status.
+Starting a job is an atomic claim, and in-flight states expire on their own if a worker dies
+before finishing, so a username can never stay stuck at "Already working on it".
+Each claim gets its own job id, stored next to the state. A job moves on with compare-and-set
+transitions on (state, job id), so once its claim is reset, expires or is taken by a newer job,
+its late writes fail and it stops instead of overwriting the newer job's state.
+"""
+import uuid
+
+from profile_cache import normalize_username
+
+FINISHED_STATES = ('completed', 'failed')
+
+DEFAULT_STATE_TTLS = {
+    'completed': 24 * 3600,
+    'failed': 10  # Long enough for the error reply, then the user can simply resend
+}
+
+
+def _status(value):
+    # Values written before job ids were stored are plain status strings
+    return value.get('status') if isinstance(value, dict) else value
+
+
+class Job:
+    """A claimed job: advance(status) moves it on only while it still owns its username. False
+    means another job (or a reset) took over and this one must stop without writing anything"""
+
+    def __init__(self, statuses, username, job_id, status):
+        self.statuses = statuses
+        self.username = username
+        self.id = job_id
+        self.status = status
+
+    def advance(self, status):
+        if self.statuses.transition(self.username, self.id, self.status, status):
+            self.status = status
+            return True
+        print(f"⚠️ Job {self.id} for @{self.username} lost its claim at '{self.status}', not moving to '{status}'")
+        return False
+
+    def release(self):
+        """Drop a claim that never turned into a job (e.g. the queue was full)"""
+        self.statuses.release(self)
+
+
+class JobStatusStore:
+    """Atomic, expiring job states on top of any kv_store backend (needs add + compare_and_set)"""
+
+    def __init__(self, store, stale_ttl=15 * 60, state_ttls=None):
+        self.store = store
+        # Any in-flight state not refreshed within stale_ttl is treated as abandoned
+        self.stale_ttl = stale_ttl
+        self.state_ttls = dict(DEFAULT_STATE_TTLS, **(state_ttls or {}))
+        self.claims = 0
+        self.rejected_claims = 0
+
+    def _key(self, username):
+        return f"job:{normalize_username(username)}"
+
+    def _ttl(self, status):
+        return self.state_ttls.get(status, self.stale_ttl)
+
+    @staticmethod
+    def _value(status, job_id):
+        # Always built in this key order: the SQLite backend compares the JSON text
+        return {'status': status, 'job': job_id}
+
+    def get(self, username, default=None):
+        value = self.store.get(self._key(username))
+        return default if value is None else _status(value)
+
+    def transition(self, username, job_id, expected, status):
+        """Move job_id's state from expected to status (refreshing its expiry); False if the state
+        changed under it or belongs to another job"""
+        return self.store.compare_and_set(
+            self._key(username), self._value(expected, job_id), self._value(status, job_id), ttl=self._ttl(status)
+        )
+
+    def claim(self, username, status='queued'):
+        """Start a job unless one is already in flight: a Job for exactly one caller across
+        workers, None for everyone else"""
+        key = self._key(username)
+        ttl = self._ttl(status)
+        job_id = uuid.uuid4().hex[:12]
+        value = self._value(status, job_id)
+        claimed = self.store.add(key, value, ttl=ttl)
+        if not claimed:
+            current = self.store.get(key)
+            claimed = _status(current) in FINISHED_STATES and self.store.compare_and_set(key, current, value, ttl=ttl)
+
+        if not claimed:
+            self.rejected_claims += 1
+            return None
+        self.claims += 1
+        return Job(self, username, job_id, status)
+
+    def release(self, job):
+        """Drop job's claim if it still holds it"""
+        key = self._key(job.username)
+        if self.store.get(key) == self._value(job.status, job.id):
+            self.store.delete(key)
+
+    def reset(self, username):
+        """Forget a username's state; returns the old status (or None). A job still running for
+        it loses its claim and stops at its next transition"""
+        key = self._key(username)
+        old_value = self.store.get(key)
+        if old_value is not None:
+            self.store.delete(key)
+        return _status(old_value)
+
+    def stats(self):
+        return {'claims': self.claims, 'rejected_claims': self.rejected_claims, 'tracked': self.store.size()}
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Key-Value Stores
+Small bounded stores with per-key TTL, shared by the dedup index, caches and job status.
+MemoryStore lives in one process; SQLiteStore survives restarts and is shared by every
+gunicorn worker on the box; RedisStore is shared by every box pointing at the same server.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryStore:
+    """In-process LRU store with per-key expiry"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def _evict(self):
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._live(key, time.time())
+            if item is None:
+                return default
+            self._data.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent (or expired). Returns True if it was stored"""
+        now = time.time()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._evict()
+            return True
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        """Replace value only if the live value equals expected. Returns True if it was replaced"""
+        now = time.time()
+        with self._lock:
+            item = self._live(key, now)
+            if item is None or item[0] != expected:
+                return False
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._data.move_to_end(key)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def size(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteStore:
+    """Store backed by a SQLite table in WAL mode, safe across threads and processes"""
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path, table='kv', max_entries=100000):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, touched REAL)"
+        )
+
+    def _conn(self):
+        # One connection per thread (and per process - connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _after_write(self, conn):
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune(conn)
+
+    def prune(self, conn=None):
+        """Drop expired rows, then the least recently written ones beyond max_entries"""
+        conn = conn or self._conn()
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        overflow = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY touched LIMIT ?)", (overflow,)
+            )
+
+    def get(self, key, default=None):
+        row = self._conn().execute(
+            f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, touched) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl if ttl else None, now)
+        )
+        self._after_write(conn)
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent (or expired). Atomic across processes"""
+        now = time.time()
+        conn = self._conn()
+        cursor = conn.execute(
+            f"INSERT INTO {self.table} (key, value, expires_at, touched) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+            f"touched = excluded.touched WHERE {self.table}.expires_at IS NOT NULL AND {self.table}.expires_at <= ?",
+            (key, json.dumps(value), now + ttl if ttl else None, now, now)
+        )
+        self._after_write(conn)
+        return cursor.rowcount == 1
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        """Replace value only if the live value equals expected. Atomic across processes"""
+        now = time.time()
+        cursor = self._conn().execute(
+            f"UPDATE {self.table} SET value = ?, expires_at = ?, touched = ? "
+            f"WHERE key = ? AND value = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (json.dumps(value), now + ttl if ttl else None, now, key, json.dumps(expected), now)
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        cursor = self._conn().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        return cursor.rowcount == 1
+
+    def size(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class RedisStore:
+    """Store on any Redis-protocol server; expiry and eviction are left to the server"""
+
+    def __init__(self, url, prefix='kv'):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("Redis backend needs the redis package (install with: pip install redis)")
+
+        self.prefix = f"{prefix}:"
+        self._watch_error = redis.WatchError
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def get(self, key, default=None):
+        raw = self._client.get(self.prefix + key)
+        return default if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent (SET NX). Atomic across every client"""
+        return bool(self._client.set(self.prefix + key, json.dumps(value), nx=True, px=int(ttl * 1000) if ttl else None))
+
+    def compare_and_set(self, key, expected, value, ttl=None):
+        """Replace value only if it still equals expected (WATCH/MULTI/EXEC). Atomic across every client"""
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(self.prefix + key)
+                raw = pipe.get(self.prefix + key)
+                if raw is None or json.loads(raw) != expected:
+                    pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+                pipe.execute()
+                return True
+            except self._watch_error:
+                return False
+
+    def delete(self, key):
+        return self._client.delete(self.prefix + key) == 1
+
+    def size(self):
+        return sum(1 for _ in self._client.scan_iter(match=self.prefix + '*', count=500))
+
+
+def create_store(backend, name, max_entries=10000, data_dir=None, redis_url=None):
+    """Build a store from a backend name: 'memory' (default), 'sqlite' or 'redis'"""
+    backend = (backend or 'memory').strip().lower()
+    if backend == 'redis':
+        return RedisStore(redis_url or 'redis://localhost:6379/0', prefix=name)
+    if backend == 'sqlite':
+        data_dir = data_dir or os.path.join(tempfile.gettempdir(), 'whatsapp-instagram-bot')
+        return SQLiteStore(os.path.join(data_dir, f"{name}.db"), table=name, max_entries=max_entries)
+    if backend != 'memory':
+        print(f"⚠️ Unknown store backend '{backend}' for {name}, using memory")
+    return MemoryStore(max_entries=max_entries)
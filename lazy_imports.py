@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports
+Heavy SDKs (Vertex AI, Cloud Vision, Selenium, Cloudinary, PIL, ...) are bound at module level
+as proxies that import the real module on first attribute access or call, so importing app.py
+stays fast and a cold-started worker can answer its first webhook before any SDK is loaded.
+Slow startup probes run in background threads instead of on the import path.
+"""
+import importlib
+import threading
+import time
+
+_lock = threading.RLock()
+# module name -> seconds its first import took (only for modules loaded through a proxy)
+IMPORT_TIMES = {}
+
+
+def _import(name):
+    with _lock:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES.setdefault(name, round(time.perf_counter() - start, 4))
+        return module
+
+
+class LazyModule:
+    """Stands in for a module until something uses it; on_load(module) runs once right after import"""
+
+    def __init__(self, name, on_load=None):
+        self.__dict__['_name'] = name
+        self.__dict__['_on_load'] = on_load
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = _import(self._name)
+                    on_load = self.__dict__['_on_load']
+                    if on_load is not None:
+                        on_load(module)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        module = self._load()
+        try:
+            return getattr(module, attr)
+        except AttributeError:
+            # Submodules (cloudinary.uploader) only exist as attributes once imported
+            return _import(f"{self._name}.{attr}")
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+class LazyAttribute:
+    """A class or function from a lazily imported module (GenerativeModel, By, WebDriverWait, ...)"""
+
+    def __init__(self, module_name, attr):
+        self.__dict__['_module'] = LazyModule(module_name)
+        self.__dict__['_attr'] = attr
+
+    def _resolve(self):
+        return getattr(self._module, self._attr)
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<lazy {self._module._name}.{self._attr}>"
+
+
+def lazy_import(name, on_load=None):
+    """`vision = lazy_import('google.cloud.vision')` instead of `from google.cloud import vision`"""
+    return LazyModule(name, on_load=on_load)
+
+
+def lazy_from(module_name, attr):
+    """`By = lazy_from('selenium.webdriver.common.by', 'By')` instead of a from-import"""
+    return LazyAttribute(module_name, attr)
+
+
+class BackgroundCheck:
+    """Runs func() once in a daemon thread at construction; result() waits for it"""
+
+    def __init__(self, func, name='background-check'):
+        self.func = func
+        self.started_at = time.time()
+        self.duration = None
+        self._value = None
+        self._done = threading.Event()
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def _run(self):
+        try:
+            self._value = self.func()
+        except Exception as e:
+            print(f"⚠️ {self.func.__name__} failed: {e}")
+        finally:
+            self.duration = round(time.time() - self.started_at, 3)
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """func's return value (None if it raised); None too if still running after timeout"""
+        self._done.wait(timeout)
+        return self._value
+
+
+def import_stats():
+    with _lock:
+        return dict(sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]))
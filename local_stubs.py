@@ -0,0 +1,821 @@
+#!/usr/bin/env python3
+"""
+Local Stub Servers
+Stand-ins for external APIs so benchmarks can run offline against localhost
+"""
+import base64
+import datetime
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import socketserver
+import ssl
+import tempfile
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubGraphServer:
+    """Fake graph.facebook.com that accepts WhatsApp message sends after a fixed delay"""
+
+    def __init__(self, delay=0.25, port=0):
+        self.delay = delay
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+                time.sleep(stub.delay)
+                stub.requests.append((self.path, body))
+
+                reply = json.dumps({
+                    'messaging_product': 'whatsapp',
+                    'messages': [{'id': f"wamid.stub{len(stub.requests)}"}]
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def make_self_signed_cert(directory, hostname='localhost'):
+    """Write a throwaway self-signed cert/key pair for 127.0.0.1 and return (cert_path, key_path)"""
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, hostname)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName(hostname),
+            x509.IPAddress(ipaddress.ip_address('127.0.0.1'))
+        ]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+    cert_path = os.path.join(directory, 'stub-cert.pem')
+    key_path = os.path.join(directory, 'stub-key.pem')
+    with open(cert_path, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, 'wb') as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+class StubTLSServer:
+    """HTTPS server answering every GET with a small JSON body; counts TLS handshakes"""
+
+    def __init__(self, body=b'{"data": []}', port=0):
+        self.handshakes = 0
+        self.requests = 0
+        self._tempdir = tempfile.TemporaryDirectory()
+        self.cert_path, key_path = make_self_signed_cert(self._tempdir.name)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                stub.handshakes += 1
+                super().setup()
+
+            def do_GET(self):
+                stub.requests += 1
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert_path, key_path)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self.port = self._server.server_address[1]
+        self.url = f"https://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._tempdir.cleanup()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubRedisServer:
+    """Minimal in-memory Redis stand-in speaking RESP
+    (PING, GET, SET [EX|PX] [NX|XX], DEL, EXISTS, SCAN, WATCH/UNWATCH, MULTI/EXEC/DISCARD)"""
+
+    def __init__(self, port=0):
+        self.data = {}
+        self.versions = {}
+        self.commands = 0
+        self._lock = threading.RLock()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            disable_nagle_algorithm = True
+
+            def read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b'*'):
+                    return line.strip().split()
+                args = []
+                for _ in range(int(line[1:])):
+                    length = int(self.rfile.readline()[1:])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+            def handle(self):
+                session = {'watched': {}, 'queued': None}
+                while True:
+                    args = self.read_command()
+                    if args is None:
+                        return
+                    self.wfile.write(stub.dispatch(args, session))
+
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"redis://127.0.0.1:{self.port}/0"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @staticmethod
+    def _bulk(value):
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def _live(self, key):
+        item = self.data.get(key)
+        if item and item[1] is not None and item[1] <= time.time():
+            del self.data[key]
+            self._touch(key)
+            return None
+        return item
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def dispatch(self, args, session):
+        """Per-connection transaction handling on top of execute()"""
+        command = args[0].upper()
+        with self._lock:
+            if command == b'WATCH':
+                for key in args[1:]:
+                    self._live(key)
+                    session['watched'][key] = self.versions.get(key, 0)
+                return b'+OK\r\n'
+            if command == b'UNWATCH':
+                session['watched'] = {}
+                return b'+OK\r\n'
+            if command == b'MULTI':
+                session['queued'] = []
+                return b'+OK\r\n'
+            if command == b'DISCARD':
+                session['queued'] = None
+                session['watched'] = {}
+                return b'+OK\r\n'
+            if command == b'EXEC':
+                queued, session['queued'] = session['queued'] or [], None
+                watched, session['watched'] = session['watched'], {}
+                for key, version in watched.items():
+                    self._live(key)
+                    if self.versions.get(key, 0) != version:
+                        return b'*-1\r\n'
+                return b'*%d\r\n' % len(queued) + b''.join(self.execute(queued_args) for queued_args in queued)
+            if session['queued'] is not None:
+                session['queued'].append(args)
+                return b'+QUEUED\r\n'
+            return self.execute(args)
+
+    def execute(self, args):
+        command = args[0].upper()
+        with self._lock:  # re-entrant: dispatch() may already hold it
+            self.commands += 1
+            if command == b'PING':
+                return b'+PONG\r\n'
+            if command == b'GET':
+                item = self._live(args[1])
+                return self._bulk(item[0] if item else None)
+            if command == b'SET':
+                key, value, expires_at, options = args[1], args[2], None, [a.upper() for a in args[3:]]
+                for i, option in enumerate(options):
+                    if option == b'EX':
+                        expires_at = time.time() + int(args[4 + i])
+                    elif option == b'PX':
+                        expires_at = time.time() + int(args[4 + i]) / 1000
+                exists = self._live(key) is not None
+                if (b'NX' in options and exists) or (b'XX' in options and not exists):
+                    return self._bulk(None)
+                self.data[key] = (value, expires_at)
+                self._touch(key)
+                return b'+OK\r\n'
+            if command in (b'DEL', b'EXISTS'):
+                found = [key for key in args[1:] if self._live(key) is not None]
+                if command == b'DEL':
+                    for key in found:
+                        del self.data[key]
+                        self._touch(key)
+                return b':%d\r\n' % len(found)
+            if command == b'SCAN':
+                pattern = b'*'
+                for i, option in enumerate(args):
+                    if option.upper() == b'MATCH':
+                        pattern = args[i + 1]
+                keys = [k for k in list(self.data) if self._live(k) and fnmatch.fnmatchcase(k.decode(), pattern.decode())]
+                reply = b'*2\r\n' + self._bulk(b'0') + b'*%d\r\n' % len(keys)
+                return reply + b''.join(self._bulk(k) for k in keys)
+            return b'-ERR unknown command\r\n'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubImageServer:
+    """Serves generated JPEGs at /images/<n>.jpg after a fixed delay, like a slow CDN.
+    /images/<n>~<k>.jpg is a near-duplicate of <n>.jpg: the same picture, re-encoded at a lower quality"""
+
+    def __init__(self, delay=0.1, size=(640, 640), port=0):
+        self.delay = delay
+        self.size = size
+        self.requests = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                time.sleep(stub.delay)
+                stub.requests += 1
+                name = self.path.rsplit('/', 1)[-1]
+                if not (self.path.startswith('/images/') and name.endswith('.jpg')):
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = stub.image(name)
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def image(self, name):
+        """Deterministic JPEG bytes for a name: gradient, shapes and colours seeded from its hash"""
+        with self._lock:
+            if name not in self._cache:
+                from PIL import Image, ImageDraw
+
+                stem, _, extension = name.rpartition('.')
+                base, _, variant = stem.partition('~')
+                seed = hashlib.md5(f"{base}.{extension}".encode()).digest()
+                width, height = self.size
+                gradient = Image.linear_gradient('L').resize(self.size).rotate(seed[0] % 360)
+                image = Image.merge('RGB', [gradient.point(lambda v, s=s: (v + s) % 256) for s in seed[:3]])
+                draw = ImageDraw.Draw(image)
+                for i in range(4):
+                    x, y = seed[4 + i] * width // 256, seed[8 + i] * height // 256
+                    radius = 40 + seed[12 + i] % 120
+                    draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=tuple(seed[i:i + 3]))
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=85 - 10 * int(variant or 0))
+                self._cache[name] = buffer.getvalue()
+            return self._cache[name]
+
+    def image_url(self, index):
+        return f"{self.url}/images/{index}.jpg"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubVisionServer:
+    """Fake Cloud Vision REST API (POST /v1/images:annotate) returning canned product annotations.
+    Each call costs delay seconds plus per_image_delay per image, roughly like the real service.
+    Counts requests, images, features and request bytes"""
+
+    def __init__(self, delay=0.3, per_image_delay=0.02, port=0):
+        self.delay = delay
+        self.per_image_delay = per_image_delay
+        self.requests = 0
+        self.images = 0
+        self.features = 0
+        self.bytes_received = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                image_requests = payload.get('requests', [])
+                time.sleep(stub.delay + stub.per_image_delay * len(image_requests))
+                stub.requests += 1
+                stub.bytes_received += length
+                stub.images += len(image_requests)
+
+                responses = []
+                for image_request in image_requests:
+                    content = base64.b64decode(image_request.get('image', {}).get('content', ''))
+                    features = [
+                        stub.FEATURE_NAMES.get(feature.get('type'), feature.get('type'))
+                        for feature in image_request.get('features', [])
+                    ]
+                    stub.features += len(features)
+                    responses.append(stub.annotate(content, features))
+
+                reply = json.dumps({'responses': responses}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    # Feature.Type values; the official REST transport sends enums as integers
+    FEATURE_NAMES = {4: 'LABEL_DETECTION', 5: 'TEXT_DETECTION', 19: 'OBJECT_LOCALIZATION'}
+
+    @staticmethod
+    def annotate(content, features):
+        if not content:
+            return {'error': {'code': 3, 'message': 'Bad image data.'}}
+
+        digest = hashlib.md5(content).digest()
+        objects = ('Vase', 'Bowl', 'Plate', 'Mug')
+        response = {}
+        if 'OBJECT_LOCALIZATION' in features:
+            response['localizedObjectAnnotations'] = [
+                {'mid': '/m/02s195', 'name': objects[digest[0] % len(objects)], 'score': 0.6 + digest[1] / 1000}
+            ]
+        if 'TEXT_DETECTION' in features:
+            text = f"Handmade \u20b9{500 + digest[2] * 10}"
+            response['textAnnotations'] = [{'locale': 'en', 'description': text}]
+        if 'LABEL_DETECTION' in features:
+            response['labelAnnotations'] = [
+                {'mid': '/m/0h8mhzd', 'description': 'Pottery', 'score': 0.93},
+                {'mid': '/m/02wbm', 'description': 'Tableware', 'score': 0.88},
+                {'mid': '/m/01d40f', 'description': 'Ceramic', 'score': 0.81}
+            ]
+        return response
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubProfileServer:
+    """Serves one profile page for any path, trickled out at `bandwidth` bytes/s after `delay`
+    seconds (a proxy like ScrapingBee rendering, then relaying). Records how many bytes each
+    request actually received before the client hung up."""
+
+    def __init__(self, page, delay=0.2, bandwidth=2 * 1024 * 1024, chunk_size=16 * 1024, port=0):
+        self.page = page.encode() if isinstance(page, str) else page
+        self.delay = delay
+        self.bandwidth = bandwidth
+        self.chunk_size = chunk_size
+        self.bytes_sent = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                time.sleep(stub.delay)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(stub.page)))
+                self.end_headers()
+                sent = 0
+                try:
+                    for start in range(0, len(stub.page), stub.chunk_size):
+                        chunk = stub.page[start:start + stub.chunk_size]
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+                        sent += len(chunk)
+                        time.sleep(len(chunk) / stub.bandwidth)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+                stub.bytes_sent.append(sent)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubInstagramGraphServer:
+    """Fake graph.instagram.com for the API flow: /me, cursor-paged /me/media, /<media>/comments
+    and, unless multi_id=False, Graph's multi-ID read (/?ids=a,b&fields=comments.limit(n){...}).
+    Field reads (/<media>?fields=..., /?ids=...&fields=media_url) serve media too. Each request
+    costs `delay` seconds; tracks request count and peak concurrency. add_post(), rotate_urls()
+    and `media` (newest first) let a benchmark publish, re-sign or edit posts between syncs."""
+
+    def __init__(self, delay=0.15, posts=10, comments_per_post=3, multi_id=True, port=0):
+        self.delay = delay
+        self.posts = posts
+        self.comments_per_post = comments_per_post
+        self.multi_id = multi_id
+        self.media = []
+        self.url_version = 0
+        for _ in range(posts):
+            self.add_post()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    time.sleep(stub.delay)
+                    status, reply = stub.route(self.path)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                body = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def add_post(self, caption=None):
+        """Publish a post; it becomes the newest item in /me/media"""
+        index = len(self.media)
+        item = {
+            'id': f"media{index}", 'caption': caption or f"Handmade item {index} - ₹{499 + index * 100}",
+            'media_type': 'IMAGE', 'media_url': f"https://scontent.cdninstagram.com/stub/media{index}.jpg",
+            'timestamp': (datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=index)).strftime('%Y-%m-%dT%H:%M:%S+0000')
+        }
+        self.media.insert(0, item)
+        return item
+
+    def rotate_urls(self):
+        """Re-sign every media_url, as Instagram's CDN does; earlier URLs count as expired"""
+        self.url_version += 1
+        for item in self.media:
+            item['media_url'] = f"{item['media_url'].partition('?')[0]}?sig={self.url_version}"
+
+    @staticmethod
+    def fields(item, fields):
+        return dict({'id': item['id']}, **{name: item[name] for name in fields.split(',') if name in item})
+
+    def comments(self, media_id, limit):
+        return [
+            {'id': f"{media_id}_c{i}", 'text': f"Love this! 😍 #{i}", 'username': f"fan{i}",
+             'timestamp': '2024-05-01T10:00:00+0000'}
+            for i in range(min(limit, self.comments_per_post))
+        ]
+
+    def route(self, path):
+        parts = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if parts.path == '/me':
+            return 200, {'id': '1784', 'username': 'stub.shop', 'media_count': len(self.media)}
+        if parts.path == '/me/media':
+            limit = int(query.get('limit', 25))
+            start = int(query.get('after', 0))
+            reply = {'data': [dict(item) for item in self.media[start:start + limit]]}
+            if start + limit < len(self.media):
+                reply['paging'] = {'next': f"{self.url}/me/media?limit={limit}&after={start + limit}"
+                                           f"&access_token={query.get('access_token', '')}"}
+            return 200, reply
+        if parts.path.endswith('/comments'):
+            return 200, {'data': self.comments(parts.path.strip('/').split('/')[0], int(query.get('limit', 25)))}
+        if parts.path == '/' and 'ids' in query:
+            if not self.multi_id:
+                return 400, {'error': {'message': 'Unsupported get request.', 'type': 'IGApiException', 'code': 100}}
+            if 'comments' not in query.get('fields', ''):
+                items = {item['id']: item for item in self.media}
+                return 200, {
+                    media_id: self.fields(items[media_id], query.get('fields', ''))
+                    for media_id in query['ids'].split(',') if media_id in items
+                }
+            limit = int(query.get('fields', '').partition('limit(')[2].partition(')')[0] or 25)
+            return 200, {
+                media_id: {'id': media_id, 'comments': {'data': self.comments(media_id, limit)}}
+                for media_id in query['ids'].split(',')
+            }
+        item = next((item for item in self.media if parts.path == f"/{item['id']}"), None)
+        if item is not None:
+            return 200, self.fields(item, query.get('fields', ''))
+        return 404, {'error': {'message': f"Unknown path {parts.path}"}}
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class StubUploadServer:
+    """Fake Cloudinary upload API (POST /v1_1/<cloud>/image/upload, multipart form) for the
+    Cloudinary SDK's upload_prefix. Each upload costs `delay` plus its size at `bandwidth`
+    bytes/second. Tracks uploads, bytes received, uploads sent as a URL for the service to fetch
+    (remote_fetches) and peak concurrency."""
+
+    def __init__(self, delay=0.3, bandwidth=4 * 1024 * 1024, port=0):
+        self.delay = delay
+        self.bandwidth = bandwidth
+        self.uploads = 0
+        self.bytes_received = 0
+        self.remote_fetches = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    message = BytesParser().parsebytes(
+                        f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode() + body
+                    )
+                    fields = {
+                        part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+                        for part in message.get_payload()
+                    } if message.is_multipart() else {}
+                    upload = fields.get('file') or b''
+                    time.sleep(stub.delay + len(body) / stub.bandwidth)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+                with stub._lock:
+                    stub.uploads += 1
+                    stub.bytes_received += len(body)
+                    stub.remote_fetches += upload.startswith(b'http')
+                    index = stub.uploads
+                cloud = self.path.strip('/').split('/')[1] if self.path.count('/') > 2 else 'stub'
+                folder = (fields.get('folder') or b'').decode()
+                public_id = f"{folder}/upload{index}".strip('/')
+                reply = json.dumps({
+                    'public_id': public_id,
+                    'bytes': len(upload),
+                    'secure_url': f"{stub.url}/{cloud}/image/upload/{public_id}.jpg"
+                }).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeGenerativeModel:
+    """In-process stand-in for vertexai's GenerativeModel (generate_content(...).text) answering
+    the product prompts in gemini_products: one business per call, or a JSON list of them.
+    Each call takes delay seconds plus per_business_delay per business. With json_mode=False it
+    rejects response_mime_type like gemini-1.0-pro does and wraps its JSON in prose and a fence.
+    Counts calls (json_calls of them in JSON mode), businesses and prompt characters"""
+
+    PRODUCTS = ('Signature Gift Box', 'Classic Collection', 'Starter Kit', 'Limited Edition Set',
+                'Custom Order', 'Mini Sampler', 'Gift Card')
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, delay=0.8, per_business_delay=0.05, json_mode=True):
+        self.delay = delay
+        self.per_business_delay = per_business_delay
+        self.json_mode = json_mode
+        self.calls = 0
+        self.json_calls = 0
+        self.businesses = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def products_for(cls, name):
+        seed = hashlib.md5(name.encode()).digest()
+        return [
+            {
+                'name': f"{name} {product}",
+                'price': f"₹{300 + seed[i] * 10}-₹{600 + seed[i] * 20}",
+                'description': f"{product} from {name}. Made to order and shipped across India.",
+                'category': 'Featured' if i == 0 else 'Collection'
+            }
+            for i, product in enumerate(cls.PRODUCTS[:6 + seed[0] % 2])
+        ]
+
+    def generate_content(self, contents, generation_config=None):
+        mime = (generation_config or {}).get('response_mime_type')
+        if mime and not self.json_mode:
+            raise ValueError('400 response_mime_type is not supported by this model')
+
+        marker = contents.find('Businesses (JSON):')
+        if marker >= 0:
+            start = contents.index('[', marker)
+            businesses = json.JSONDecoder().raw_decode(contents, start)[0]
+            reply = [{'id': b['id'], 'products': self.products_for(b['name'])} for b in businesses]
+        else:
+            name = contents.split('Business Name:', 1)[1].split('\n', 1)[0].strip()
+            businesses = [name]
+            reply = self.products_for(name)
+
+        with self._lock:
+            self.calls += 1
+            self.json_calls += 1 if mime else 0
+            self.businesses += len(businesses)
+            self.prompt_chars += len(contents)
+        time.sleep(self.delay + self.per_business_delay * len(businesses))
+
+        text = json.dumps(reply, ensure_ascii=False)
+        if not mime:
+            text = f"Here are the products:\n```json\n{text}\n```\nPrices are estimates."
+        return self.Response(text)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Instagram Media Sync
+Incremental /me/media sync for the Graph API flow. The first run follows the paging cursors
+through the whole feed (up to max_pages). Later runs read newest-first and stop at the newest
+media already seen, so a refresh usually costs one request. Every full_sync_interval a full
+pass runs again to pick up caption edits and deletions; refresh_urls() re-reads the signed CDN
+URLs of older posts that are still on show. State per account
+lives in any kv_store backend, so every gunicorn worker (and restart) shares it.
+"""
+import hashlib
+import time
+
+MEDIA_FIELDS = 'id,caption,media_type,media_url,thumbnail_url,permalink,timestamp'
+URL_FIELDS = 'media_url,thumbnail_url'
+# Graph reads at most 50 ids per multi-ID request
+MAX_BATCH_IDS = 50
+
+
+def media_digest(item):
+    """What makes a post 'changed' for product generation. media_url is left out on purpose:
+    it's a signed CDN URL that rotates without the post changing"""
+    payload = f"{item.get('media_type', '')}\n{item.get('caption') or ''}"
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class MediaSync:
+    """sync(account_id, access_token) -> everything known about the account's media, and what's new"""
+
+    def __init__(self, http_client, store, base_url='https://graph.instagram.com', page_size=50,
+                 max_pages=20, max_media=500, full_sync_interval=7 * 24 * 3600, timeout=15):
+        self.http_client = http_client
+        self.store = store
+        self.base_url = base_url.rstrip('/')
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_media = max_media
+        self.full_sync_interval = full_sync_interval
+        self.timeout = timeout
+        self.syncs = 0
+        self.full_syncs = 0
+        self.requests = 0
+        self.new_media = 0
+        self.url_refreshes = 0
+
+    def _key(self, account_id):
+        return f"media_sync:{account_id}"
+
+    def _pages(self, access_token):
+        """Yield (media, has_more) per /me/media page, newest-first, following paging.next"""
+        url = f"{self.base_url}/me/media"
+        params = {'fields': MEDIA_FIELDS, 'limit': self.page_size, 'access_token': access_token}
+        for _ in range(self.max_pages):
+            response = self.http_client.get(url, params=params, timeout=self.timeout)
+            self.requests += 1
+            if response.status_code != 200:
+                raise RuntimeError(f"/me/media returned {response.status_code}: {response.text[:200]}")
+            page = response.json()
+            # The next cursor URL already carries fields, limit and the token
+            url, params = (page.get('paging') or {}).get('next'), None
+            yield page.get('data', []), bool(url)
+            if not url:
+                return
+
+    def sync(self, account_id, access_token, full=None):
+        """Returns {'media': all known media newest-first, 'new': [...], 'changed': [...],
+        'removed': [ids], 'full': bool, 'requests': n}. new/changed are what product generation
+        needs to look at; on an account's first sync everything is new."""
+        state = self.store.get(self._key(account_id)) or {}
+        known = {item['id']: item for item in state.get('media', [])}
+        if full is None:
+            full = not known or time.time() - state.get('full_synced_at', 0) >= self.full_sync_interval
+
+        requests_before = self.requests
+        fetched = []
+        complete = False
+        for page, has_more in self._pages(access_token):
+            reached_known = False
+            for item in page:
+                if not full and item.get('id') in known:
+                    reached_known = True
+                    break
+                fetched.append(item)
+            complete = not has_more
+            if reached_known:
+                break
+
+        new, changed = [], []
+        for item in fetched:
+            item['digest'] = media_digest(item)
+            previous = known.get(item['id'])
+            if previous is None:
+                new.append(item)
+            elif previous.get('digest') != item['digest']:
+                changed.append(item)
+
+        fetched_ids = {item['id'] for item in fetched}
+        # Only a full pass that saw the end of the feed can tell a deleted post from an unread one
+        removed = [media_id for media_id in known if media_id not in fetched_ids] if full and complete else []
+        gone = fetched_ids.union(removed)
+        older = [item for media_id, item in known.items() if media_id not in gone]
+        media = sorted(fetched + older, key=lambda item: item.get('timestamp') or '', reverse=True)[:self.max_media]
+
+        now = time.time()
+        self.store.set(self._key(account_id), {
+            'media': media,
+            'newest_id': media[0]['id'] if media else None,
+            'newest_timestamp': media[0].get('timestamp') if media else None,
+            'synced_at': now,
+            'full_synced_at': now if full else state.get('full_synced_at', 0)
+        })
+
+        self.syncs += 1
+        self.full_syncs += 1 if full else 0
+        self.new_media += len(new)
+        print(f"🔄 Media sync for {account_id}: {len(new)} new, {len(changed)} changed, {len(removed)} removed, "
+              f"{len(media)} known ({'full' if full else 'incremental'}, {self.requests - requests_before} requests)")
+        return {
+            'media': media,
+            'new': new,
+            'changed': changed,
+            'removed': removed,
+            'full': full,
+            'requests': self.requests - requests_before
+        }
+
+    def refresh_urls(self, media_ids, access_token):
+        """{media_id: current image URL} for posts whose stored media_url may have expired (an
+        incremental sync only re-reads new posts, and Instagram's CDN URLs are signed). One
+        multi-ID request per 50 ids, falling back to one request per post; ids that can't be read
+        are left out"""
+        media_ids = list(dict.fromkeys(media_id for media_id in media_ids if media_id))
+        urls = {}
+        for start in range(0, len(media_ids), MAX_BATCH_IDS):
+            batch = media_ids[start:start + MAX_BATCH_IDS]
+            try:
+                response = self.http_client.get(f"{self.base_url}/", params={
+                    'ids': ','.join(batch), 'fields': URL_FIELDS, 'access_token': access_token
+                }, timeout=self.timeout)
+                self.requests += 1
+                if response.status_code == 200:
+                    data = response.json()
+                    for media_id in batch:
+                        item = data.get(media_id) or {}
+                        if item.get('media_url') or item.get('thumbnail_url'):
+                            urls[media_id] = item.get('media_url') or item.get('thumbnail_url')
+                    continue
+                print(f"⚠️ Multi-ID media URL read returned {response.status_code}, reading per post")
+            except Exception as e:
+                print(f"⚠️ Multi-ID media URL read failed: {e}")
+
+            for media_id in batch:
+                try:
+                    response = self.http_client.get(f"{self.base_url}/{media_id}", params={
+                        'fields': URL_FIELDS, 'access_token': access_token
+                    }, timeout=self.timeout)
+                    self.requests += 1
+                    if response.status_code == 200:
+                        item = response.json()
+                        if item.get('media_url') or item.get('thumbnail_url'):
+                            urls[media_id] = item.get('media_url') or item.get('thumbnail_url')
+                except Exception as e:
+                    print(f"⚠️ Media URL read failed for {media_id}: {e}")
+        self.url_refreshes += len(urls)
+        return urls
+
+    def reset(self, account_id):
+        """Forget an account; its next sync is a full one"""
+        return self.store.delete(self._key(account_id))
+
+    def stats(self):
+        return {
+            'syncs': self.syncs,
+            'full_syncs': self.full_syncs,
+            'requests': self.requests,
+            'new_media': self.new_media,
+            'url_refreshes': self.url_refreshes
+        }
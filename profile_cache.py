@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Instagram Profile Cache
+Keeps extracted profiles per username so repeat requests skip the scraping chain.
+Entries are fresh for `ttl` seconds, then served stale (while a background refresh runs)
+for another `stale_ttl` seconds before they expire.
+"""
+import time
+
+
+def normalize_username(username):
+    """Canonical cache key for a handle: '@The.Shop/' -> 'the.shop'"""
+    return (username or '').strip().lstrip('@').strip('/').lower()
+
+
+class ProfileCache:
+    """Stale-while-revalidate cache on top of any kv_store backend"""
+
+    def __init__(self, store, ttl=6 * 3600, stale_ttl=7 * 24 * 3600, refresh_lock_ttl=120, should_cache=None):
+        self.store = store
+        self.should_cache = should_cache or (lambda profile: bool(profile and profile.get('success')))
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_lock_ttl = refresh_lock_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, username):
+        """Returns (profile, is_fresh); (None, False) on a miss"""
+        entry = self.store.get(f"profile:{normalize_username(username)}")
+        if not entry:
+            self.misses += 1
+            return None, False
+
+        fresh = time.time() - entry['fetched_at'] < self.ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return dict(entry['data']), fresh
+
+    def set(self, username, profile):
+        entry = {'data': profile, 'fetched_at': time.time()}
+        self.store.set(f"profile:{normalize_username(username)}", entry, ttl=self.ttl + self.stale_ttl)
+
+    def invalidate(self, username):
+        return self.store.delete(f"profile:{normalize_username(username)}")
+
+    def claim_refresh(self, username):
+        """True for exactly one caller (across workers) while a refresh is due"""
+        return self.store.add(f"refreshing:{normalize_username(username)}", 1, ttl=self.refresh_lock_ttl)
+
+    def release_refresh(self, username):
+        self.store.delete(f"refreshing:{normalize_username(username)}")
+
+    def get_or_fetch(self, username, fetch, schedule_refresh=None):
+        """Serve from cache when possible; on a stale hit hand a refresh to schedule_refresh(func, *args)"""
+        profile, fresh = self.get(username)
+        if profile is not None:
+            if not fresh and schedule_refresh and self.claim_refresh(username):
+                if schedule_refresh(self.refresh, username, fetch, True) is None:
+                    self.release_refresh(username)
+            return profile
+
+        # A miss doesn't take the refresh claim, so it must not drop one another worker holds
+        return self.refresh(username, fetch)
+
+    def refresh(self, username, fetch, claimed=False):
+        """Run the real extraction and cache it if the result is worth keeping. claimed: the
+        caller holds the refresh claim (from claim_refresh) and it's released when done"""
+        try:
+            profile = fetch(username)
+            if self.should_cache(profile):
+                self.set(username, profile)
+            return profile
+        finally:
+            if claimed:
+                self.release_refresh(username)
+
+    def stats(self):
+        return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses}
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Profile Page Parser
+One shared parser for Instagram profile pages, used by every extraction method. All patterns
+are compiled once at import. og: meta tags are read from <head> only, so a multi-MB page isn't
+scanned past its first few KB for them. Embedded profile JSON is located by its marker and
+decoded in a single pass, with no lazy `{.*?}` backtracking. Post images come from one
+lxml parse of the document (html.parser only if lxml is missing).
+"""
+import codecs
+import html
+import importlib.util
+import json
+import re
+from dataclasses import dataclass, field
+
+from lazy_imports import lazy_from, lazy_import
+
+lxml_html = lazy_import('lxml.html')
+BeautifulSoup = lazy_from('bs4', 'BeautifulSoup')
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+
+HEAD_END = re.compile(r'</head\s*>', re.IGNORECASE)
+META_TAG = re.compile(r'<meta\b([^>]*)>', re.IGNORECASE)
+TAG_ATTRIBUTE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+# "1,234", "12.4K", "1.1M"
+COUNT = r'(\d+(?:[,.]\d+)*[KkMm]?)'
+FOLLOWERS_COUNT = re.compile(COUNT + r'\s+Followers')
+FOLLOWING_COUNT = re.compile(COUNT + r'\s+Following')
+POSTS_COUNT = re.compile(COUNT + r'\s+Posts')
+# "1,234 Followers, 56 Following, 78 Posts - See Instagram photos and videos from ..."
+DESCRIPTION_STATS = (
+    re.compile(COUNT + r' Followers,?\s*'),
+    re.compile(COUNT + r' Following,?\s*'),
+    re.compile(COUNT + r' Posts?\s*-?\s*')
+)
+COUNT_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+# Where profile JSON starts in the page; the object itself is read with raw_decode
+PROFILE_JSON_MARKERS = (
+    re.compile(r'window\._sharedData\s*=\s*'),
+    re.compile(r'window\.__additionalDataLoaded\([^,)]{0,200},\s*'),
+    re.compile(r'"graphql":\s*(?=\{"user")')
+)
+PROFILE_JSON_PATHS = (
+    ('entry_data', 'ProfilePage', 0, 'graphql', 'user'),
+    ('graphql', 'user'),
+    ('data', 'user'),
+    ('user',),
+    ('data', 'data', 'user')
+)
+# Loose fields for pages whose JSON blob is fragmented across script chunks
+JSON_STRING_FIELDS = {
+    'full_name': re.compile(r'"full_name":\s*"((?:[^"\\]|\\.)*)"'),
+    'bio': re.compile(r'"biography":\s*"((?:[^"\\]|\\.)*)"')
+}
+FOLLOWED_BY_COUNT = re.compile(r'"edge_followed_by":\s*\{\s*"count":\s*(\d+)')
+
+POST_IMAGE_HOSTS = ('cdninstagram', 'fbcdn')
+NOT_POST_IMAGES = ('profile', 'avatar', 'story', 'highlight')
+MAX_POSTS = 12
+
+PROFILE_META = ('og:title', 'og:description', 'og:image')
+# A streamed fetch gives up if </head> hasn't shown up by then
+META_STREAM_MAX_BYTES = 1024 * 1024
+META_STREAM_CHUNK = 16 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+@dataclass
+class ProfileRecord:
+    """What one page told us about a profile"""
+    username: str
+    full_name: str = ''
+    bio: str = ''
+    followers: int = 0
+    following: int = 0
+    post_count: int = 0
+    profile_pic_url: str = ''
+    posts: list = field(default_factory=list)
+    source: str = ''
+
+    @property
+    def found(self):
+        return bool(self.full_name or self.bio or self.followers > 0 or self.posts)
+
+    def to_dict(self, **extra):
+        """The dict shape the extraction methods return (both key vocabularies, plus success)"""
+        result = {
+            'bio': self.bio,
+            'full_name': self.full_name,
+            'display_name': self.full_name,
+            'followers': self.followers,
+            'follower_count': self.followers,
+            'following': self.following,
+            'following_count': self.following,
+            'post_count': self.post_count,
+            'profile_pic_url': self.profile_pic_url,
+            'posts': self.posts,
+            'username': self.username,
+            'success': self.found
+        }
+        if self.source:
+            result['source'] = self.source
+        result.update(extra)
+        return result
+
+
+def _meta_item(tag_attributes):
+    """(property or name, decoded content) of one <meta> tag, or None"""
+    attributes = {
+        name.lower(): double or single
+        for name, double, single in TAG_ATTRIBUTE.findall(tag_attributes)
+    }
+    key = attributes.get('property') or attributes.get('name')
+    if key and 'content' in attributes:
+        return key, html.unescape(attributes['content'])
+    return None
+
+
+def page_head(page):
+    """Everything before </head> (the whole page if it has none)"""
+    match = HEAD_END.search(page)
+    return page[:match.start()] if match else page
+
+
+def parse_meta(page):
+    """{property or name: content} for the <meta> tags in <head>, entities decoded"""
+    meta = {}
+    for tag in META_TAG.finditer(page_head(page)):
+        item = _meta_item(tag.group(1))
+        if item:
+            meta.setdefault(*item)
+    return meta
+
+
+def parse_count(text):
+    """'1,234' -> 1234, '12.4K' -> 12400, '1.1M' -> 1100000"""
+    text = text.replace(',', '')
+    multiplier = COUNT_SUFFIXES.get(text[-1:].lower(), 1)
+    try:
+        return int(round(float(text.rstrip('KkMm')) * multiplier))
+    except ValueError:
+        return 0
+
+
+class MetaTagScanner:
+    """Incremental parse_meta: feed() raw body chunks as they arrive; `done` once </head> is
+    seen or every wanted tag has been found, after which the rest of the page can be dropped"""
+
+    def __init__(self, wanted=PROFILE_META):
+        self.wanted = wanted
+        self.meta = {}
+        self.bytes_read = 0
+        self.done = False
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ''
+        self._scanned = 0
+
+    def feed(self, chunk):
+        if self.done:
+            return True
+        self.bytes_read += len(chunk)
+        self._buffer += self._decoder.decode(chunk)
+
+        head_end = HEAD_END.search(self._buffer, max(0, self._scanned - 8))
+        limit = head_end.start() if head_end else len(self._buffer)
+        for tag in META_TAG.finditer(self._buffer, self._scanned, limit):
+            item = _meta_item(tag.group(1))
+            if item:
+                self.meta.setdefault(*item)
+        if head_end:
+            self._scanned = limit
+        else:
+            # Resume at a tag still waiting for its '>' in the next chunk, else at the end
+            partial = self._buffer.rfind('<', self._scanned, limit)
+            self._scanned = partial if partial >= 0 and '>' not in self._buffer[partial:] else limit
+
+        self.done = bool(head_end) or all(key in self.meta for key in self.wanted)
+        return self.done
+
+
+def fetch_meta(get, url, max_bytes=META_STREAM_MAX_BYTES, chunk_size=META_STREAM_CHUNK, **kwargs):
+    """Stream a page through a MetaTagScanner and hang up once its meta tags are in.
+
+    `get` is any requests-style get (PooledHTTPClient.get, a cloudscraper session). Returns
+    (status_code, meta, bytes_read); meta is None for a non-200 response. Closing the response
+    early drops its connection instead of returning it to the pool - one new handshake is far
+    cheaper than pulling the rest of a multi-MB page through a proxy."""
+    response = get(url, stream=True, **kwargs)
+    try:
+        if response.status_code != 200:
+            return response.status_code, None, 0
+        scanner = MetaTagScanner()
+        for chunk in response.iter_content(chunk_size):
+            if scanner.feed(chunk) or scanner.bytes_read >= max_bytes:
+                break
+        return response.status_code, scanner.meta, scanner.bytes_read
+    finally:
+        response.close()
+
+
+def _count(pattern, text):
+    match = pattern.search(text)
+    return parse_count(match.group(1)) if match else 0
+
+
+def display_name_from_title(title):
+    display_name = title.replace(' • Instagram photos and videos', '').replace(' • Instagram', '').replace(' (@', ' (')
+    if '(' in display_name:
+        display_name = display_name.split(' (')[0].strip()
+    return display_name
+
+
+def bio_from_description(description):
+    bio = description
+    for pattern in DESCRIPTION_STATS:
+        bio = pattern.sub('', bio)
+    bio = bio.replace('See Instagram photos and videos from ', '').strip()
+    if bio.startswith('- '):
+        bio = bio[2:].strip()
+    return bio
+
+
+def profile_from_meta(meta, username):
+    """ProfileRecord from og:title/og:description/og:image, or None if the page lacks them"""
+    title = meta.get('og:title', '')
+    description = meta.get('og:description', '')
+    if not (title and description):
+        return None
+    return ProfileRecord(
+        username=username,
+        full_name=display_name_from_title(title),
+        bio=bio_from_description(description),
+        followers=_count(FOLLOWERS_COUNT, title + ' ' + description),
+        following=_count(FOLLOWING_COUNT, description),
+        post_count=_count(POSTS_COUNT, description),
+        profile_pic_url=meta.get('og:image', '')
+    )
+
+
+def _find_user(data):
+    for path in PROFILE_JSON_PATHS:
+        current = data
+        try:
+            for key in path:
+                current = current[key]
+        except (KeyError, IndexError, TypeError):
+            continue
+        if isinstance(current, dict):
+            return current
+    return None
+
+
+def profile_from_json(data, username):
+    """ProfileRecord from any of Instagram's profile JSON shapes, or None"""
+    user = _find_user(data) if isinstance(data, dict) else None
+    if not user:
+        return None
+
+    timeline = user.get('edge_owner_to_timeline_media') or {}
+    posts = []
+    for edge in (timeline.get('edges') or [])[:MAX_POSTS]:
+        node = edge.get('node', {})
+        caption_edges = node.get('edge_media_to_caption', {}).get('edges', [])
+        posts.append({
+            'image': node.get('display_url', ''),
+            'caption': caption_edges[0].get('node', {}).get('text', '') if caption_edges else '',
+            'timestamp': node.get('taken_at_timestamp', ''),
+            'likes': node.get('edge_liked_by', {}).get('count', 0),
+            'comments': node.get('edge_media_to_comment', {}).get('count', 0)
+        })
+
+    return ProfileRecord(
+        username=username,
+        full_name=user.get('full_name') or '',
+        bio=user.get('biography') or '',
+        followers=(user.get('edge_followed_by') or {}).get('count', 0),
+        following=(user.get('edge_follow') or {}).get('count', 0),
+        post_count=timeline.get('count', 0),
+        profile_pic_url=user.get('profile_pic_url_hd') or user.get('profile_pic_url') or '',
+        posts=posts
+    )
+
+
+def embedded_json(page):
+    """Yield each profile JSON object embedded in the page's scripts"""
+    for marker in PROFILE_JSON_MARKERS:
+        for match in marker.finditer(page):
+            try:
+                data, _ = _decoder.raw_decode(page, match.end())
+            except ValueError:
+                continue
+            yield data
+
+
+def _json_string(value):
+    try:
+        return json.loads(f'"{value}"')
+    except ValueError:
+        return value
+
+
+def is_post_image(src):
+    return bool(
+        src and 'scontent' in src
+        and any(host in src for host in POST_IMAGE_HOSTS)
+        and not any(exclude in src.lower() for exclude in NOT_POST_IMAGES)
+    )
+
+
+def post_images(page, limit=MAX_POSTS):
+    """[(src, alt)] of post images in the page body"""
+    if LXML_AVAILABLE:
+        try:
+            images = [(img.get('src'), img.get('alt')) for img in lxml_html.fromstring(page).iter('img')]
+        except Exception:
+            images = []
+    else:
+        images = [(img.get('src'), img.get('alt')) for img in BeautifulSoup(page, 'html.parser').find_all('img')]
+
+    found = []
+    for src, alt in images:
+        if is_post_image(src):
+            found.append((src, alt or ''))
+            if len(found) >= limit:
+                break
+    return found
+
+
+def parse_profile_page(page, username):
+    """Everything a profile page offers: embedded JSON first, then meta tags, loose JSON fields
+    and post images for whatever the JSON didn't cover. Always returns a ProfileRecord."""
+    for data in embedded_json(page):
+        record = profile_from_json(data, username)
+        if record and record.found:
+            record.source = 'embedded_json'
+            return record
+
+    record = profile_from_meta(parse_meta(page), username) or ProfileRecord(username=username)
+    record.source = 'html'
+    if not record.full_name:
+        match = JSON_STRING_FIELDS['full_name'].search(page)
+        record.full_name = _json_string(match.group(1)).strip() if match else ''
+    if not record.bio:
+        match = JSON_STRING_FIELDS['bio'].search(page)
+        record.bio = _json_string(match.group(1)).replace('\n', ' ').strip() if match else ''
+    if not record.followers:
+        record.followers = _count(FOLLOWED_BY_COUNT, page)
+
+    record.posts = [
+        {'image': src, 'caption': alt, 'timestamp': '', 'likes': 0, 'comments': 0}
+        for src, alt in post_images(page)
+    ]
+    if record.posts and not record.post_count:
+        record.post_count = len(record.posts)
+    return record
@@ -0,0 +1,159 @@
+// Catalog cart: per-store values come from window.STORE_CONFIG, set inline by the page
+const storeConfig = window.STORE_CONFIG || {};
+
+// Cart functionality
+let cart = [];
+let isCartOpen = false;
+
+function toggleCart() {
+    const sidebar = document.getElementById('cartSidebar');
+    const overlay = document.getElementById('cartOverlay');
+    
+    isCartOpen = !isCartOpen;
+    
+    if (isCartOpen) {
+        sidebar.classList.add('open');
+        overlay.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    } else {
+        sidebar.classList.remove('open');
+        overlay.classList.remove('active');
+        document.body.style.overflow = 'auto';
+    }
+}
+
+function addToCart(name, price, image, buttonElement) {
+    const existingItem = cart.find(item => item.name === name);
+    
+    if (existingItem) {
+        existingItem.quantity += 1;
+    } else {
+        cart.push({
+            name: name,
+            price: parseInt(price),
+            image: image,
+            quantity: 1
+        });
+    }
+    
+    // Animation effect
+    buttonElement.classList.add('animating');
+    setTimeout(() => buttonElement.classList.remove('animating'), 300);
+    
+    updateCartDisplay();
+    updateCartUI();
+}
+
+function updateQuantity(name, change) {
+    const item = cart.find(item => item.name === name);
+    if (item) {
+        item.quantity += change;
+        if (item.quantity <= 0) {
+            cart = cart.filter(item => item.name !== name);
+        }
+    }
+    updateCartDisplay();
+    updateCartUI();
+}
+
+function removeFromCart(name) {
+    cart = cart.filter(item => item.name !== name);
+    updateCartDisplay();
+    updateCartUI();
+}
+
+function updateCartDisplay() {
+    const cartCount = document.getElementById('cartCount');
+    const totalItems = cart.reduce((sum, item) => sum + item.quantity, 0);
+    cartCount.textContent = totalItems;
+    cartCount.style.display = totalItems > 0 ? 'flex' : 'none';
+}
+
+function updateCartUI() {
+    const cartItems = document.getElementById('cartItems');
+    const totalAmount = document.getElementById('totalAmount');
+    const checkoutBtn = document.getElementById('checkoutBtn');
+    
+    if (cart.length === 0) {
+        cartItems.innerHTML = '<p style="text-align: center; color: #999; padding: 40px 0;">Your cart is empty</p>';
+        totalAmount.textContent = '0';
+        checkoutBtn.disabled = true;
+        return;
+    }
+    
+    let total = 0;
+    cartItems.innerHTML = cart.map(item => {
+        const itemTotal = item.price * item.quantity;
+        total += itemTotal;
+        
+        return `
+            <div class="cart-item">
+                <img src="${item.image}" alt="${item.name}" class="cart-item-image">
+                <div class="cart-item-info">
+                    <div class="cart-item-name">${item.name}</div>
+                    <div class="cart-item-price">₹${item.price} × ${item.quantity} = ₹${itemTotal}</div>
+                </div>
+                <div class="quantity-controls active">
+                    <button class="quantity-btn" onclick="updateQuantity('${item.name}', -1)">-</button>
+                    <span class="quantity-display">${item.quantity}</span>
+                    <button class="quantity-btn" onclick="updateQuantity('${item.name}', 1)">+</button>
+                </div>
+                <button onclick="removeFromCart('${item.name}')" style="background: none; border: none; color: #999; cursor: pointer;">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        `;
+    }).join('');
+    
+    totalAmount.textContent = total.toLocaleString();
+    checkoutBtn.disabled = false;
+}
+
+function checkout() {
+    if (cart.length === 0) return;
+    
+    // Create detailed order message
+    let message = `🛒 *New Order from ${storeConfig.storeName}*\n\n`;
+    message += `📱 *Customer Details:*\n`;
+    message += `Website: ${storeConfig.username}\n\n`;
+    
+    message += `🛍️ *Order Items:*\n`;
+    let total = 0;
+    
+    cart.forEach((item, index) => {
+        const itemTotal = item.price * item.quantity;
+        total += itemTotal;
+        message += `${index + 1}. *${item.name}*\n`;
+        message += `   Price: ₹${item.price}\n`;
+        message += `   Quantity: ${item.quantity}\n`;
+        message += `   Subtotal: ₹${itemTotal}\n\n`;
+    });
+    
+    message += `💰 *Total Amount: ₹${total}*\n\n`;
+    message += `📞 Please confirm this order and share payment details.\n`;
+    message += `🚚 Let me know your delivery address.\n\n`;
+    message += `Thank you for choosing ${storeConfig.storeName}! 🙏`;
+    
+    // Create URL with all cart details as parameters
+    const cartData = encodeURIComponent(JSON.stringify(cart));
+    const orderTotal = total;
+    const customerInfo = encodeURIComponent(storeConfig.username);
+    
+    const whatsappUrl = `https://wa.me/${storeConfig.whatsappNumber}?text=${encodeURIComponent(message)}&cart=${cartData}&total=${orderTotal}&customer=${customerInfo}`;
+    
+    // Open WhatsApp
+    window.open(whatsappUrl, '_blank');
+    
+    // Clear cart after successful order
+    cart = [];
+    updateCartDisplay();
+    updateCartUI();
+    toggleCart();
+    
+    // Show success message
+    alert('Order sent to WhatsApp! We will contact you soon.');
+}
+
+// Initialize cart display
+updateCartDisplay();
+updateCartUI();
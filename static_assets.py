@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Static Assets
+Shared catalog CSS/JS from static/catalog, loaded once at import and served under
+content-hashed names (enhanced_store.3f2a9c1b7d4e.css) so browsers can cache them forever.
+A new deploy changes the hash, and so the URL, of anything that changed.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'catalog')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Old catalogs may still point at a previous hash: serve current content but make it revalidate
+STALE_CACHE_CONTROL = 'public, no-cache'
+
+CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8'
+}
+
+
+def hashed_name(filename, content, length=12):
+    """enhanced_store.css -> enhanced_store.<sha256 prefix>.css"""
+    base, ext = os.path.splitext(filename)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:length]}{ext}"
+
+
+class StaticBundle:
+    """Versioned, in-memory copy of a directory of static files"""
+
+    def __init__(self, directory=STATIC_DIR, url_prefix='/assets/'):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.assets = {}
+        self._by_hashed_name = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.stale_requests = 0
+
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    self._add(filename, f.read())
+
+    def _add(self, filename, content):
+        ext = os.path.splitext(filename)[1]
+        name = hashed_name(filename, content)
+        asset = {
+            'filename': filename,
+            'hashed_name': name,
+            'body': content,
+            'gzip': gzip.compress(content, compresslevel=9),
+            'etag': name,
+            'content_type': CONTENT_TYPES.get(ext) or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        }
+        self.assets[filename] = asset
+        self._by_hashed_name[name] = asset
+
+    def url(self, filename):
+        """Public URL of the current version of a file, e.g. /assets/enhanced_store.3f2a9c1b7d4e.css"""
+        return self.url_prefix + self.assets[filename]['hashed_name']
+
+    def lookup(self, requested):
+        """(asset, immutable) for a requested name, or (None, False) if it is not ours.
+
+        An exact hashed name is immutable; an unhashed or out-of-date name for a known file
+        still gets the current content, just without the long-lived cache headers.
+        """
+        asset = self._by_hashed_name.get(requested)
+        if asset is not None:
+            return asset, True
+
+        base, ext = os.path.splitext(requested)
+        asset = self.assets.get(base.rsplit('.', 1)[0] + ext) or self.assets.get(requested)
+        if asset is not None:
+            self.stale_requests += 1
+        return asset, False
+
+    def respond(self, requested, if_none_match=(), accept_gzip=False):
+        """(status, body, headers) for an /assets request; status is 404, 304 or 200.
+        if_none_match holds unquoted entity tags (werkzeug's request.if_none_match works as-is)"""
+        asset, immutable = self.lookup(requested)
+        if asset is None:
+            return 404, b'Not found', {}
+
+        self.requests += 1
+        headers = {
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else STALE_CACHE_CONTROL,
+            'ETag': f'"{asset["etag"]}"',
+            'Vary': 'Accept-Encoding'
+        }
+        if asset['etag'] in if_none_match:
+            self.not_modified += 1
+            return 304, b'', headers
+
+        headers['Content-Type'] = asset['content_type']
+        if accept_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return 200, asset['gzip'], headers
+        return 200, asset['body'], headers
+
+    def stats(self):
+        return {
+            'assets': {name: asset['hashed_name'] for name, asset in self.assets.items()},
+            'bytes': sum(len(asset['body']) for asset in self.assets.values()),
+            'gzip_bytes': sum(len(asset['gzip']) for asset in self.assets.values()),
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'stale_requests': self.stale_requests
+        }
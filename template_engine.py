@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compiled Templates
+HTML templates with {{FIELD}} placeholders, compiled once (at import) into a Python function
+over literal chunks and field slots; repeated sections (product cards) are joined, not +='d
+"""
+import os
+import re
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+PLACEHOLDER = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+
+class CompiledTemplate:
+    """Literal chunks with named slots; values are inserted as-is (no escaping)"""
+
+    def __init__(self, text, name='<string>'):
+        self.name = name
+        self.text = text
+        parts = PLACEHOLDER.split(text)
+        self.fields = sorted(set(parts[1::2]))
+
+        # Compile to one Python function: literal chunks and f-string slots concatenated at
+        # compile time, so a render is a single BUILD_STRING with no per-call parsing
+        pieces = [f'f"{{v[{part!r}]}}"' if position % 2 else repr(part) for position, part in enumerate(parts) if part]
+        body = ' '.join(pieces) or repr('')
+        source = (
+            f"def render(v):\n    return ({body})\n"
+            f"def render_many(rows):\n    return ''.join([({body}) for v in rows])\n"
+        )
+        namespace = {}
+        exec(compile(source, f"<template {name}>", 'exec'), namespace)
+        self._render = namespace['render']
+        self._render_many = namespace['render_many']
+
+    def render(self, values=None, **fields):
+        if fields:
+            values = dict(values or {}, **fields)
+        return self._render(values or {})
+
+    def render_many(self, rows):
+        """Render once per values dict in rows, joined into one string"""
+        return self._render_many(rows)
+
+
+def load_template(filename, directory=TEMPLATE_DIR):
+    """Read and compile a template from templates/"""
+    with open(os.path.join(directory, filename), encoding='utf-8') as f:
+        return CompiledTemplate(f.read(), name=filename)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+CommentFetcher: which Graph errors turn multi-ID reads off, and TokenBucket charging
+"""
+import time
+
+from comment_fetcher import CommentFetcher, TokenBucket
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class FakeGraphClient:
+    """Answers multi-ID reads with `batch_reply` and per-post reads with one comment"""
+
+    def __init__(self, batch_reply):
+        self.batch_reply = batch_reply
+        self.paths = []
+
+    def get(self, url, params=None, timeout=None):
+        self.paths.append(url)
+        if 'ids' in (params or {}):
+            return self.batch_reply
+        media_id = url.rstrip('/').split('/')[-2]
+        return FakeResponse(200, {'data': [{'id': f"{media_id}_c0", 'text': 'Nice'}]})
+
+
+def error_reply(status_code, code, message, error_type='OAuthException'):
+    return FakeResponse(status_code, {'error': {'message': message, 'type': error_type, 'code': code}})
+
+
+def fetch(batch_reply):
+    client = FakeGraphClient(batch_reply)
+    fetcher = CommentFetcher(client, base_url='http://graph.test', rate=1000, burst=1000)
+    return fetcher, client, fetcher.fetch(['m1', 'm2'], 'token')
+
+
+def test_unsupported_multi_id_falls_back_and_latches():
+    fetcher, client, comments = fetch(error_reply(400, 100, 'Unsupported get request.', 'IGApiException'))
+    assert fetcher.batch_supported is False
+    assert comments == {'m1': [{'id': 'm1_c0', 'text': 'Nice'}], 'm2': [{'id': 'm2_c0', 'text': 'Nice'}]}
+
+
+def test_expired_token_fails_only_this_call():
+    fetcher, client, comments = fetch(error_reply(400, 190, 'Error validating access token: Session has expired'))
+    assert fetcher.batch_supported is True
+    assert comments == {'m1': [], 'm2': []}
+    assert len(client.paths) == 1
+
+
+def test_permission_error_does_not_latch():
+    fetcher, client, comments = fetch(error_reply(403, 10, 'Application does not have permission for this action'))
+    assert fetcher.batch_supported is True
+    assert comments == {'m1': [], 'm2': []}
+
+
+def test_missing_object_does_not_latch():
+    reply = error_reply(400, 100, "Unsupported get request. Object with ID 'm2' does not exist", 'GraphMethodException')
+    fetcher, client, comments = fetch(reply)
+    assert fetcher.batch_supported is True
+    assert len(comments['m1']) == 1
+
+
+def test_bucket_charges_costs_above_burst():
+    bucket = TokenBucket(rate=100, burst=5)
+    start = time.monotonic()
+    assert bucket.acquire(25, timeout=5)
+    # 5 from the full bucket, the other 20 at 100/s
+    assert time.monotonic() - start >= 0.18
+    assert bucket._tokens < 1
+
+
+def test_bucket_refuses_without_charging():
+    bucket = TokenBucket(rate=10, burst=5)
+    assert bucket.acquire(50, timeout=1) is False
+    assert bucket.acquire(5, timeout=0)
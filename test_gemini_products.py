@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+GeminiProductSuggester: JSON-mode requests, the prompt cache and batched calls
+"""
+import pytest
+
+from gemini_products import GeminiProductSuggester, parse_json_reply
+from kv_store import create_store
+from local_stubs import FakeGenerativeModel
+
+
+class SDKCheckedModel(FakeGenerativeModel):
+    """FakeGenerativeModel behind the installed Vertex AI SDK's own request building, so a
+    generation_config the pinned SDK doesn't accept fails here just as it would in production"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        vertexai = pytest.importorskip('vertexai')
+        from vertexai.preview.generative_models import GenerativeModel
+        vertexai.init(project='test-project', location='us-central1')
+        self.sdk_model = GenerativeModel('gemini-2.5-flash')
+        self.requests = []
+
+    def generate_content(self, contents, generation_config=None):
+        self.requests.append(self.sdk_model._prepare_request(contents=contents, generation_config=generation_config))
+        return super().generate_content(contents, generation_config=generation_config)
+
+
+def make_suggester(model, **kwargs):
+    return GeminiProductSuggester(lambda: model, create_store('memory', 'gemini_products'), **kwargs)
+
+
+def test_json_mode_reaches_the_sdk_request():
+    model = SDKCheckedModel(delay=0, per_business_delay=0)
+    suggester = make_suggester(model)
+
+    products = suggester.suggest('clay.studio', 'Clay Studio')
+
+    assert len(products) >= 6
+    assert suggester.json_mode is True
+    assert model.json_calls == model.calls == 1
+    assert model.requests[0].generation_config.response_mime_type == 'application/json'
+
+
+def test_batch_in_json_mode():
+    model = SDKCheckedModel(delay=0, per_business_delay=0)
+    suggester = make_suggester(model, batch_size=10)
+
+    results = suggester.suggest_many([(f"shop{i}", f"Shop {i}") for i in range(25)])
+
+    assert all(results)
+    assert model.calls == model.json_calls == 3
+    assert suggester.json_mode is True
+
+
+def test_cache_key_ignores_case_and_whitespace():
+    model = FakeGenerativeModel(delay=0, per_business_delay=0)
+    suggester = make_suggester(model)
+
+    first = suggester.suggest('@Clay.Studio', 'Clay  Studio ')
+    assert suggester.suggest('clay.studio', 'Clay Studio') == first
+    assert model.calls == 1
+
+
+def test_batch_answers_serve_single_lookups():
+    model = FakeGenerativeModel(delay=0, per_business_delay=0)
+    suggester = make_suggester(model, batch_size=10)
+
+    results = suggester.suggest_many([('a.shop', 'A Shop'), ('b.shop', 'B Shop'), ('a.shop', 'A Shop')])
+    assert results[0] == results[2]
+    assert suggester.suggest('b.shop', 'B Shop') == results[1]
+    assert model.calls == 1
+
+
+def test_model_without_json_mode_falls_back_to_plain_prompts():
+    model = FakeGenerativeModel(delay=0, per_business_delay=0, json_mode=False)
+    suggester = make_suggester(model)
+
+    assert suggester.suggest('clay.studio', 'Clay Studio')
+    assert suggester.json_mode is False
+    assert model.json_calls == 0
+
+
+def test_parse_ignores_brackets_after_the_json():
+    reply = 'Sure:\n```json\n[{"name": "Mug", "price": "₹499"}]\n```\nPrices in INR [approx].'
+    assert parse_json_reply(reply) == [{'name': 'Mug', 'price': '₹499'}]
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+ImagePipeline: results come back one per job, in job order
+"""
+from image_pipeline import ImagePipeline
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, url):
+        self.content = f"bytes of {url}".encode()
+
+
+class FakeHTTPClient:
+    def __init__(self):
+        self.urls = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return FakeResponse(url)
+
+
+def make_pipeline():
+    client = FakeHTTPClient()
+    pipeline = ImagePipeline(client, download_workers=2)
+    pipeline.stage('size', lambda url, content, **options: len(content))
+    pipeline.stage('echo', lambda url, content, **options: url)
+    return pipeline, client
+
+
+def test_jobs_without_url_keep_their_place():
+    pipeline, client = make_pipeline()
+    results = pipeline.run([('a', ('echo',)), (None, ('echo', 'size')), ('', ('echo',)), ('c', ('echo',))])
+
+    assert results == [{'echo': 'a'}, {'echo': None, 'size': None}, {'echo': None}, {'echo': 'c'}]
+    assert sorted(client.urls) == ['a', 'c']
+
+
+def test_only_url_less_jobs():
+    pipeline, client = make_pipeline()
+    assert pipeline.run([(None, ('echo',))]) == [{'echo': None}]
+    assert client.urls == []
+
+
+def test_shared_url_downloads_once():
+    pipeline, client = make_pipeline()
+    results = pipeline.run([('a', ('echo',)), ('a', ('size',))])
+
+    assert results == [{'echo': 'a'}, {'size': len(b'bytes of a')}]
+    assert client.urls == ['a']
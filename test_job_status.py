@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+JobStatusStore: one claim per username, and a job that lost its claim can't overwrite a newer one
+"""
+import time
+
+import pytest
+
+from job_status import JobStatusStore
+from kv_store import create_store
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def statuses(request, tmp_path):
+    return JobStatusStore(create_store(request.param, 'job_status', data_dir=str(tmp_path)), stale_ttl=60)
+
+
+def test_only_one_claim_wins(statuses):
+    job = statuses.claim('shop')
+    assert job and job.status == 'queued'
+    assert statuses.claim('shop') is None
+    assert job.advance('analyzing')
+    assert statuses.claim('Shop') is None
+    assert statuses.get('shop') == 'analyzing'
+
+
+def test_reset_job_cannot_overwrite_the_next_one(statuses):
+    first = statuses.claim('shop')
+    assert first.advance('analyzing')
+    assert statuses.reset('shop') == 'analyzing'
+
+    second = statuses.claim('shop')
+    assert second.advance('analyzing')
+    # Same state name as the first job had: its late writes must still fail
+    assert not first.advance('completed')
+    assert not first.advance('failed')
+    assert statuses.get('shop') == 'analyzing'
+    assert statuses.claim('shop') is None
+
+    assert second.advance('completed')
+    assert statuses.get('shop') == 'completed'
+
+
+def test_expired_job_stops(statuses):
+    statuses.stale_ttl = 0.2
+    first = statuses.claim('shop')
+    time.sleep(0.3)
+    second = statuses.claim('shop')
+    assert second
+    assert not first.advance('analyzing')
+    assert statuses.get('shop') == 'queued'
+
+
+@pytest.mark.parametrize('finished', ['completed', 'failed'])
+def test_finished_jobs_can_be_reclaimed(statuses, finished):
+    job = statuses.claim('shop')
+    assert job.advance(finished)
+    assert statuses.claim('shop')
+
+
+def test_release_only_drops_own_claim(statuses):
+    first = statuses.claim('shop')
+    statuses.reset('shop')
+    second = statuses.claim('shop')
+    first.release()
+    assert statuses.get('shop') == 'queued'
+    second.release()
+    assert statuses.get('shop') is None
+
+
+def test_plain_status_values_are_still_read(statuses):
+    statuses.store.set(statuses._key('shop'), 'completed')
+    assert statuses.get('shop') == 'completed'
+    assert statuses.claim('shop')
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+ProfileCache: the refresh claim is only released by the caller that took it
+"""
+import time
+
+from kv_store import create_store
+from profile_cache import ProfileCache
+
+
+def make_cache():
+    return ProfileCache(create_store('memory', 'profiles'), ttl=0.05, stale_ttl=60)
+
+
+def fetch(username):
+    return {'success': True, 'username': username}
+
+
+def test_miss_keeps_another_workers_refresh_claim():
+    cache = make_cache()
+    assert cache.claim_refresh('other.shop')
+
+    cache.get_or_fetch('other.shop', fetch)
+
+    assert not cache.claim_refresh('other.shop')
+
+
+def test_stale_hit_schedules_one_refresh_and_releases_after():
+    cache = make_cache()
+    cache.set('shop', fetch('shop'))
+    time.sleep(0.1)
+    scheduled = []
+
+    def schedule(func, *args):
+        scheduled.append((func, args))
+        return 0
+
+    assert cache.get_or_fetch('shop', fetch, schedule_refresh=schedule)['username'] == 'shop'
+    cache.get_or_fetch('shop', fetch, schedule_refresh=schedule)
+    assert len(scheduled) == 1
+
+    func, args = scheduled[0]
+    func(*args)
+    assert cache.claim_refresh('shop')
+
+
+def test_rejected_schedule_releases_claim():
+    cache = make_cache()
+    cache.set('shop', fetch('shop'))
+    time.sleep(0.1)
+
+    cache.get_or_fetch('shop', fetch, schedule_refresh=lambda func, *args: None)
+
+    assert cache.claim_refresh('shop')